@@ -0,0 +1,266 @@
+"""
+The logged-in user as one bundle, and the role guards built on it.
+
+ProfileBackend (settings.AUTHENTICATION_BACKENDS) loads the session's user
+together with their college and role profile -- and the course, department,
+year, semester and session a student dashboard shows -- in a single joined
+query. AuthenticationMiddleware keeps that user on the request, so
+request.user.student_profile, .staff_profile, .hod_profile and .college cost
+nothing afterwards; a missing profile raises DoesNotExist without a query.
+
+The view decorators check the role on that bundle:
+
+    @student_required                   the user is a student with a profile
+    @staff_required(profile=True)       a staff user (with a Staffs row)
+    @hod_required(superuser=True)       a HOD, or any superuser
+    @role_required(CustomUser.HOD, CustomUser.STAFF, api=True)
+
+Pages redirect a refused user to the login page with a message; api=True
+views, and requests that sent JSON, get a JSON 403 instead.
+
+With settings.CACHED_AUTH_USER (opt-in, CMS_CACHED_AUTH_USER=1) the backend
+goes one step further for the polling APIs: the user row is kept in the cache
+as a compact dict, minus the password hash, so an authenticated request
+reaches the view without a user query. The session is still verified, against
+the cached HMAC of the password hash; the hash itself is fetched only by code
+that checks or changes the password. Saving, deleting or queryset.update()-ing
+the user drops the entry (signals.py). A cached user has no profile joined in,
+so the decorators that need one load it (with its joins) in one query. The
+entries are only dropped everywhere if every process shares the cache, so the
+setting is refused with a process-local one (checks.py).
+"""
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib import messages
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
+from django.db import transaction
+from django.db.models import DEFERRED
+from django.http import JsonResponse
+from django.shortcuts import redirect
+
+from .db_router import PRIMARY, primary_reads
+from .models import CustomUser
+
+
+# what each role profile is loaded with
+PROFILE_JOINS = {
+    'hod_profile': (),
+    'staff_profile': ('department',),
+    'student_profile': ('department', 'course', 'year', 'semester', 'session_year'),
+}
+
+PROFILE_RELATED = (
+    'college',
+    *PROFILE_JOINS,
+    *(f'{profile}__{join}' for profile, joins in PROFILE_JOINS.items() for join in joins),
+)
+
+PROFILES = {
+    CustomUser.HOD: 'hod_profile',
+    CustomUser.STAFF: 'staff_profile',
+    CustomUser.STUDENT: 'student_profile',
+}
+
+_PROFILE_LABELS = {
+    'hod_profile': 'HOD',
+    'staff_profile': 'Staff',
+    'student_profile': 'Student',
+}
+
+
+def users_with_profiles():
+    return CustomUser.objects.select_related(*PROFILE_RELATED)
+
+
+def load_profile(user, name):
+    """
+    user.<name> ('student_profile', ...), fetched with its joins if the user
+    was loaded without it; raises DoesNotExist like the accessor.
+    """
+    relation = CustomUser._meta.get_field(name)
+    if not relation.is_cached(user):
+        profile = relation.related_model.objects.select_related(*PROFILE_JOINS[name]).filter(admin_id=user.pk).first()
+        relation.set_cached_value(user, profile)
+        if profile is not None:
+            relation.remote_field.set_cached_value(profile, user)
+    return getattr(user, name)
+
+
+USER_KEY = 'auth:user:{}'
+USER_TIMEOUT = 5 * 60
+
+_USER_FIELDS = tuple(f.attname for f in CustomUser._meta.concrete_fields)
+# every column but the password hash
+_CACHED_FIELDS = tuple(name for name in _USER_FIELDS if name != 'password')
+
+
+def _cache_entry(user):
+    return {
+        'fields': {name: getattr(user, name) for name in _CACHED_FIELDS},
+        'session_hash': user.get_session_auth_hash(),
+        'fallback_hashes': list(user.get_session_auth_fallback_hash()),
+    }
+
+
+def _cached_user(entry):
+    # the password is left deferred: code that checks or changes it (PasswordChangeForm, set_password()) fetches
+    # it from the database on first access, and save() then writes only the loaded columns
+    user = CustomUser.from_db(PRIMARY, _USER_FIELDS, [entry['fields'].get(name, DEFERRED) for name in _USER_FIELDS])
+
+    def session_hash():
+        # login() compares the session against the cached HMAC until the password itself is loaded
+        if 'password' in user.__dict__:
+            return CustomUser.get_session_auth_hash(user)
+        return entry['session_hash']
+
+    def fallback_hashes():
+        if 'password' in user.__dict__:
+            return CustomUser.get_session_auth_fallback_hash(user)
+        return iter(entry['fallback_hashes'])
+
+    user.get_session_auth_hash = session_hash
+    user.get_session_auth_fallback_hash = fallback_hashes
+    return user
+
+
+def invalidate_user(user_id):
+    """Drop the cached user once the current transaction commits."""
+    invalidate_users([user_id])
+
+
+def invalidate_users(user_ids):
+    """Drop the cached users once the current transaction commits."""
+    keys = [USER_KEY.format(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class ProfileBackend(ModelBackend):
+    """
+    ModelBackend whose per-request user comes with college and role profile
+    joined in, or from the cache with settings.CACHED_AUTH_USER (see the
+    module docstring). One backend path either way, so flipping the setting
+    keeps sessions logged in.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username=username, password=password, **kwargs)
+        if user is None and password is not None:
+            # the ModelBackend listed after this one (for sessions logged in before it) would only check
+            # the same password against the same row again: refuse here instead of hashing twice
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        if not settings.CACHED_AUTH_USER:
+            return self._load_user(user_id)
+        entry = cache.get(USER_KEY.format(user_id))
+        if entry is None:
+            user = self._load_user(user_id)
+            if user is not None:
+                cache.set(USER_KEY.format(user_id), _cache_entry(user), USER_TIMEOUT)
+            return user
+        user = _cached_user(entry)
+        return user if self.user_can_authenticate(user) else None
+
+    def _load_user(self, user_id):
+        with primary_reads():
+            user = users_with_profiles().filter(pk=user_id).first()
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+
+def profile_of(user):
+    """The user's role profile (AdminHOD, Staffs or Students), or None."""
+    name = PROFILES.get(getattr(user, 'user_type', None))
+    if name is None:
+        return None
+    try:
+        return load_profile(user, name)
+    except ObjectDoesNotExist:
+        return None
+
+
+def has_role(user, *user_types, superuser=False):
+    if not user.is_authenticated:
+        return False
+    if superuser and user.is_superuser:
+        return True
+    return getattr(user, 'user_type', None) in user_types
+
+
+def _wants_json(request, api):
+    return api or request.content_type == 'application/json'
+
+
+def _refuse(request, api, message, status=403):
+    if _wants_json(request, api):
+        return JsonResponse({'error': message}, status=status)
+    messages.error(request, message)
+    return redirect('student_management_app:login')
+
+
+def _check(request, user, user_types, superuser, profile, api):
+    """None if the user may use the view, otherwise the refusal response."""
+    if not user.is_authenticated:
+        return _refuse(request, api, 'Unauthorized' if _wants_json(request, api) else 'Login required')
+    if not has_role(user, *user_types, superuser=superuser):
+        return _refuse(request, api, 'Unauthorized')
+    if profile and not (superuser and user.is_superuser):
+        try:
+            load_profile(user, profile)
+        except ObjectDoesNotExist:
+            label = _PROFILE_LABELS[profile]
+            if _wants_json(request, api):
+                return _refuse(request, api, f'{label} profile missing', status=404)
+            return _refuse(request, api, f'{label} profile not found.')
+    return None
+
+
+def role_required(*user_types, superuser=False, profile=None, api=False):
+    """
+    Let only users of the given user_types (and superusers, with
+    superuser=True) through; profile names the related profile that must
+    exist ('student_profile', ...).
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            async def wrapper(request, *args, **kwargs):
+                user = await request.auser()
+                if profile:
+                    # loading the profile may query, which has to happen off the event loop
+                    refused = await sync_to_async(_check)(request, user, user_types, superuser, profile, api)
+                else:
+                    refused = _check(request, user, user_types, superuser, profile, api)
+                if refused is not None:
+                    return refused
+                return await view(request, *args, **kwargs)
+        else:
+            def wrapper(request, *args, **kwargs):
+                refused = _check(request, request.user, user_types, superuser, profile, api)
+                if refused is not None:
+                    return refused
+                return view(request, *args, **kwargs)
+        return wraps(view)(wrapper)
+    return decorator
+
+
+def student_required(view=None, *, api=False):
+    """Students with a Students profile only."""
+    decorator = role_required(CustomUser.STUDENT, profile='student_profile', api=api)
+    return decorator(view) if view is not None else decorator
+
+
+def staff_required(view=None, *, api=False, profile=False):
+    """Staff users only; profile=True also requires their Staffs row."""
+    decorator = role_required(CustomUser.STAFF, profile='staff_profile' if profile else None, api=api)
+    return decorator(view) if view is not None else decorator
+
+
+def hod_required(view=None, *, api=False, superuser=False):
+    """HODs only; superuser=True also lets superusers in."""
+    decorator = role_required(CustomUser.HOD, superuser=superuser, api=api)
+    return decorator(view) if view is not None else decorator
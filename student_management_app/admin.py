@@ -1,14 +1,16 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.core.exceptions import ValidationError
 from django.utils.html import format_html
-from django.core.exceptions import FieldError
 
 
 from .models import (
     CustomUser, College, Department, Semester, AdminHOD, Staffs, Students,
-    Course, SessionYear, Attendance, AttendanceReport,
-    LeaveReportStaff, LeaveReportStudent, FeedbackStaff, FeedbackStudent, StudentResult
+    Course, SessionYear, Attendance, AttendanceReport, AttendanceSummary,
+    LeaveReportStaff, LeaveReportStudent, FeedbackStaff, FeedbackStudent, StudentResult,
+    AnalyticsRollup
 )
+from .tenancy import college_id_of, filter_to_college, tenant_path
 
 admin.site.site_header = "College CMS Admin"
 admin.site.site_title = "College CMS Control"
@@ -18,25 +20,24 @@ admin.site.index_title = "Manage College CMS"
 class TenantAdminMixin:
     """
     Admin mixin to scope lists/changes to the request.user.college for staff users.
-    Superusers see everything.
+    Superusers see everything. Rows are matched on the model's tenant path, so
+    leaves and feedback are scoped through their applicant's college.
     """
     def _user_college(self, request):
-        return getattr(request.user, "college", None)
+        return request.user.college_id
+
+    def _same_college(self, request, obj):
+        if tenant_path(type(obj)) is None:
+            return False
+        return college_id_of(obj) == self._user_college(request)
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         if request.user.is_superuser:
             return qs
-        if not request.user.is_staff:
-            return qs.none()
-        user_college = self._user_college(request)
-        if not user_college:
-            return qs.none()
-
-        try:
-            return qs.filter(college=user_college)
-        except (FieldError, Exception):
+        if not request.user.is_staff or tenant_path(self.model) is None:
             return qs.none()
+        return filter_to_college(qs, self._user_college(request))
 
     def has_module_permission(self, request):
         if request.user.is_superuser:
@@ -48,24 +49,18 @@ class TenantAdminMixin:
             return True
         if not request.user.is_staff:
             return False
-        user_college = self._user_college(request)
         if obj is None:
-            return bool(user_college)
-        if hasattr(obj, "college"):
-            return getattr(obj, "college") == user_college
-        return False
+            return bool(self._user_college(request))
+        return self._same_college(request, obj)
 
     def has_change_permission(self, request, obj=None):
         if request.user.is_superuser:
             return True
         if not request.user.is_staff:
             return False
-        user_college = self._user_college(request)
         if obj is None:
-            return bool(user_college)
-        if hasattr(obj, "college"):
-            return getattr(obj, "college") == user_college
-        return False
+            return bool(self._user_college(request))
+        return self._same_college(request, obj)
 
     def has_add_permission(self, request):
         if request.user.is_superuser:
@@ -79,15 +74,13 @@ class TenantAdminMixin:
             return False
         if obj is None:
             return bool(self._user_college(request))
-        if hasattr(obj, "college"):
-            return getattr(obj, "college") == self._user_college(request)
-        return False
+        return self._same_college(request, obj)
 
     def save_model(self, request, obj, form, change):
         if not request.user.is_superuser:
             user_college = self._user_college(request)
-            if user_college and hasattr(obj, "college"):
-                setattr(obj, "college", user_college)
+            if user_college and tenant_path(type(obj)) == "college":
+                obj.college_id = user_college
         super().save_model(request, obj, form, change)
 
 
@@ -104,13 +97,9 @@ class CustomUserAdmin(UserAdmin):
             return qs
         if not request.user.is_staff:
             return qs.none()
-        user_college = getattr(request.user, "college", None)
-        if not user_college:
-            return qs.none()
-        try:
-            return qs.filter(college=user_college)
-        except Exception:
+        if not request.user.college_id:
             return qs.none()
+        return qs.filter(college_id=request.user.college_id)
 
 
 @admin.register(College)
@@ -178,6 +167,32 @@ class AttendanceReportAdmin(TenantAdminMixin, admin.ModelAdmin):
     list_display = ('student', 'attendance', 'status', 'college')
     list_filter = ('status', 'attendance__course')
 
+    def get_object(self, request, object_id, from_field=None):
+        # saves adjust AttendanceSummary by the change from the status read here; the admin runs POSTs in a
+        # transaction, so lock the row for it and a concurrent edit reads the status this one commits
+        if request.method == 'POST':
+            queryset = self.get_queryset(request).select_for_update(of=('self',))
+            field = self.model._meta.pk if from_field is None else self.model._meta.get_field(from_field)
+            try:
+                return queryset.get(**{field.name: field.to_python(object_id)})
+            except (self.model.DoesNotExist, ValidationError, ValueError):
+                return None
+        return super().get_object(request, object_id, from_field)
+
+
+@admin.register(AttendanceSummary)
+class AttendanceSummaryAdmin(TenantAdminMixin, admin.ModelAdmin):
+    list_display = ('student', 'course', 'session_year', 'present', 'total', 'college')
+    list_filter = ('course', 'session_year')
+    readonly_fields = ('student', 'course', 'session_year', 'present', 'total', 'college')
+
+    # rows are maintained from AttendanceReport writes (attendance.py); rebuild_attendance_summary repairs them
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(LeaveReportStaff)
 class LeaveReportStaffAdmin(TenantAdminMixin, admin.ModelAdmin):
@@ -206,3 +221,15 @@ class StudentResultAdmin(TenantAdminMixin, admin.ModelAdmin):
     list_display = ('student', 'subject_name', 'marks', 'grade', 'college', 'created_at')
     list_filter = ('subject_name', 'college')
     search_fields = ('student__admin__username', 'subject_name')
+
+
+@admin.register(AnalyticsRollup)
+class AnalyticsRollupAdmin(admin.ModelAdmin):
+    list_display = ('level', 'college', 'department', 'course', 'session_year', 'students', 'attendance_rate', 'mean_marks', 'computed_at')
+    list_filter = ('level', 'college')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
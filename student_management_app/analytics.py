@@ -0,0 +1,193 @@
+"""
+Cross-college analytics for superusers.
+
+Enrolment, attendance rate, mean marks and grade distribution are computed per
+college, and within each college per department, course and session. Each
+metric is read with one set-based aggregate query at the finest grain
+(college, department, course, session) and rolled up to the four levels in
+Python, so the cost is a handful of queries however many colleges there are.
+Median/90th-percentile marks need the raw marks and use NumPy when it is
+installed, with a pure-Python fallback.
+
+refresh_analytics() materialises everything into AnalyticsRollup; the JSON API
+only ever reads that table, so global dashboards cost O(colleges) to render.
+"""
+import math
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import AnalyticsRollup, AttendanceSummary, StudentResult, Students
+
+try:
+    import numpy as np
+except ImportError:  # optional: percentiles fall back to pure Python
+    np = None
+
+
+LEVELS = (AnalyticsRollup.COLLEGE, AnalyticsRollup.DEPARTMENT, AnalyticsRollup.COURSE, AnalyticsRollup.SESSION)
+BATCH_SIZE = 500
+
+
+def _level_keys(college, department, course, session_year):
+    """The rollup rows one fine-grained (college, department, course, session) group contributes to."""
+    return (
+        (AnalyticsRollup.COLLEGE, college, None, None, None),
+        (AnalyticsRollup.DEPARTMENT, college, department, None, None),
+        (AnalyticsRollup.COURSE, college, None, course, None),
+        (AnalyticsRollup.SESSION, college, None, None, session_year),
+    )
+
+
+def _new_row():
+    return {
+        'students': 0,
+        'attendance_present': 0,
+        'attendance_total': 0,
+        'results': 0,
+        'marks_sum': 0.0,
+        'grade_distribution': defaultdict(int),
+        'median_marks': None,
+        'p90_marks': None,
+    }
+
+
+def _percentile(sorted_values, q):
+    # linear interpolation between closest ranks, same as numpy.percentile's default
+    pos = (len(sorted_values) - 1) * q / 100
+    lo, hi = math.floor(pos), math.ceil(pos)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def _median_p90(values):
+    if np is not None:
+        median, p90 = np.percentile(np.asarray(values, dtype=float), [50, 90])
+        return float(median), float(p90)
+    values = sorted(values)
+    return _percentile(values, 50), _percentile(values, 90)
+
+
+def compute_rollups(percentiles=True):
+    """{(level, college, department, course, session_year): metrics} for every level."""
+    rows = defaultdict(_new_row)
+
+    enrolment = (
+        Students.objects
+        .values('college_id', 'department_id', 'course_id', 'session_year_id')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    for r in enrolment:
+        for key in _level_keys(r['college_id'], r['department_id'], r['course_id'], r['session_year_id']):
+            rows[key]['students'] += r['n']
+
+    attendance = (
+        AttendanceSummary.objects
+        .values('college_id', 'course_id', 'session_year_id', department_id=F('student__department_id'))
+        .annotate(present=Sum('present'), total=Sum('total'))
+        .order_by()
+    )
+    for r in attendance:
+        for key in _level_keys(r['college_id'], r['department_id'], r['course_id'], r['session_year_id']):
+            rows[key]['attendance_present'] += r['present'] or 0
+            rows[key]['attendance_total'] += r['total'] or 0
+
+    grades = (
+        StudentResult.objects
+        .values(
+            'college_id', 'grade',
+            department_id=F('student__department_id'),
+            course_id=F('student__course_id'),
+            session_year_id=F('student__session_year_id'),
+        )
+        .annotate(n=Count('id'), marks=Sum('marks'))
+        .order_by()
+    )
+    for r in grades:
+        for key in _level_keys(r['college_id'], r['department_id'], r['course_id'], r['session_year_id']):
+            row = rows[key]
+            row['results'] += r['n']
+            row['marks_sum'] += r['marks'] or 0
+            row['grade_distribution'][r['grade']] += r['n']
+
+    if percentiles:
+        marks = defaultdict(list)
+        for college, department, course, session_year, value in (
+            StudentResult.objects
+            .values_list('college_id', 'student__department_id', 'student__course_id', 'student__session_year_id', 'marks')
+            .iterator(chunk_size=5000)
+        ):
+            for key in _level_keys(college, department, course, session_year):
+                marks[key].append(value)
+        for key, values in marks.items():
+            rows[key]['median_marks'], rows[key]['p90_marks'] = _median_p90(values)
+
+    return rows
+
+
+def refresh_analytics(percentiles=True):
+    """Recompute every rollup and replace the AnalyticsRollup table in one transaction. Returns the row count."""
+    computed_at = timezone.now()
+    rollups = [
+        AnalyticsRollup(
+            level=level,
+            college_id=college,
+            department_id=department,
+            course_id=course,
+            session_year_id=session_year,
+            students=m['students'],
+            attendance_present=m['attendance_present'],
+            attendance_total=m['attendance_total'],
+            results=m['results'],
+            mean_marks=round(m['marks_sum'] / m['results'], 2) if m['results'] else None,
+            median_marks=m['median_marks'],
+            p90_marks=m['p90_marks'],
+            grade_distribution=dict(m['grade_distribution']),
+            computed_at=computed_at,
+        )
+        for (level, college, department, course, session_year), m in compute_rollups(percentiles).items()
+    ]
+    with transaction.atomic():
+        AnalyticsRollup.objects.all().delete()
+        AnalyticsRollup.objects.bulk_create(rollups, batch_size=BATCH_SIZE)
+    return len(rollups)
+
+
+def rollup_rows(level, college_id=None):
+    """Materialised rows of one level as plain dicts, with display names joined in one query."""
+    qs = AnalyticsRollup.objects.filter(level=level)
+    if college_id is not None:
+        qs = qs.filter(college_id=college_id)
+    return qs.order_by('college__name', 'id').values(
+        'college_id', 'department_id', 'course_id', 'session_year_id',
+        'students', 'attendance_present', 'attendance_total', 'results',
+        'mean_marks', 'median_marks', 'p90_marks', 'grade_distribution', 'computed_at',
+        college_code=F('college__code'),
+        department_name=F('department__name'),
+        course_name=F('course__name'),
+        session_start=F('session_year__session_start_year'),
+        session_end=F('session_year__session_end_year'),
+    )
+
+
+def serialize_rollup(row):
+    total = row['attendance_total']
+    session = f"{row['session_start']}-{row['session_end']}" if row['session_year_id'] else None
+    return {
+        'college_id': row['college_id'],
+        'college': row['college_code'],
+        'department': row['department_name'] if row['department_id'] else None,
+        'course': row['course_name'] if row['course_id'] else None,
+        'session': session,
+        'students': row['students'],
+        'attendance_rate': round(row['attendance_present'] / total * 100, 1) if total else None,
+        'attendance_present': row['attendance_present'],
+        'attendance_total': total,
+        'results': row['results'],
+        'mean_marks': row['mean_marks'],
+        'median_marks': row['median_marks'],
+        'p90_marks': row['p90_marks'],
+        'grade_distribution': row['grade_distribution'],
+    }
@@ -0,0 +1,88 @@
+"""
+Async versions of the read-heavy JSON APIs and the student dashboard.
+
+They are mounted in place of their views.py counterparts when
+settings.ASYNC_VIEWS is on (asgi.py turns it on), so under an ASGI server a
+burst of polling students waits on the event loop instead of occupying one
+worker thread each. The user comes from request.auser() and all data access
+goes through the async cache/ORM APIs; access rules and response shapes are
+shared with the sync views.
+"""
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from . import leaves
+from .accounts import hod_required, role_required, student_required
+from .db_router import replica_reads
+from .models import CustomUser
+from .pagination import akeyset_page, parse_limit
+from .student_cache import astudent_payload
+from .views import (
+    _staffs_listing, _student_dashboard_data, _student_home_context, _students_listing, _subject_data_response,
+    can_list_staffs, can_list_students,
+)
+
+
+@role_required(CustomUser.STUDENT, api=True)
+@replica_reads
+async def api_student_subject_data(request, student_id, result_id):
+    user = await request.auser()
+    return _subject_data_response(request, user, await astudent_payload(student_id), student_id, result_id)
+
+
+@student_required(api=True)
+@replica_reads
+async def api_student_dashboard(request):
+    student = (await request.auser()).student_profile
+    return JsonResponse(_student_dashboard_data(student, await astudent_payload(student.id)))
+
+
+@student_required
+@replica_reads
+async def student_home(request):
+    student_profile = (await request.auser()).student_profile
+    payload = await astudent_payload(student_profile.id)
+    # the college comes from the (usually warm) college cache, which is sync
+    context = await sync_to_async(_student_home_context)(student_profile, payload)
+    # context processors and templates may still touch the ORM, so rendering stays sync
+    return await sync_to_async(render)(request, 'student_management_app/dashboard_student.html', context)
+
+
+@hod_required(api=True)
+async def api_pending_leaves(request):
+    user = await request.auser()
+    kind = request.GET.get('kind', leaves.STAFF)
+    if kind not in (leaves.STAFF, leaves.STUDENT):
+        return JsonResponse({'error': 'kind must be staff or student'}, status=400)
+
+    rows, next_cursor = await leaves.apending_leaves(
+        kind, user.college_id,
+        after=request.GET.get('after'),
+        limit=parse_limit(request.GET.get('limit'), default=leaves.PAGE_SIZE),
+    )
+    return JsonResponse({'results': [leaves.serialize(leave, kind) for leave in rows], 'next': next_cursor})
+
+
+@can_list_students
+async def api_students_page(request):
+    try:
+        students = _students_listing(request)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    rows, next_cursor = await akeyset_page(
+        students, 'student_id',
+        after=request.GET.get('after'),
+        limit=parse_limit(request.GET.get('limit')),
+    )
+    return JsonResponse({'results': rows, 'next': next_cursor})
+
+
+@can_list_staffs
+async def api_staffs_page(request):
+    rows, next_cursor = await akeyset_page(
+        _staffs_listing(), 'employee_id',
+        after=request.GET.get('after'),
+        limit=parse_limit(request.GET.get('limit')),
+    )
+    return JsonResponse({'results': rows, 'next': next_cursor})
@@ -0,0 +1,182 @@
+"""
+Maintenance of the AttendanceSummary table.
+
+Single-row AttendanceReport saves (staff_edit_attendance, admin, get_or_create)
+are applied as +/- deltas from signals; deletes re-tally the affected row. Bulk writes do not emit signals, so the
+code that issues them calls refresh_summaries() for the affected students.
+
+The delta of an edit is the change from the status the report was loaded
+with, so code that edits reports loads them with select_for_update() inside
+a transaction: a concurrent edit of the same report then waits and starts
+from the committed status instead of applying the same +1/-1 again.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q, Sum
+
+from .models import Attendance, AttendanceReport, AttendanceSummary
+
+
+SUMMARY_KEY = ('student_id', 'course_id', 'session_year_id')
+
+
+def _tally(reports):
+    """Group a report queryset into (student, course, session) -> present/total rows in one query."""
+    return (
+        reports
+        .values(
+            'student_id',
+            course_id=F('attendance__course_id'),
+            session_year_id=F('attendance__session_year_id'),
+        )
+        .annotate(
+            total=Count('id'),
+            present=Count('id', filter=Q(status=True)),
+            college_ref=Max('college_id'),
+        )
+        .order_by()
+    )
+
+
+def _summary_rows(tally):
+    return [
+        AttendanceSummary(
+            student_id=row['student_id'],
+            course_id=row['course_id'],
+            session_year_id=row['session_year_id'],
+            college_id=row['college_ref'],
+            present=row['present'],
+            total=row['total'],
+        )
+        for row in tally
+    ]
+
+
+def refresh_summaries(student_ids, course_id, session_year_id):
+    """
+    Recompute the summaries of the given students for one course/session.
+    Costs a constant number of queries regardless of how many students are passed.
+    """
+    student_ids = list(student_ids)
+    if not student_ids:
+        return
+    reports = AttendanceReport.objects.filter(
+        student_id__in=student_ids,
+        attendance__course_id=course_id,
+        attendance__session_year_id=session_year_id,
+    )
+    rows = _summary_rows(_tally(reports))
+    with transaction.atomic():
+        AttendanceSummary.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['student', 'course', 'session_year'],
+            update_fields=['present', 'total', 'college'],
+        )
+        AttendanceSummary.objects.filter(
+            student_id__in=set(student_ids) - {r.student_id for r in rows},
+            course_id=course_id,
+            session_year_id=session_year_id,
+        ).delete()
+
+
+def rebuild_summaries(batch_size=2000):
+    """Drop and recompute every summary row from AttendanceReport. Returns the number of rows written."""
+    with transaction.atomic():
+        AttendanceSummary.objects.all().delete()
+        rows = _summary_rows(_tally(AttendanceReport.objects.all()))
+        AttendanceSummary.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def verify_summaries():
+    """Compare the summary table with a fresh tally. Returns a list of (key, expected, stored) mismatches."""
+    expected = {
+        tuple(row[k] for k in SUMMARY_KEY): (row['present'], row['total'])
+        for row in _tally(AttendanceReport.objects.all())
+    }
+    stored = {
+        tuple(row[k] for k in SUMMARY_KEY): (row['present'], row['total'])
+        for row in AttendanceSummary.objects.values(*SUMMARY_KEY, 'present', 'total')
+    }
+    mismatches = []
+    for key in sorted(expected.keys() | stored.keys()):
+        exp = expected.get(key, (0, 0))
+        got = stored.get(key, (0, 0))
+        if exp != got:
+            mismatches.append((key, exp, got))
+    return mismatches
+
+
+def _course_attendance_rows(student):
+    return (
+        AttendanceSummary.objects
+        .filter(student=student, total__gt=0)
+        .values(course_name=F('course__name'))
+        .annotate(present_sum=Sum('present'), total_sum=Sum('total'))
+        .order_by('course_name')
+    )
+
+
+def _course_attendance_entry(row):
+    return {
+        'course': row['course_name'],
+        'present': row['present_sum'],
+        'total': row['total_sum'],
+        'percent': round((row['present_sum'] / row['total_sum'] * 100), 1) if row['total_sum'] else 0,
+    }
+
+
+def course_attendance(student):
+    """Per-course present/total/percent for a student (instance or id), merged across session years in one grouped query."""
+    return [_course_attendance_entry(row) for row in _course_attendance_rows(student)]
+
+
+async def acourse_attendance(student):
+    """Async course_attendance()."""
+    return [_course_attendance_entry(row) async for row in _course_attendance_rows(student)]
+
+
+def _summary_key(report):
+    if AttendanceReport.attendance.is_cached(report):
+        attendance = report.attendance
+        return report.student_id, attendance.course_id, attendance.session_year_id
+    course_id, session_year_id = (
+        Attendance.objects.filter(id=report.attendance_id).values_list('course_id', 'session_year_id').first()
+        or (None, None)
+    )
+    return report.student_id, course_id, session_year_id
+
+
+def refresh_report_summary(report):
+    """Recompute the single summary row a report belongs to."""
+    student_id, course_id, session_year_id = _summary_key(report)
+    if course_id is not None:
+        refresh_summaries([student_id], course_id, session_year_id)
+
+
+def apply_report_delta(report, present_delta, total_delta):
+    """Add deltas to the summary row the report belongs to, creating it on first use."""
+    student_id, course_id, session_year_id = _summary_key(report)
+    if course_id is None:
+        return
+    lookup = {'student_id': student_id, 'course_id': course_id, 'session_year_id': session_year_id}
+    updated = AttendanceSummary.objects.filter(**lookup).update(
+        present=F('present') + present_delta,
+        total=F('total') + total_delta,
+    )
+    if updated or total_delta <= 0:
+        return
+    try:
+        with transaction.atomic():
+            AttendanceSummary.objects.create(
+                college_id=report.college_id,
+                present=max(present_delta, 0),
+                total=total_delta,
+                **lookup
+            )
+    except IntegrityError:
+        # another writer created the row between our update and insert
+        AttendanceSummary.objects.filter(**lookup).update(
+            present=F('present') + present_delta,
+            total=F('total') + total_delta,
+        )
@@ -0,0 +1,60 @@
+"""
+System checks for settings that only work together.
+
+Several layers keep state and invalidation markers in the default cache and
+assume every process sees the same one (student_management_project/caches.py).
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from student_management_project.caches import is_process_local
+
+
+# for the management commands whose cache invalidations only reach the web workers through a shared cache
+STALE_WORKERS_WARNING = (
+    "The default cache is process-local: running web workers keep their cached college list, dashboard "
+    "statistics and fragments until they expire. Set CMS_CACHE_URL to a shared cache, or restart them."
+)
+
+
+def process_local_cache():
+    """True if the default cache lives inside this process, unseen by any other."""
+    return is_process_local(settings.CACHES['default'])
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if not process_local_cache():
+        return []
+    return [Error(
+        "The default cache is process-local: a college, student, staff or leave change made in one worker "
+        "process (or a management command) does not invalidate the college list, dashboard statistics or "
+        "dashboard fragments cached by the others.",
+        hint="Point CMS_CACHE_URL at a shared cache, e.g. redis://127.0.0.1:6379/1.",
+        id='student_management_app.E001',
+    )]
+
+
+@register(Tags.caches)
+def check_cached_auth_user(app_configs, **kwargs):
+    if not (settings.CACHED_AUTH_USER and process_local_cache()):
+        return []
+    # a password change or deactivation drops the entry only in the process that made it
+    return [Error(
+        "CMS_CACHED_AUTH_USER=1 needs a shared cache: with a process-local one, a user whose password was "
+        "changed or who was deactivated stays logged in on the other worker processes until the entry expires.",
+        hint="Point CMS_CACHE_URL at a shared cache, or unset CMS_CACHED_AUTH_USER.",
+        id='student_management_app.E002',
+    )]
+
+
+@register(Tags.caches, Tags.security, deploy=True)
+def check_login_throttle_cache(app_configs, **kwargs):
+    if not process_local_cache():
+        return []
+    return [Error(
+        "The login rate limits need a shared cache: with a process-local one every worker process counts "
+        "failed logins on its own, so the limits multiply by the number of workers and reset on a restart.",
+        hint="Point CMS_CACHE_URL at a shared cache, e.g. redis://127.0.0.1:6379/1.",
+        id='student_management_app.E003',
+    )]
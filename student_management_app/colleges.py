@@ -0,0 +1,85 @@
+"""
+Cached access to College rows.
+
+Colleges are read on every render (navbar, college picker) but almost never
+change, so the full list is kept in the cache and memoised per process. A
+version counter in the cache lets every process notice an invalidation from
+post_save/post_delete on College -- provided the processes share the cache
+(CMS_CACHE_URL); with the per-process locmem default, other workers keep their
+list until CACHE_TIMEOUT.
+
+The college a visitor picked on the home page lives in a signed cookie rather
+than the session, so browsing the picker never creates or writes a session row.
+"""
+from django.core.cache import cache
+
+from .models import College
+
+
+VERSION_KEY = 'colleges:version'
+LIST_KEY = 'colleges:list:v{}'
+CACHE_TIMEOUT = 60 * 60
+
+SELECTED_COOKIE = 'cms_college'
+SELECTED_SALT = 'student_management_app.selected_college'
+SELECTED_MAX_AGE = 365 * 24 * 60 * 60
+
+# (version, colleges, colleges_by_id) for this process
+_local = (None, [], {})
+
+
+def _current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def _load():
+    global _local
+    version = _current_version()
+    if _local[0] == version:
+        return _local
+    colleges = cache.get(LIST_KEY.format(version))
+    if colleges is None:
+        colleges = list(College.objects.order_by('name'))
+        cache.set(LIST_KEY.format(version), colleges, CACHE_TIMEOUT)
+    _local = (version, colleges, {c.id: c for c in colleges})
+    return _local
+
+
+def get_colleges():
+    """All colleges ordered by name."""
+    return _load()[1]
+
+
+def get_college(college_id):
+    """Look up one college by id without a query; returns None for unknown or malformed ids."""
+    try:
+        college_id = int(college_id)
+    except (TypeError, ValueError):
+        return None
+    return _load()[2].get(college_id)
+
+
+def invalidate_colleges():
+    global _local
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+    _local = (None, [], {})
+
+
+def selected_college_id(request):
+    """The id of the college picked on the home page, or None (unset or tampered cookie)."""
+    return request.get_signed_cookie(SELECTED_COOKIE, default=None, salt=SELECTED_SALT)
+
+
+def remember_selected_college(response, college_id):
+    response.set_signed_cookie(
+        SELECTED_COOKIE, str(college_id), salt=SELECTED_SALT,
+        max_age=SELECTED_MAX_AGE, httponly=True, samesite='Lax',
+    )
+    return response
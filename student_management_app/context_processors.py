@@ -1,17 +1,15 @@
-from .models import College
+from .colleges import get_college, get_colleges, selected_college_id
+from .fragments import lazy
 
 
 def college_profile(request):
     """
     Provide 'college_profile' (selected college) and 'colleges' (all colleges).
-    The selected college is stored in session as 'selected_college_id'.
+    The selected college comes from the signed cookie set on the home page.
+    Both are resolved lazily from the college cache, so a page that never
+    uses them costs no queries.
     """
-    colleges = College.objects.all()
-    selected_college = None
-    college_id = request.session.get('selected_college_id')
-    if college_id:
-        selected_college = College.objects.filter(id=college_id).first()
     return {
-        'college_profile': selected_college,
-        'colleges': colleges,
+        'college_profile': lazy(lambda: get_college(selected_college_id(request))),
+        'colleges': lazy(get_colleges),
     }
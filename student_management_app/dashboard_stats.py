@@ -0,0 +1,158 @@
+"""
+Precomputed HOD dashboard statistics.
+
+The totals and per-department distributions shown on admin_home only change
+when students, staff, courses or departments are added, edited or removed, so
+they are kept as one snapshot per college in the cache the workers share
+(CMS_CACHE_URL) and the dashboard renders them from a single cache read.
+
+Freshness is stale-while-revalidate: post_save/post_delete on the underlying
+models bump a per-college generation counter (plus a global one for the
+all-colleges snapshot superusers see). A snapshot whose generation no longer
+matches, or that is older than STATS_MAX_AGE, is still served, and one
+request per snapshot (guarded by a cache lock) recomputes it in a background
+thread. Only a cold cache computes inline. The refresh_dashboard_stats
+command rebuilds every snapshot, e.g. from cron after bulk loads; with a
+process-local cache it could not reach the workers, so it refuses to run.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F
+
+from .db_router import primary_reads
+from .models import Course, Staffs, Students
+
+
+logger = logging.getLogger(__name__)
+
+ALL = 'all'
+SNAPSHOT_KEY = 'dashboard:stats:{}'
+GENERATION_KEY = 'dashboard:stats:gen:{}'
+LOCK_KEY = 'dashboard:stats:lock:{}'
+# snapshots are revalidated after this many seconds even without a change signal
+STATS_MAX_AGE = 15 * 60
+# hard expiry so snapshots of removed colleges do not linger forever
+SNAPSHOT_TIMEOUT = 24 * 60 * 60
+LOCK_TIMEOUT = 60
+
+# what a HOD without a college sees
+EMPTY_STATS = {
+    'total_students': 0,
+    'total_staffs': 0,
+    'total_courses': 0,
+    'students_by_department': [],
+    'staffs_by_department': [],
+}
+
+
+def _scope(college_id):
+    return ALL if college_id is None else college_id
+
+
+def _generation(scope):
+    return cache.get(GENERATION_KEY.format(scope), 0)
+
+
+def _distribution(queryset):
+    rows = queryset.values(dept_name=F('department__name')).annotate(count=Count('id')).order_by('-count')
+    return [(row['dept_name'] or "Unknown", row['count']) for row in rows]
+
+
+def compute_stats(college_id):
+    """Totals and per-department counts for one college, or every college when college_id is None."""
+    students = Students.objects.all()
+    staffs = Staffs.objects.all()
+    courses = Course.objects.all()
+    if college_id is not None:
+        students = students.filter(college_id=college_id)
+        staffs = staffs.filter(college_id=college_id)
+        courses = courses.filter(college_id=college_id)
+    return {
+        'total_students': students.count(),
+        'total_staffs': staffs.count(),
+        'total_courses': courses.count(),
+        'students_by_department': _distribution(students),
+        'staffs_by_department': _distribution(staffs),
+    }
+
+
+def refresh_stats(college_id):
+    """Recompute and store the snapshot for a college (None = all colleges); returns it."""
+    scope = _scope(college_id)
+    # read the generation first: a change landing mid-computation leaves the snapshot stale, not wrong forever
+    generation = _generation(scope)
+    with primary_reads():  # never snapshot a lagging replica
+        stats = compute_stats(college_id)
+    snapshot = {
+        'stats': stats,
+        'generation': generation,
+        'computed_at': time.time(),
+    }
+    cache.set(SNAPSHOT_KEY.format(scope), snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def _is_stale(snapshot, scope):
+    max_age = getattr(settings, 'DASHBOARD_STATS_MAX_AGE', STATS_MAX_AGE)
+    return snapshot['generation'] != _generation(scope) or time.time() - snapshot['computed_at'] > max_age
+
+
+def _refresh_in_background(college_id, lock_key):
+    try:
+        refresh_stats(college_id)
+    except Exception:
+        logger.exception("Refreshing dashboard stats for %s failed", _scope(college_id))
+    finally:
+        cache.delete(lock_key)
+        connection.close()
+
+
+def _revalidate(college_id):
+    lock_key = LOCK_KEY.format(_scope(college_id))
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        return  # another request is already refreshing this snapshot
+    if getattr(settings, 'DASHBOARD_STATS_BACKGROUND_REFRESH', True):
+        threading.Thread(target=_refresh_in_background, args=(college_id, lock_key), daemon=True).start()
+    else:
+        try:
+            refresh_stats(college_id)
+        finally:
+            cache.delete(lock_key)
+
+
+def get_stats(college_id):
+    """
+    The dashboard statistics for a college (None = all colleges), possibly a
+    little stale. Computed inline only when nothing is cached yet.
+    """
+    snapshot = cache.get(SNAPSHOT_KEY.format(_scope(college_id)))
+    if snapshot is None:
+        return refresh_stats(college_id)['stats']
+    if _is_stale(snapshot, _scope(college_id)):
+        _revalidate(college_id)
+    return snapshot['stats']
+
+
+def _bump_generations(scopes):
+    for scope in scopes:
+        key = GENERATION_KEY.format(scope)
+        if not cache.add(key, 1, None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, None)
+
+
+def mark_stale(college_id):
+    """
+    Flag the college's snapshot (and the all-colleges one) for revalidation on
+    next read, once the current transaction commits: a refresh started before
+    then would store the pre-commit counts under the new generation.
+    """
+    scopes = [ALL] if college_id is None else [college_id, ALL]
+    transaction.on_commit(lambda: _bump_generations(scopes))
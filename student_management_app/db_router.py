@@ -0,0 +1,105 @@
+"""
+Primary/replica routing.
+
+settings.DATABASES always has the primary ('default') and, when
+CMS_REPLICA_DATABASE_URL is set, a 'replica'. Writes, migrations and every
+read outside a @replica_reads view go to the primary. The dashboards and
+student JSON APIs are decorated with @replica_reads and read from the replica,
+except for a browser that wrote recently: replica_pin_middleware sets a
+short-lived cookie on every unsafe request, so the next page shows its own
+writes rather than the replica's lagging copy.
+
+Sessions are always read from the primary (a fresh login must not look logged
+out), and cache fills run under primary_reads(): a payload built from a
+lagging replica would stay cached long after the replica caught up.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+PIN_COOKIE = 'cms_read_primary'
+PIN_SECONDS = 10
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PRIMARY_ONLY_APPS = ('sessions',)
+
+_read_db = ContextVar('read_db', default=PRIMARY)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return PRIMARY
+        return _read_db.get()
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # both aliases hold the same data
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+@contextmanager
+def reading_from(alias):
+    token = _read_db.set(alias)
+    try:
+        yield
+    finally:
+        _read_db.reset(token)
+
+
+def primary_reads():
+    return reading_from(PRIMARY)
+
+
+def _read_alias(request):
+    if not replica_configured() or request.COOKIES.get(PIN_COOKIE):
+        return PRIMARY
+    return REPLICA
+
+
+def replica_reads(view):
+    """Run the view's ORM reads against the replica (unless the browser is pinned to the primary)."""
+    if iscoroutinefunction(view):
+        async def wrapper(request, *args, **kwargs):
+            with reading_from(_read_alias(request)):
+                return await view(request, *args, **kwargs)
+    else:
+        def wrapper(request, *args, **kwargs):
+            with reading_from(_read_alias(request)):
+                return view(request, *args, **kwargs)
+    return wraps(view)(wrapper)
+
+
+def _pin(request, response):
+    if request.method not in SAFE_METHODS and replica_configured():
+        response.set_cookie(
+            PIN_COOKIE, '1', max_age=getattr(settings, 'REPLICA_PIN_SECONDS', PIN_SECONDS),
+            httponly=True, samesite='Lax',
+        )
+    return response
+
+
+@sync_and_async_middleware
+def replica_pin_middleware(get_response):
+    """Read-your-writes: after a POST (or other unsafe request) the browser reads from the primary for a while."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            return _pin(request, await get_response(request))
+    else:
+        def middleware(request):
+            return _pin(request, get_response(request))
+    return middleware
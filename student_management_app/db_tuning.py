@@ -0,0 +1,85 @@
+"""
+SQLite tuning for many concurrent staff users.
+
+apply_pragmas() runs on every new SQLite connection (connection_created, see
+signals.py): mmap/cache keep hot pages in memory and busy_timeout makes a
+writer wait for the lock instead of failing. With CONN_MAX_AGE the pragmas are
+paid once per connection rather than once per request.
+settings.SQLITE_PRAGMAS overrides individual values and settings.SQLITE_TUNING
+= False turns the layer off.
+
+WAL (readers proceed while one writer commits; synchronous NORMAL is then
+durable across application crashes) is opt-in with settings.SQLITE_WAL:
+journal_mode is stored in the database file and WAL adds -wal/-shm files next
+to it, so it must not be switched on as a side effect of any connection (a
+management command run against a checked-in database, say). Turning it off
+again takes an explicit PRAGMA journal_mode = DELETE.
+
+serialized_write wraps the hot write views: POSTs run one at a time per
+process, so threads of one server queue on a lock instead of on SQLite, and a
+request that still hits "database is locked" (another process held the lock
+past busy_timeout) is retried with backoff.
+"""
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, connection
+
+
+PRAGMAS = {
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # negative = KiB, i.e. 64 MiB
+    'busy_timeout': 5000,  # ms
+    'temp_store': 'MEMORY',
+}
+WAL_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+}
+WRITE_RETRIES = 5
+RETRY_DELAY = 0.05  # seconds, doubled per attempt
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_write_lock = threading.Lock()
+
+
+def tuning_enabled(conn=connection):
+    return conn.vendor == 'sqlite' and getattr(settings, 'SQLITE_TUNING', True)
+
+
+def pragmas():
+    wal = WAL_PRAGMAS if getattr(settings, 'SQLITE_WAL', False) else {}
+    return {**PRAGMAS, **wal, **getattr(settings, 'SQLITE_PRAGMAS', {})}
+
+
+def apply_pragmas(conn):
+    if not tuning_enabled(conn):
+        return
+    with conn.cursor() as cursor:
+        for name, value in pragmas().items():
+            if name == 'journal_mode' and conn.is_in_memory_db():
+                continue
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def is_locked_error(exc):
+    return 'locked' in str(exc)
+
+
+def serialized_write(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method in SAFE_METHODS or not tuning_enabled():
+            return view(request, *args, **kwargs)
+        for attempt in range(WRITE_RETRIES):
+            try:
+                with _write_lock:
+                    return view(request, *args, **kwargs)
+            except OperationalError as exc:
+                # inside an outer transaction the work cannot be replayed from here
+                if not is_locked_error(exc) or attempt == WRITE_RETRIES - 1 or connection.in_atomic_block:
+                    raise
+            time.sleep(RETRY_DELAY * 2 ** attempt)
+    return wrapper
@@ -0,0 +1,98 @@
+"""
+Streaming CSV exports of attendance registers and results.
+
+Rows are produced from .values_list().iterator() so memory stays flat no
+matter how large the term is, and the first bytes can be sent before the
+whole result set has been read.
+"""
+import csv
+
+from .models import Attendance, AttendanceReport, StudentResult
+
+
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() hands the formatted line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    """Format an iterable of rows as CSV text, one line at a time."""
+    writer = csv.writer(Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def attendance_register_rows(college, course_id, session_year_id, chunk_size=CHUNK_SIZE):
+    """
+    Pivoted register: one row per student, one column per attendance date,
+    'P'/'A' per cell and '' where no report was taken.
+    """
+    attendances = Attendance.objects.filter(
+        college=college, course_id=course_id, session_year_id=session_year_id,
+    ).order_by('attendance_date').values_list('id', 'attendance_date')
+    column_of = {}
+    header = ['student_id', 'username']
+    for index, (attendance_id, attendance_date) in enumerate(attendances):
+        column_of[attendance_id] = index
+        header.append(attendance_date.isoformat())
+    header += ['present', 'total']
+    yield header
+
+    reports = (
+        AttendanceReport.objects
+        .filter(
+            attendance__college=college,
+            attendance__course_id=course_id,
+            attendance__session_year_id=session_year_id,
+        )
+        .order_by('student_id')
+        .values_list('student_id', 'student__student_id', 'student__admin__username', 'attendance_id', 'status')
+        .iterator(chunk_size=chunk_size)
+    )
+
+    current = None
+    cells = []
+    label = ()
+    for student_pk, student_code, username, attendance_id, status in reports:
+        if student_pk != current:
+            if current is not None:
+                yield _register_row(label, cells)
+            current = student_pk
+            label = (student_code or '', username)
+            cells = [''] * len(column_of)
+        column = column_of.get(attendance_id)
+        if column is not None:
+            # None: the attendance was taken after the header went out
+            cells[column] = 'P' if status else 'A'
+    if current is not None:
+        yield _register_row(label, cells)
+
+
+def _register_row(label, cells):
+    present = cells.count('P')
+    return [*label, *cells, present, present + cells.count('A')]
+
+
+def results_rows(college, course_id=None, semester_id=None, chunk_size=CHUNK_SIZE):
+    """One row per StudentResult of the college, optionally narrowed to a course/semester."""
+    results = StudentResult.objects.filter(college=college)
+    if course_id:
+        results = results.filter(student__course_id=course_id)
+    if semester_id:
+        results = results.filter(student__semester_id=semester_id)
+
+    yield ['student_id', 'username', 'course', 'semester', 'subject', 'marks', 'grade', 'recorded_at']
+    yield from (
+        results
+        .order_by('student_id', 'subject_name')
+        .values_list(
+            'student__student_id', 'student__admin__username', 'student__course__name',
+            'student__semester__name', 'subject_name', 'marks', 'grade', 'created_at',
+        )
+        .iterator(chunk_size=chunk_size)
+    )
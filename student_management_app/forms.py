@@ -55,3 +55,8 @@ class HodRegistrationForm(forms.Form):
     email = forms.EmailField()
     password = forms.CharField(widget=forms.PasswordInput)
     department = forms.ModelChoiceField(queryset=Department.objects.all(), required=True)
+
+class BulkImportForm(forms.Form):
+    role = forms.ChoiceField(choices=[('student', 'Students'), ('staff', 'Staff')])
+    csv_file = forms.FileField(label="CSV file")
+    default_password = forms.CharField(required=False, widget=forms.PasswordInput, help_text="Used for rows without a password.")
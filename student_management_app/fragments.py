@@ -0,0 +1,72 @@
+"""
+Versioned keys for the dashboards' cached template fragments.
+
+The student/staff tables and leave lists on the HOD, staff and student
+dashboards are wrapped in {% cache %} blocks keyed by the college plus that
+college's data version. Saving or deleting a Students, Staffs, Course,
+Department, Semester, LeaveReportStaff or LeaveReportStudent row bumps the version
+(signals.py); bulk paths that bypass signals (leave decisions, CSV imports,
+the seed/synthetic loaders) call invalidate_fragments() themselves. A repeat
+dashboard view with nothing changed then serves the blocks from the cache.
+The views hand the blocks lazy data (querysets, or lazy() callables), so a
+cache hit skips their queries as well as their rendering.
+
+Changes that only show up indirectly (a renamed user) are picked up when the
+fragments expire after FRAGMENT_TIMEOUT.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from . import tenancy
+
+
+ALL = 'all'
+VERSION_KEY = 'fragments:college:{}:version'
+FRAGMENT_TIMEOUT = 10 * 60
+
+
+def lazy(func):
+    """Template-callable that runs func once, on first use."""
+    result = []
+
+    def wrapper():
+        if not result:
+            result.append(func())
+        return result[0]
+    return wrapper
+
+
+def _scope(college_id):
+    """Key part for a tenant scope: a college id, tenancy.ALL (every college) or None (no college)."""
+    if college_id is tenancy.ALL:
+        return ALL
+    return 'none' if college_id is None else college_id
+
+
+def version(college_id):
+    """The data version of a tenant scope (see _scope)."""
+    key = VERSION_KEY.format(_scope(college_id))
+    current = cache.get(key)
+    if current is None:
+        # unknown (cold or evicted): a fresh timestamp never matches an old fragment
+        cache.add(key, time.time(), None)
+        current = cache.get(key)
+    return current
+
+
+def fragment_context(college_id):
+    """What a dashboard template needs for its {% cache %} keys, for a tenant scope (see _scope)."""
+    return {
+        'fragment_timeout': FRAGMENT_TIMEOUT,
+        'fragment_college': _scope(college_id),
+        'fragment_version': version(college_id),
+    }
+
+
+def invalidate_fragments(college_ids):
+    """Bump the colleges' versions (and the all-colleges one) once the current transaction commits."""
+    keys = {VERSION_KEY.format(college_id) for college_id in college_ids if college_id is not None}
+    keys.add(VERSION_KEY.format(ALL))
+    transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, time.time()), None))
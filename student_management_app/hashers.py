@@ -0,0 +1,20 @@
+"""
+scrypt/Argon2 hashers whose cost comes from settings (PASSWORD_SCRYPT_WORK_FACTOR,
+PASSWORD_ARGON2_*), so it can be tuned per deployment. A stored hash made with
+other parameters is upgraded on the account's next login.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+class ScryptHasher(ScryptPasswordHasher):
+    work_factor = getattr(settings, 'PASSWORD_SCRYPT_WORK_FACTOR', ScryptPasswordHasher.work_factor)
+    parallelism = getattr(settings, 'PASSWORD_SCRYPT_PARALLELISM', ScryptPasswordHasher.parallelism)
+    # scrypt needs 128 * block_size * work_factor bytes; OpenSSL refuses more than 32 MiB unless told otherwise
+    maxmem = 2 * 128 * ScryptPasswordHasher.block_size * work_factor
+
+
+class Argon2Hasher(Argon2PasswordHasher):
+    time_cost = getattr(settings, 'PASSWORD_ARGON2_TIME_COST', Argon2PasswordHasher.time_cost)
+    memory_cost = getattr(settings, 'PASSWORD_ARGON2_MEMORY_COST', Argon2PasswordHasher.memory_cost)
+    parallelism = getattr(settings, 'PASSWORD_ARGON2_PARALLELISM', Argon2PasswordHasher.parallelism)
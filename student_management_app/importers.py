@@ -0,0 +1,230 @@
+"""
+Bulk CSV intake of students and staff.
+
+Uniqueness is checked with a handful of set-based queries, department/
+semester/course/session names resolve through maps prefetched once per
+import, passwords are hashed in a process pool (by import_students; the web
+upload hashes inline), and users plus their profiles are written with
+bulk_create in chunked transactions.
+"""
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .dashboard_stats import mark_stale
+from .fragments import invalidate_fragments
+from .models import (
+    Course, CustomUser, Department, Semester, SessionYear, Staffs, Students,
+)
+
+
+CHUNK_SIZE = 500
+# keep IN (...) lists under SQLite's bound-parameter limit
+LOOKUP_BATCH = 900
+
+STUDENT = 'student'
+STAFF = 'staff'
+
+REQUIRED_COLUMNS = {
+    STUDENT: ('username', 'email', 'student_id'),
+    STAFF: ('username', 'email', 'employee_id'),
+}
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def error(self, line, username, message):
+        self.errors.append({'line': line, 'username': username, 'error': message})
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def read_csv(fileobj):
+    """
+    Rows of a CSV upload/file as dicts with normalised, lower-case headers.
+    Raises UnicodeDecodeError for a non-UTF-8 upload and csv.Error for a malformed file, while iterating.
+    """
+    if isinstance(fileobj, (bytes, bytearray)):
+        fileobj = io.StringIO(fileobj.decode('utf-8-sig'))
+    reader = csv.DictReader(fileobj)
+    for row in reader:
+        yield {(k or '').strip().lower(): (v or '').strip() for k, v in row.items()}
+
+
+def _existing(queryset, field, values):
+    found = set()
+    values = list(values)
+    for start in range(0, len(values), LOOKUP_BATCH):
+        batch = values[start:start + LOOKUP_BATCH]
+        found.update(queryset.filter(**{f'{field}__in': batch}).values_list(field, flat=True))
+    return found
+
+
+def _name_map(queryset):
+    return {name.lower(): pk for pk, name in queryset.values_list('id', 'name')}
+
+
+def _lookups(college):
+    """Name -> id maps for everything a row may reference, one query per model."""
+    return {
+        'department': _name_map(Department.objects.filter(college=college)),
+        'semester': _name_map(Semester.objects.filter(college=college)),
+        'course': _name_map(Course.objects.filter(college=college)),
+        'session': {
+            f"{start}-{end}": pk
+            for pk, start, end in SessionYear.objects.filter(college=college)
+            .values_list('id', 'session_start_year', 'session_end_year')
+        },
+    }
+
+
+def _resolve(lookups, kind, value):
+    """Return (id, error) for an optional reference column."""
+    if not value:
+        return None, None
+    key = value.replace(' ', '') if kind == 'session' else value.lower()
+    pk = lookups[kind].get(key)
+    if pk is None:
+        return None, f"unknown {kind} '{value}'"
+    return pk, None
+
+
+def hash_passwords(passwords, workers=None):
+    """make_password for every entry, spread over a process pool when workers > 1."""
+    passwords = list(passwords)
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+    if workers <= 1 or len(passwords) < 2 * workers:
+        return [make_password(p) for p in passwords]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def _validate(college, rows, role, default_password, report):
+    """Drop invalid rows (recording why) and return the ones that can be inserted."""
+    id_field = 'student_id' if role == STUDENT else 'employee_id'
+    lookups = _lookups(college)
+    profile_model = Students if role == STUDENT else Staffs
+
+    rows = list(rows)
+    taken_usernames = _existing(CustomUser.objects.all(), 'username', {r.get('username') for r in rows})
+    taken_emails = _existing(CustomUser.objects.all(), 'email', {r.get('email') for r in rows})
+    taken_ids = _existing(profile_model.objects.filter(college=college), id_field, {r.get(id_field) for r in rows})
+
+    seen_usernames, seen_emails, seen_ids = set(), set(), set()
+    valid = []
+    for line, row in enumerate(rows, start=2):
+        username = row.get('username', '')
+        missing = [col for col in REQUIRED_COLUMNS[role] if not row.get(col)]
+        if missing:
+            report.error(line, username, f"missing {', '.join(missing)}")
+            continue
+        password = row.get('password') or default_password
+        if not password:
+            report.error(line, username, "missing password")
+            continue
+        if username in taken_usernames or username in seen_usernames:
+            report.error(line, username, "username already taken")
+            continue
+        if row['email'] in taken_emails or row['email'] in seen_emails:
+            report.error(line, username, "email already taken")
+            continue
+        if row[id_field] in taken_ids or row[id_field] in seen_ids:
+            report.error(line, username, f"{id_field} already used in this college")
+            continue
+
+        refs = {}
+        errors = []
+        for kind in ('department', 'semester', 'course', 'session'):
+            refs[kind], err = _resolve(lookups, kind, row.get(kind, ''))
+            if err:
+                errors.append(err)
+        if errors:
+            report.error(line, username, '; '.join(errors))
+            continue
+
+        seen_usernames.add(username)
+        seen_emails.add(row['email'])
+        seen_ids.add(row[id_field])
+        valid.append((row, password, refs))
+    return valid
+
+
+def _build_profile(role, college, user, row, refs):
+    if role == STUDENT:
+        return Students(
+            admin=user,
+            college=college,
+            student_id=row['student_id'],
+            roll_no=row.get('roll_no', ''),
+            department_id=refs['department'],
+            year_id=refs['semester'],
+            semester_id=refs['semester'],
+            course_id=refs['course'],
+            session_year_id=refs['session'],
+            phone=row.get('phone') or None,
+            address=row.get('address') or None,
+        )
+    return Staffs(
+        admin=user,
+        college=college,
+        employee_id=row['employee_id'],
+        department_id=refs['department'],
+        phone=row.get('phone') or None,
+        address=row.get('address') or None,
+    )
+
+
+def import_users(college, rows, role=STUDENT, default_password=None, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Create users and their Students/Staffs profiles from parsed CSV rows.
+    Returns an ImportReport; rows that fail validation are reported by line and skipped.
+    """
+    report = ImportReport()
+    valid = _validate(college, rows, role, default_password, report)
+    hashes = hash_passwords([password for _, password, _ in valid], workers=workers)
+    user_type = CustomUser.STUDENT if role == STUDENT else CustomUser.STAFF
+
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        users = [
+            CustomUser(
+                username=row['username'],
+                email=row['email'],
+                first_name=row.get('first_name', ''),
+                last_name=row.get('last_name', ''),
+                password=hashes[start + offset],
+                user_type=user_type,
+                college=college,
+                is_active=True,
+                is_staff=(role == STAFF),
+            )
+            for offset, (row, _, _) in enumerate(chunk)
+        ]
+        with transaction.atomic():
+            CustomUser.objects.bulk_create(users)
+            if any(u.pk is None for u in users):
+                # backends without RETURNING support: look the new ids up by username
+                ids = dict(CustomUser.objects.filter(username__in=[u.username for u in users]).values_list('username', 'id'))
+                for u in users:
+                    u.pk = ids[u.username]
+            profiles = [
+                _build_profile(role, college, user, row, refs)
+                for user, (row, _, refs) in zip(users, chunk)
+            ]
+            (Students if role == STUDENT else Staffs).objects.bulk_create(profiles)
+        report.created += len(chunk)
+    if report.created:
+        # bulk_create sends no post_save signals
+        mark_stale(college.id)
+        invalidate_fragments([college.id])
+    return report
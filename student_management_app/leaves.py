@@ -0,0 +1,129 @@
+"""
+Leave queries shared by the HOD, staff and student views.
+
+Every listing comes back fully joined (the applicant's user row is fetched in
+the same query) and trimmed to the displayed columns, so rendering a page of
+leaves costs one query no matter how many rows it shows.
+"""
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import (
+    LEAVE_APPROVED, LEAVE_PENDING, LEAVE_REJECTED, LeaveReportStaff, LeaveReportStudent,
+)
+from .colleges import get_colleges
+from .fragments import invalidate_fragments
+from .pagination import akeyset_page, keyset_page
+from .tenancy import ALL
+
+
+PAGE_SIZE = 50
+# ids per UPDATE ... WHERE id IN (...), under SQLite's bound-parameter limit
+DECISION_BATCH = 900
+
+STAFF = 'staff'
+STUDENT = 'student'
+
+# pass as college to span every college (superuser dashboards)
+ALL_COLLEGES = ALL
+
+_MODELS = {
+    STAFF: (LeaveReportStaff, 'staff'),
+    STUDENT: (LeaveReportStudent, 'student'),
+}
+
+APPROVE = 'approve'
+REJECT = 'reject'
+DECISIONS = {APPROVE: LEAVE_APPROVED, REJECT: LEAVE_REJECTED}
+
+
+def _scoped(kind, college):
+    """Leaves of one kind whose applicant belongs to the college (instance or id), or to any college for ALL_COLLEGES."""
+    model, _ = _MODELS[kind]
+    return model.tenant.for_college(college)
+
+
+def _joined(qs, kind):
+    _, applicant = _MODELS[kind]
+    return qs.select_related(f'{applicant}__admin').only(
+        'id', 'date', 'message', 'status',
+        f'{applicant}__id', f'{applicant}__admin__id', f'{applicant}__admin__username',
+    )
+
+
+def _pending(kind, college):
+    return _joined(_scoped(kind, college).filter(status=LEAVE_PENDING), kind)
+
+
+def pending_leaves(kind, college, after=None, limit=PAGE_SIZE):
+    """One page of pending leaves, oldest first. Returns (leaves, next_cursor)."""
+    return keyset_page(_pending(kind, college), 'date', after=after, limit=limit)
+
+
+async def apending_leaves(kind, college, after=None, limit=PAGE_SIZE):
+    """Async pending_leaves()."""
+    return await akeyset_page(_pending(kind, college), 'date', after=after, limit=limit)
+
+
+def leave_counts(college):
+    """Pending/total counts for both kinds, one aggregate query per kind."""
+    counts = {}
+    for kind in _MODELS:
+        row = _scoped(kind, college).aggregate(total=Count('id'), pending=Count('id', filter=Q(status=LEAVE_PENDING)))
+        counts[f'{kind}_total'] = row['total']
+        counts[f'{kind}_pending'] = row['pending']
+    return counts
+
+
+def get_leave(kind, college, leave_id):
+    """A single joined leave of the college, or None."""
+    return _joined(_scoped(kind, college), kind).filter(id=leave_id).first()
+
+
+def own_leaves(kind, applicant):
+    """The applicant's own leaves, newest first."""
+    model, field = _MODELS[kind]
+    return model.objects.filter(**{field: applicant}).only('id', 'date', 'message', 'status').order_by('-date', '-id')
+
+
+def serialize(leave, kind):
+    _, applicant = _MODELS[kind]
+    return {
+        'id': leave.id,
+        'kind': kind,
+        'username': getattr(leave, applicant).admin.username,
+        'date': leave.date.isoformat(),
+        'message': leave.message,
+        'status': leave.get_status_display().lower(),
+    }
+
+
+def apply_decisions(college, decisions):
+    """
+    Approve/reject many pending leaves of the college at once.
+
+    decisions is an iterable of (kind, leave_id, decision) with decision in
+    DECISIONS. Ids are grouped per (kind, decision) and each group is applied
+    with a single UPDATE restricted to the college's still-pending leaves, so
+    ids of another college or already decided ones are counted as skipped.
+    Returns {'approved': n, 'rejected': n, 'skipped': n}.
+    """
+    groups = {}
+    for kind, leave_id, decision in decisions:
+        groups.setdefault((kind, decision), set()).add(leave_id)
+
+    summary = {'approved': 0, 'rejected': 0, 'skipped': 0}
+    with transaction.atomic():
+        for (kind, decision), ids in groups.items():
+            ids = sorted(ids)
+            updated = 0
+            for start in range(0, len(ids), DECISION_BATCH):
+                updated += _scoped(kind, college).filter(
+                    id__in=ids[start:start + DECISION_BATCH], status=LEAVE_PENDING,
+                ).update(status=DECISIONS[decision])
+            summary['approved' if decision == APPROVE else 'rejected'] += updated
+            summary['skipped'] += len(ids) - updated
+        if summary['approved'] or summary['rejected']:
+            # UPDATE sends no signals
+            invalidate_fragments([c.id for c in get_colleges()] if college is ALL_COLLEGES else [getattr(college, 'pk', college)])
+    return summary
@@ -0,0 +1,211 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, reverse
+
+from student_management_app import urls as app_urls
+from student_management_app.management.throwaway import throwaway_environment
+from student_management_app.models import (
+    AttendanceReport, AttendanceSummary, CustomUser, LeaveReportStaff, LeaveReportStudent, StudentResult,
+)
+from student_management_app.synthetic import generate
+
+
+DEFAULT_SIZES = ["1x50x5x3", "2x200x10x5"]
+
+# url_name prefixes -> which seeded account requests the page; first match wins
+ROLE_PREFIXES = (
+    ('api_students_page', 'hod'),
+    ('api_staffs_page', 'hod'),
+    ('api_pending_leaves', 'hod'),
+    ('api_analytics', 'superuser'),
+    ('api_student', 'student'),
+    ('student', 'student'),
+    ('staff', 'staff'),
+    ('export', 'staff'),
+    ('hod', 'hod'),
+    ('admin_home', 'hod'),
+    ('metrics', 'superuser'),
+)
+
+
+def parse_size(size):
+    """'NxMxDxS' -> dict(colleges, students, days, subjects)."""
+    try:
+        colleges, students, days, subjects = (int(part) for part in size.lower().split('x'))
+    except ValueError:
+        raise CommandError(f"Bad size '{size}'; expected COLLEGESxSTUDENTSxDAYSxSUBJECTS, e.g. 2x200x10x5.")
+    return {'colleges': colleges, 'students': students, 'days': days, 'subjects': subjects}
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q / 100))]
+
+
+def role_for(url_name):
+    for prefix, role in ROLE_PREFIXES:
+        if url_name.startswith(prefix):
+            return role
+    return None
+
+
+def url_cases():
+    """(url_name, role, url) for every named route of the app, with ids and query strings taken from the seeded data."""
+    student_result = StudentResult.objects.order_by('id').values_list('student_id', 'id').first()
+    summary = AttendanceSummary.objects.order_by('id').values_list('course_id', 'session_year_id').first()
+    samples = {
+        'student_id': student_result[0] if student_result else None,
+        'result_id': student_result[1] if student_result else None,
+        'attendance_report_id': AttendanceReport.objects.order_by('id').values_list('id', flat=True).first(),
+    }
+    leave_ids = {
+        'hod_process_staff_leave': LeaveReportStaff.objects.order_by('id').values_list('id', flat=True).first(),
+        'hod_process_student_leave': LeaveReportStudent.objects.order_by('id').values_list('id', flat=True).first(),
+    }
+    query = {}
+    if summary:
+        course_id, session_id = summary
+        query = {
+            'staff_attendance': f"?course={course_id}&session={session_id}&attendance_date=2024-07-01",
+            'export_attendance_register': f"?course={course_id}&session={session_id}",
+        }
+
+    cases = []
+    seen = set()
+    for pattern in app_urls.urlpatterns:
+        name = pattern.name
+        if not name or pattern.pattern.regex.pattern in seen:
+            continue
+        seen.add(pattern.pattern.regex.pattern)
+        kwargs = {}
+        for param in pattern.pattern.converters:
+            kwargs[param] = leave_ids.get(name) if param == 'leave_id' else samples.get(param)
+        if any(v is None for v in kwargs.values()):
+            continue
+        try:
+            url = reverse(f'student_management_app:{name}', kwargs=kwargs)
+        except NoReverseMatch:
+            continue
+        cases.append((name, role_for(name), url + query.get(name, '')))
+    return cases
+
+
+def role_users(student_id):
+    users = {
+        'hod': CustomUser.objects.filter(user_type=CustomUser.HOD, college__isnull=False).order_by('id').first(),
+        'staff': CustomUser.objects.filter(user_type=CustomUser.STAFF, staff_profile__isnull=False).order_by('id').first(),
+        'student': CustomUser.objects.filter(student_profile__id=student_id).first(),
+        'superuser': CustomUser.objects.filter(is_superuser=True).first()
+        or CustomUser.objects.create_superuser('benchmark_root', 'benchmark_root@example.com', 'benchmark'),
+    }
+    return users
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed throwaway databases of several sizes (seed_scale's generator), time every URL of the app with "
+        "the test client, and record status, query count and p50/p95 latency. --output writes a JSON baseline; "
+        "--compare checks a run against one and fails on regressions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="COLLEGESxSTUDENTSxDAYSxSUBJECTS, e.g. 2x200x10x5")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed requests per URL (after one warm-up request).")
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--compare", help="Baseline JSON to compare against.")
+        parser.add_argument("--latency-tolerance", type=float, default=0.5, help="Allowed relative p95 increase (0.5 = +50%%).")
+        parser.add_argument("--min-latency-delta", type=float, default=5.0, help="Ignore p95 increases smaller than this many ms.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"]) as fh:
+                baseline = json.load(fh)
+
+        report = {'repeat': options["repeat"], 'sizes': {}}
+        for size in options["sizes"]:
+            params = parse_size(size)
+            with throwaway_environment():
+                generate(prefix='bench', **params)
+                report['sizes'][size] = self.run_size(size, options["repeat"])
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+
+        if baseline is not None:
+            regressions = self.compare(baseline, report, options["latency_tolerance"], options["min_latency_delta"])
+            if regressions:
+                raise CommandError(f"{regressions} regressions against {options['compare']}.")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}."))
+
+    def run_size(self, size, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Size {size}"))
+        cases = url_cases()
+        student_id = StudentResult.objects.order_by('id').values_list('student_id', flat=True).first()
+        users = role_users(student_id)
+        results = {}
+        for name, role, url in cases:
+            # a broken page is reported as a 500 in the results, not raised
+            client = Client(raise_request_exception=False)
+            if role:
+                client.force_login(users[role])
+            self.fetch(client, url)  # warm-up: fills per-process caches
+            timings = []
+            queries = 0
+            status = None
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    status = self.fetch(client, url)
+                    timings.append((time.perf_counter() - start) * 1000)
+                queries = max(queries, len(ctx.captured_queries))
+            if status == 405:
+                self.stdout.write(f"  {name:<28} POST only, skipped")
+                continue
+            timings.sort()
+            results[name] = {
+                'url': url,
+                'status': status,
+                'queries': queries,
+                'p50_ms': round(_percentile(timings, 50), 2),
+                'p95_ms': round(_percentile(timings, 95), 2),
+            }
+            row = results[name]
+            self.stdout.write(f"  {name:<28} {status} {queries:>3} queries  p50 {row['p50_ms']:>8.2f}ms  p95 {row['p95_ms']:>8.2f}ms")
+        return results
+
+    def fetch(self, client, url):
+        response = client.get(url)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response.status_code
+
+    def compare(self, baseline, report, tolerance, min_delta):
+        regressions = 0
+        for size, views in report['sizes'].items():
+            base_views = baseline.get('sizes', {}).get(size)
+            if base_views is None:
+                self.stdout.write(self.style.WARNING(f"Size {size} not in baseline, not compared."))
+                continue
+            for name, row in views.items():
+                base = base_views.get(name)
+                if base is None:
+                    continue
+                problems = []
+                if row['queries'] > base['queries']:
+                    problems.append(f"queries {base['queries']} -> {row['queries']}")
+                if row['p95_ms'] > base['p95_ms'] * (1 + tolerance) and row['p95_ms'] - base['p95_ms'] > min_delta:
+                    problems.append(f"p95 {base['p95_ms']:.2f}ms -> {row['p95_ms']:.2f}ms")
+                if row['status'] != base['status']:
+                    problems.append(f"status {base['status']} -> {row['status']}")
+                if problems:
+                    regressions += 1
+                    self.stdout.write(self.style.ERROR(f"{size} {name}: {'; '.join(problems)}"))
+        return regressions
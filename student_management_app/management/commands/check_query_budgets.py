@@ -0,0 +1,63 @@
+import io
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from student_management_app.management.throwaway import throwaway_environment
+from student_management_app.metrics import query_budgets
+from student_management_app.models import CustomUser
+from student_management_app.query_plans import budget_cases
+
+
+class Command(BaseCommand):
+    help = (
+        "GET every budgeted view and fail if any does not answer 200 or issues more SQL queries than its "
+        "query budget (metrics.query_budgets())"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--use-current-db", action="store_true",
+            help="Run against the configured database instead of a throwaway test database seeded with seed_demo.",
+        )
+        parser.add_argument(
+            "--cold", action="store_true",
+            help="Measure the first request to each view instead of the steady state after a warm-up request fills the caches.",
+        )
+
+    def handle(self, *args, **options):
+        if options["use_current_db"]:
+            failures = self.run_cases(options["cold"])
+        else:
+            with throwaway_environment():
+                call_command("seed_demo", stdout=io.StringIO())
+                failures = self.run_cases(options["cold"])
+
+        if failures:
+            raise CommandError(f"{failures} views failed or exceed their query budget.")
+        self.stdout.write(self.style.SUCCESS("All views within their query budgets."))
+
+    def run_cases(self, cold=False):
+        budgets = query_budgets()
+        failures = 0
+        for name, username, url in budget_cases():
+            client = Client()
+            if username:
+                client.force_login(CustomUser.objects.get(username=username))
+            if not cold:
+                client.get(url)
+            response = client.get(url)
+            queries = response.wsgi_request.query_metrics.queries
+            budget = budgets.get(name)
+            line = f"{name:<28} {response.status_code} {queries:>3} queries (budget {budget})"
+            # a redirect to the login page or an error page issues few queries, so only a 200 counts
+            if response.status_code != 200:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f"{line}: expected a 200"))
+            elif budget is not None and queries > budget:
+                failures += 1
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        return failures
@@ -0,0 +1,66 @@
+import io
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from student_management_app.management.throwaway import throwaway_environment
+from student_management_app.metrics import query_budgets
+from student_management_app.query_plans import check_query_plans
+
+
+def _summary(sql, width=110):
+    # the SELECT list is long and says little about the plan: start at the FROM clause
+    sql = sql[sql.find(' FROM ') + 1:] if ' FROM ' in sql else sql
+    return sql if len(sql) <= width else sql[:width - 3] + '...'
+
+
+class Command(BaseCommand):
+    help = (
+        "GET every budgeted view, run EXPLAIN QUERY PLAN on the SELECTs it issues, and fail if any falls back "
+        "to a full table scan or sorts a whole result to return one page (SQLite only)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("views", nargs="*", help=f"Limit to these views: {', '.join(query_budgets())}")
+        parser.add_argument("--show-plans", action="store_true", help="Print the full plan for every query.")
+        parser.add_argument(
+            "--use-current-db", action="store_true",
+            help="Run against the configured database instead of a throwaway test database seeded with seed_demo.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("check_query_plans only understands SQLite query plans.")
+
+        if options["use_current_db"]:
+            failures = self.check_plans(options["views"] or None, options["show_plans"])
+        else:
+            with throwaway_environment():
+                call_command("seed_demo", stdout=io.StringIO())
+                failures = self.check_plans(options["views"] or None, options["show_plans"])
+
+        if failures:
+            raise CommandError(f"{failures} failures: views that did not answer 200, or queries with a full table scan or a sorted page.")
+        self.stdout.write(self.style.SUCCESS("All queries of the budgeted views use an index and read pages in order."))
+
+    def check_plans(self, views, show_plans):
+        failures = 0
+        for view, status, results in check_query_plans(views):
+            if status != 200:
+                # an error page or a redirect to the login page does not run the view's queries
+                failures += 1
+                self.stdout.write(self.style.ERROR(f"{view}: answered {status}, expected a 200"))
+                continue
+            for sql, plan, problems in results:
+                if problems:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(f"{view}: {_summary(sql)} -> {'; '.join(problems)}"))
+                elif show_plans:
+                    self.stdout.write(self.style.SUCCESS(f"{view}: {_summary(sql)} -> ok"))
+                if problems or show_plans:
+                    for line in plan:
+                        self.stdout.write(f"    {line}")
+            if not show_plans:
+                self.stdout.write(f"{view:<28} {len(results):>3} queries checked")
+        return failures
@@ -0,0 +1,49 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from student_management_app.exports import CHUNK_SIZE, attendance_register_rows, csv_lines, results_rows
+from student_management_app.models import College
+
+
+class Command(BaseCommand):
+    help = "Stream an attendance register (students x dates) or a results sheet for a college as CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--college", required=True, help="College code")
+        parser.add_argument("--course", type=int, help="Course id")
+        parser.add_argument("--session", type=int, help="SessionYear id (required for the attendance register)")
+        parser.add_argument("--semester", type=int, help="Semester id (results only)")
+        parser.add_argument("--results", action="store_true", help="Export StudentResult rows instead of the attendance register.")
+        parser.add_argument("-o", "--output", default="-", help="Output file, '-' for stdout (default).")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        college = College.objects.filter(code__iexact=options["college"]).first()
+        if not college:
+            raise CommandError(f"College '{options['college']}' not found.")
+
+        if options["results"]:
+            rows = results_rows(college, options["course"], options["semester"], chunk_size=options["chunk_size"])
+        else:
+            if not (options["course"] and options["session"]):
+                raise CommandError("--course and --session are required for the attendance register.")
+            rows = attendance_register_rows(college, options["course"], options["session"], chunk_size=options["chunk_size"])
+
+        if options["output"] == "-":
+            out = sys.stdout
+            close = False
+        else:
+            out = open(options["output"], "w", newline="", encoding="utf-8")
+            close = True
+        lines = 0
+        try:
+            for line in csv_lines(rows):
+                out.write(line)
+                lines += 1
+        finally:
+            if close:
+                out.close()
+
+        if close:
+            self.stdout.write(self.style.SUCCESS(f"Wrote {lines} rows to {options['output']}."))
@@ -0,0 +1,59 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from student_management_app.checks import STALE_WORKERS_WARNING, process_local_cache
+from student_management_app.importers import CHUNK_SIZE, STAFF, STUDENT, import_users, read_csv
+from student_management_app.models import College
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-import students (or staff) from a CSV file. Columns: username, email, password, "
+        "student_id/employee_id, roll_no, department, semester, course, session (e.g. 2024-2025), "
+        "first_name, last_name, phone, address"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path")
+        parser.add_argument("--college", required=True, help="College code")
+        parser.add_argument("--role", choices=[STUDENT, STAFF], default=STUDENT)
+        parser.add_argument("--default-password", help="Password for rows whose password column is empty.")
+        parser.add_argument("--workers", type=int, default=None, help="Password hashing processes (default: up to 4).")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument("--errors", help="Write the per-row error report to this CSV file.")
+
+    def handle(self, *args, **options):
+        college = College.objects.filter(code__iexact=options["college"]).first()
+        if not college:
+            raise CommandError(f"College '{options['college']}' not found.")
+
+        try:
+            with open(options["csv_path"], newline="", encoding="utf-8-sig") as fh:
+                rows = list(read_csv(fh))
+        except (OSError, csv.Error) as exc:
+            raise CommandError(str(exc))
+        except UnicodeDecodeError:
+            raise CommandError(f"{options['csv_path']} is not UTF-8 encoded.")
+
+        report = import_users(
+            college, rows,
+            role=options["role"],
+            default_password=options["default_password"],
+            workers=options["workers"],
+            chunk_size=options["chunk_size"],
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {report.created} {options['role']} accounts into {college.name}."))
+        if report.errors:
+            self.stdout.write(self.style.WARNING(f"{len(report.errors)} rows skipped."))
+            if options["errors"]:
+                with open(options["errors"], "w", newline="", encoding="utf-8") as fh:
+                    writer = csv.DictWriter(fh, fieldnames=["line", "username", "error"])
+                    writer.writeheader()
+                    writer.writerows(report.errors)
+            else:
+                for err in report.errors[:50]:
+                    self.stdout.write(f"  line {err['line']} ({err['username'] or '-'}): {err['error']}")
+        if process_local_cache():
+            self.stdout.write(self.style.WARNING(STALE_WORKERS_WARNING))
@@ -0,0 +1,125 @@
+import threading
+import time
+from http.client import HTTPConnection, HTTPSConnection
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from student_management_app.models import CustomUser, StudentResult
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q / 100))]
+
+
+class Worker(threading.Thread):
+    """Sends GETs over one keep-alive connection until the deadline or request quota is reached."""
+
+    def __init__(self, base, paths, headers, deadline, quota):
+        super().__init__(daemon=True)
+        parts = urlsplit(base)
+        self.conn_class = HTTPSConnection if parts.scheme == 'https' else HTTPConnection
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.paths = paths
+        self.headers = headers
+        self.deadline = deadline
+        self.quota = quota
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+
+    def run(self):
+        conn = self.conn_class(self.netloc, timeout=30)
+        sent = 0
+        while time.perf_counter() < self.deadline and (self.quota is None or sent < self.quota):
+            path = self.prefix + self.paths[sent % len(self.paths)]
+            sent += 1
+            start = time.perf_counter()
+            try:
+                conn.request('GET', path, headers=self.headers)
+                response = conn.getresponse()
+                response.read()
+            except OSError:
+                self.errors += 1
+                conn.close()
+                conn = self.conn_class(self.netloc, timeout=30)
+                continue
+            self.latencies.append(time.perf_counter() - start)
+            self.statuses[response.status] = self.statuses.get(response.status, 0) + 1
+        conn.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer a running server (e.g. runserver/gunicorn for WSGI, uvicorn/daphne for asgi.py) with "
+        "concurrent GETs as a given user and report requests/sec and latency percentiles. "
+        "Pass --compare-url to run the same load against a second server, e.g. WSGI vs ASGI."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", required=True, help="Base URL of the server under test, e.g. http://127.0.0.1:8000")
+        parser.add_argument("--compare-url", help="Second server to run the identical load against.")
+        parser.add_argument("--username", help="Log in as this user (a session is created in the configured session store).")
+        parser.add_argument("--path", action="append", dest="paths", help="Path to request (repeatable). Defaults to the student dashboard APIs.")
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run.")
+        parser.add_argument("--requests", type=int, help="Stop each worker after this many requests instead of after --duration.")
+
+    def handle(self, *args, **options):
+        headers = {'Connection': 'keep-alive'}
+        user = None
+        if options["username"]:
+            user = CustomUser.objects.filter(username=options["username"]).first()
+            if user is None:
+                raise CommandError(f"No user named {options['username']}.")
+            client = Client()
+            client.force_login(user)
+            headers['Cookie'] = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+        paths = options["paths"] or self.default_paths(user)
+        if not paths:
+            raise CommandError("No paths to request; pass --path (and --username for pages that need a login).")
+
+        for base in filter(None, (options["url"], options["compare_url"])):
+            self.run_load(base, paths, headers, options)
+
+    def default_paths(self, user):
+        if user is None or user.user_type != CustomUser.STUDENT:
+            return []
+        paths = [reverse('student_management_app:api_student_dashboard')]
+        result = StudentResult.objects.filter(student__admin=user).order_by('id').values_list('student_id', 'id').first()
+        if result:
+            paths.append(reverse('student_management_app:api_student_subject_data', args=result))
+        return paths
+
+    def run_load(self, base, paths, headers, options):
+        deadline = time.perf_counter() + (options["duration"] if options["requests"] is None else 24 * 3600)
+        workers = [Worker(base, paths, headers, deadline, options["requests"]) for _ in range(options["concurrency"])]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for worker in workers for latency in worker.latencies)
+        statuses = {}
+        for worker in workers:
+            for status, count in worker.statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+        errors = sum(worker.errors for worker in workers)
+
+        self.stdout.write(self.style.SUCCESS(f"{base}  ({options['concurrency']} concurrent, {elapsed:.1f}s)"))
+        self.stdout.write(f"  requests/sec  {len(latencies) / elapsed:.1f}")
+        self.stdout.write(f"  requests      {len(latencies)}  errors {errors}")
+        self.stdout.write(f"  statuses      {', '.join(f'{s}: {n}' for s, n in sorted(statuses.items())) or '-'}")
+        self.stdout.write(
+            f"  latency ms    p50 {_percentile(latencies, 50) * 1000:.1f}  "
+            f"p95 {_percentile(latencies, 95) * 1000:.1f}  max {(latencies[-1] if latencies else 0) * 1000:.1f}"
+        )
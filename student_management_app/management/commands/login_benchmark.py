@@ -0,0 +1,109 @@
+import time
+
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from student_management_app import throttling
+from student_management_app.management.throwaway import throwaway_environment
+from student_management_app.models import CustomUser
+from student_management_project.passwords import available_hashers, password_hashers
+
+
+PASSWORD = "BenchPass123!"
+BENCH_IP = '198.51.100.7'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure full logins per second on one core (a single-threaded client) for each available password hasher, "
+        "the first login after switching hashers (verify with the old hasher, re-hash with the new one), and how fast "
+        "the login rate limiter turns away a brute-force run; uses a throwaway test database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=10, help="Logins timed per hasher (default 10).")
+        parser.add_argument("--rejections", type=int, default=500, help="Throttled attempts timed (default 500).")
+        parser.add_argument(
+            "--hashers", nargs="+", choices=available_hashers(),
+            help="Hashers to measure (default: every available one).",
+        )
+        parser.add_argument(
+            "--from-hasher", default='pbkdf2', choices=available_hashers(),
+            help="Hasher the existing accounts use, for the re-hash-on-login measurement (default pbkdf2).",
+        )
+
+    def handle(self, *args, **options):
+        if options["logins"] < 1:
+            raise CommandError("--logins must be at least 1.")
+        hashers = options["hashers"] or available_hashers()
+
+        with throwaway_environment():
+            self.stdout.write(self.style.MIGRATE_HEADING("Logins per second, one core:"))
+            for name in hashers:
+                with override_settings(PASSWORD_HASHERS=password_hashers(name)):
+                    users = self.make_users(name, options["logins"])
+                    self.report(name, self.time_logins(users))
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"First login after switching from {options['from_hasher']}:"))
+            for name in hashers:
+                if name == options["from_hasher"]:
+                    continue
+                with override_settings(PASSWORD_HASHERS=password_hashers(options["from_hasher"])):
+                    users = self.make_users(f"{options['from_hasher']}_to_{name}", options["logins"])
+                with override_settings(PASSWORD_HASHERS=password_hashers(name)):
+                    elapsed = self.time_logins(users)
+                    self.check_rehashed(users)
+                self.report(f"{options['from_hasher']} -> {name}", elapsed)
+
+            self.stdout.write(self.style.MIGRATE_HEADING("Rate limiter:"))
+            self.time_rejections(options["rejections"])
+
+    def make_users(self, label, count):
+        # one hash shared by every account: the benchmark times logins, not account creation
+        password_hash = make_password(PASSWORD)
+        CustomUser.objects.bulk_create([
+            CustomUser(username=f"bench_{label}_{i}", password=password_hash, user_type=CustomUser.STUDENT)
+            for i in range(count)
+        ])
+        return [f"bench_{label}_{i}" for i in range(count)]
+
+    def time_logins(self, usernames):
+        """Seconds per login: POST the login form from a fresh client, as a browser would."""
+        url = reverse('student_management_app:login')
+        start = time.perf_counter()
+        for username in usernames:
+            client = Client(REMOTE_ADDR=BENCH_IP)
+            client.post(url, {'username': username, 'password': PASSWORD})
+            if '_auth_user_id' not in client.session:
+                raise CommandError(f"Login failed for {username}.")
+        return (time.perf_counter() - start) / len(usernames)
+
+    def check_rehashed(self, usernames):
+        algorithm = get_hasher().algorithm
+        passwords = CustomUser.objects.filter(username__in=usernames).values_list('password', flat=True)
+        stale = sum(1 for password in passwords if not password.startswith(f"{algorithm}$"))
+        if stale:
+            raise CommandError(f"{stale} accounts were not re-hashed with {algorithm}.")
+
+    def report(self, label, seconds):
+        self.stdout.write(f"  {label:<20} {1 / seconds:>8.1f} logins/s  {seconds * 1000:>8.1f} ms/login")
+
+    def time_rejections(self, count):
+        url = reverse('student_management_app:login')
+        username = "bench_brute_force"
+        limit = throttling.login_limits()['username'][0]
+        client = Client(REMOTE_ADDR=BENCH_IP)
+        for _ in range(limit):
+            client.post(url, {'username': username, 'password': 'wrong'})
+        start = time.perf_counter()
+        for _ in range(count):
+            client.post(url, {'username': username, 'password': 'wrong'})
+        elapsed = time.perf_counter() - start
+        throttling.clear_failed_logins(BENCH_IP, username)
+        self.stdout.write(
+            f"  {'throttled attempts':<20} {count / elapsed:>8.1f} rejections/s  {elapsed / count * 1000:>8.2f} ms each "
+            f"(after {limit} failures)"
+        )
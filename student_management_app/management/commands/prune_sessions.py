@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+DB_ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired rows from django_session in small batches, so a big backlog never holds SQLite's "
+        "write lock for long (unlike clearsessions' single DELETE); run it from cron"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Sessions deleted per statement (default 1000).")
+        parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between batches, letting other writers in.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the expired sessions.")
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE not in DB_ENGINES:
+            self.stdout.write(f"{settings.SESSION_ENGINE} keeps no session rows; nothing to prune.")
+            return
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+        if options["dry_run"]:
+            self.stdout.write(f"{expired.count()} expired sessions.")
+            return
+
+        deleted = 0
+        while True:
+            keys = list(expired.values_list('session_key', flat=True)[:batch_size])
+            if not keys:
+                break
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+            if len(keys) < batch_size:
+                break
+            time.sleep(options["pause"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired sessions."))
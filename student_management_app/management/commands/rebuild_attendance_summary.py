@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from student_management_app.attendance import rebuild_summaries, verify_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the AttendanceSummary table from AttendanceReport and verify it"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verify-only", action="store_true", help="Only compare the table with a fresh tally, do not rebuild.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not options["verify_only"]:
+            written = rebuild_summaries(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} attendance summary rows."))
+
+        mismatches = verify_summaries()
+        if mismatches:
+            for key, expected, stored in mismatches[:20]:
+                self.stdout.write(self.style.ERROR(
+                    f"student={key[0]} course={key[1]} session={key[2]}: expected {expected[0]}/{expected[1]}, stored {stored[0]}/{stored[1]}"
+                ))
+            raise CommandError(f"{len(mismatches)} attendance summary rows out of sync.")
+        self.stdout.write(self.style.SUCCESS("Attendance summaries verified."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from student_management_app.analytics import np, refresh_analytics
+
+
+class Command(BaseCommand):
+    help = "Recompute the cross-college AnalyticsRollup table (schedule it, e.g. nightly from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--no-percentiles", action="store_true", help="Skip median/90th percentile marks (avoids reading every result row).")
+
+    def handle(self, *args, **options):
+        written = refresh_analytics(percentiles=not options["no_percentiles"])
+        if options["no_percentiles"]:
+            detail = "no percentiles"
+        else:
+            detail = "percentiles via " + ("numpy" if np is not None else "pure Python")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} analytics rollup rows ({detail})."))
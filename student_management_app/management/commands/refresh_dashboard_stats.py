@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from student_management_app.checks import process_local_cache
+from student_management_app.dashboard_stats import refresh_stats
+from student_management_app.models import College
+
+
+class Command(BaseCommand):
+    help = "Recompute the cached HOD dashboard statistics for every college (and the all-colleges view); run periodically or after bulk loads"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--college", help="Only refresh the college with this code.")
+
+    def handle(self, *args, **options):
+        if process_local_cache():
+            raise CommandError(
+                "The default cache is process-local, so snapshots written here would never reach the web workers. "
+                "Set CMS_CACHE_URL to the shared cache they use."
+            )
+        colleges = College.objects.order_by('id')
+        if options["college"]:
+            colleges = colleges.filter(code=options["college"])
+        refreshed = 0
+        for college_id in colleges.values_list('id', flat=True):
+            refresh_stats(college_id)
+            refreshed += 1
+        if not options["college"]:
+            refresh_stats(None)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed dashboard statistics for {refreshed} colleges."))
@@ -1,173 +1,252 @@
-from django.core.management.base import BaseCommand
+import datetime
+import random
+import string
+
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from django.utils import timezone
 
-
+from student_management_app.attendance import refresh_summaries
+from student_management_app.checks import STALE_WORKERS_WARNING, process_local_cache
+from student_management_app.colleges import invalidate_colleges
+from student_management_app.dashboard_stats import mark_stale
+from student_management_app.fragments import invalidate_fragments
 from student_management_app.models import (
     College, Department, Semester, Course, SessionYear,
-    CustomUser, Staffs, AdminHOD, Students, Attendance, AttendanceReport, StudentResult
+    CustomUser, Staffs, AdminHOD, Students, Attendance, AttendanceReport, AttendanceSummary, StudentResult
 )
+from student_management_app.student_cache import invalidate_students
+from student_management_app.synthetic import grade_for
 
 User = get_user_model()
 
+ADMIN_PASSWORD = "Password123!"
+HOD_PASSWORD = "HodPass123!"
+STAFF_PASSWORD = "StaffPass123!"
+STUDENT_PASSWORD = "Student123!"
+SUBJECTS = ("Mathematics", "Physics", "Chemistry", "English", "Computer Science", "Electronics", "Statistics", "Economics")
+
+
+def college_suffix(index):
+    """0 -> 'A', 25 -> 'Z', 26 -> 'AA', ... so demo colleges keep the DEMA/DEMB naming beyond two."""
+    suffix = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        suffix = string.ascii_uppercase[rem] + suffix
+    return suffix
+
+
+def demo_college(index):
+    suffix = college_suffix(index)
+    return {
+        "name": f"Demo College {suffix}",
+        "code": f"DEM{suffix}",
+        "tagline": f"Learning for tomorrow - {suffix}",
+        "admin_username": f"admin_dem{suffix.lower()}",
+        "admin_email": f"admin_dem{suffix.lower()}@example.com",
+    }
+
+
 class Command(BaseCommand):
-    help = "Seed demo colleges, users and minimal data for testing"
+    help = (
+        "Seed demo colleges, users and data for testing. Rows are written with bulk_create(ignore_conflicts=True) "
+        "in chunked transactions, so re-runs only add what is missing and large sizes load in seconds "
+        "(use --shared-hash to hash each role's password once instead of once per account)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--colleges", type=int, default=2)
+        parser.add_argument("--students", type=int, default=3, help="Students per college.")
+        parser.add_argument("--staff", type=int, default=2, help="Staff per college.")
+        parser.add_argument("--days", type=int, default=1, help="Days of attendance, ending today.")
+        parser.add_argument("--subjects", type=int, default=1, help=f"Results per student (max {len(SUBJECTS)}).")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Students written per transaction.")
+        parser.add_argument("--shared-hash", action="store_true",
+                            help="Hash each role's password once and share it across accounts (fast; demo data only).")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for marks and attendance.")
 
     def handle(self, *args, **options):
-        self.stdout.write(self.style.MIGRATE_HEADING("Starting demo seeding..."))
+        if not 0 <= options["subjects"] <= len(SUBJECTS):
+            raise CommandError(f"--subjects must be between 0 and {len(SUBJECTS)}.")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+        self.chunk_size = options["chunk_size"]
+        self.shared_hash = options["shared_hash"]
+        self.hashes = {}
+        self.rng = random.Random(options["seed"])
 
-        # Demo configuration for two colleges
-        demo_colleges = [
-            {
-                "name": "Demo College A",
-                "code": "DEMA",
-                "tagline": "Learning for tomorrow - A",
-                "admin_username": "admin_dema",
-                "admin_email": "admin_dema@example.com",
-                "admin_password": "Password123!"
-            },
-            {
-                "name": "Demo College B",
-                "code": "DEMB",
-                "tagline": "Learning for tomorrow - B",
-                "admin_username": "admin_demb",
-                "admin_email": "admin_demb@example.com",
-                "admin_password": "Password123!"
-            }
+        self.stdout.write(self.style.MIGRATE_HEADING("Starting demo seeding..."))
+        for index in range(options["colleges"]):
+            self.seed_college(demo_college(index), options)
+        invalidate_colleges()
+        self.stdout.write(self.style.SUCCESS("Demo seeding complete."))
+        if process_local_cache():
+            self.stdout.write(self.style.WARNING(STALE_WORKERS_WARNING))
+
+    def hash_password(self, raw):
+        if not self.shared_hash:
+            return make_password(raw)
+        if raw not in self.hashes:
+            self.hashes[raw] = make_password(raw)
+        return self.hashes[raw]
+
+    def ensure_users(self, college, specs):
+        """Create the missing users of (username, password, user_type, is_staff) specs; returns {username: id}."""
+        usernames = [spec[0] for spec in specs]
+        ids = dict(User.objects.filter(username__in=usernames).values_list("username", "id"))
+        new = [
+            User(
+                username=username, email=f"{username}@example.com", password=self.hash_password(password),
+                user_type=user_type, is_staff=is_staff, is_active=True, college_id=college.id,
+            )
+            for username, password, user_type, is_staff in specs
+            if username not in ids
         ]
+        if new:
+            User.objects.bulk_create(new, batch_size=self.chunk_size, ignore_conflicts=True)
+            ids.update(User.objects.filter(username__in=[u.username for u in new]).values_list("username", "id"))
+        return ids
 
-        for cfg in demo_colleges:
+    def seed_college(self, cfg, options):
+        with transaction.atomic():
             college, created = College.objects.get_or_create(code=cfg["code"], defaults={
                 "name": cfg["name"],
-                "tagline": cfg.get("tagline", ""),
+                "tagline": cfg["tagline"],
             })
             if created:
                 self.stdout.write(self.style.SUCCESS(f"Created college: {college.name}"))
             else:
                 self.stdout.write(self.style.WARNING(f"College exists: {college.name}"))
 
-            admin_user, ucreated = User.objects.get_or_create(username=cfg["admin_username"], defaults={
-                "email": cfg["admin_email"],
-            })
-            if ucreated:
-                admin_user.set_password(cfg["admin_password"])
-                admin_user.is_staff = True
-                admin_user.is_active = True
-                admin_user.is_superuser = False
-                try:
-                    admin_user.user_type = CustomUser.HOD
-                except Exception:
-                    pass
-                admin_user.college = college
-                admin_user.save()
-                self.stdout.write(self.style.SUCCESS(f"Created college admin user: {admin_user.username}"))
-            else:
-                admin_user.is_staff = True
-                admin_user.college = college
-                try:
-                    admin_user.user_type = CustomUser.HOD
-                except Exception:
-                    pass
-                admin_user.save()
-                self.stdout.write(self.style.WARNING(f"College admin existed, updated: {admin_user.username}"))
-
-            dept_names = ["Computer Science", "Electronics"]
-            departments = []
-            for dname in dept_names:
-                dept, _ = Department.objects.get_or_create(name=dname, college=college, defaults={
-                    "short_code": (dname[:4] + college.code).upper()[:10]
-                })
-                departments.append(dept)
-
-            sem1, _ = Semester.objects.get_or_create(name="Semester 1", college=college, defaults={"order": 1})
-            sem2, _ = Semester.objects.get_or_create(name="Semester 2", college=college, defaults={"order": 2})
-
-            course_cs, _ = Course.objects.get_or_create(name=f"B.Tech CSE ({college.code})", college=college)
-            course_ec, _ = Course.objects.get_or_create(name=f"B.Tech ECE ({college.code})", college=college)
-
-            sy, _ = SessionYear.objects.get_or_create(session_start_year=2024, session_end_year=2025, college=college)
-
-            staff_users = []
-            for i in range(1, 3):
-                uname = f"staff_{college.code.lower()}_{i}"
-                email = f"{uname}@example.com"
-                user, created_u = User.objects.get_or_create(username=uname, defaults={
-                    "email": email,
-                })
-                if created_u:
-                    user.set_password("StaffPass123!")
-                user.is_staff = True
-                try:
-                    user.user_type = CustomUser.STAFF
-                except Exception:
-                    pass
-                user.college = college
-                user.is_active = True
-                user.save()
-
-                staff_obj, _ = Staffs.objects.get_or_create(admin=user, defaults={
-                    "address": f"Address for {uname}",
-                    "college": college,
-                    "department": departments[0] if departments else None,
-                    "employee_id": f"STF-{college.code}-{i}"
-                })
-                staff_users.append(staff_obj)
-
-            hod_username = f"hod_{college.code.lower()}"
-            hod_user, hcreated = User.objects.get_or_create(username=hod_username, defaults={
-                "email": f"{hod_username}@example.com",
-            })
-            if hcreated:
-                hod_user.set_password("HodPass123!")
-            hod_user.is_staff = True
-            try:
-                hod_user.user_type = CustomUser.HOD
-            except Exception:
-                pass
-            hod_user.college = college
-            hod_user.is_active = True
-            hod_user.save()
-            AdminHOD.objects.get_or_create(admin=hod_user, defaults={"college": college, "department": departments[0] if departments else None})
-
-            students_objs = []
-            for i in range(1, 4):
-                suname = f"student_{college.code.lower()}_{i}"
-                semail = f"{suname}@example.com"
-                suser, sucreated = User.objects.get_or_create(username=suname, defaults={
-                    "email": semail,
-                })
-                if sucreated:
-                    suser.set_password("Student123!")
-                try:
-                    suser.user_type = CustomUser.STUDENT
-                except Exception:
-                    pass
-                suser.college = college
-                suser.is_active = True
-                suser.save()
-
-                student_obj, _ = Students.objects.get_or_create(admin=suser, defaults={
-                    "student_id": f"S{college.code}{i:03d}",
-                    "roll_no": f"R{college.code}{i:03d}",
-                    "college": college,
-                    "course": course_cs,
-                    "session_year": sy,
-                    "address": f"Student address {i}",
-                })
-                students_objs.append(student_obj)
-
-            attendance_date = timezone.now().date()
-            attendance_obj, _ = Attendance.objects.get_or_create(course=course_cs, session_year=sy, attendance_date=attendance_date, defaults={"college": college})
-            for student in students_objs:
-                AttendanceReport.objects.get_or_create(student=student, attendance=attendance_obj, defaults={"status": True, "college": college})
-
-            if students_objs:
-                StudentResult.objects.get_or_create(student=students_objs[0], subject_name="Mathematics", defaults={
-                    "marks": 85.0,
-                    "grade": "A",
-                    "college": college
-                })
-
-            self.stdout.write(self.style.SUCCESS(f"Seeded demo data for college {college.name}"))
-
-        self.stdout.write(self.style.SUCCESS("Demo seeding complete."))
+            Department.objects.bulk_create([
+                Department(name=dname, college=college, short_code=(dname[:4] + college.code).upper()[:10])
+                for dname in ("Computer Science", "Electronics")
+            ], ignore_conflicts=True)
+            Semester.objects.bulk_create([
+                Semester(name=f"Semester {n}", order=n, college=college) for n in (1, 2)
+            ], ignore_conflicts=True)
+            Course.objects.bulk_create([
+                Course(name=f"B.Tech {branch} ({college.code})", college=college) for branch in ("CSE", "ECE")
+            ], ignore_conflicts=True)
+            SessionYear.objects.bulk_create([
+                SessionYear(session_start_year=2024, session_end_year=2025, college=college)
+            ], ignore_conflicts=True)
+            department = Department.objects.get(college=college, name="Computer Science")
+            course_cs = Course.objects.get(college=college, name=f"B.Tech CSE ({college.code})")
+            sy = SessionYear.objects.get(college=college, session_start_year=2024, session_end_year=2025)
+
+            code = college.code.lower()
+            hod_username = f"hod_{code}"
+            staff_usernames = [f"staff_{code}_{i}" for i in range(1, options["staff"] + 1)]
+            user_ids = self.ensure_users(college, [
+                (cfg["admin_username"], ADMIN_PASSWORD, CustomUser.HOD, True),
+                (hod_username, HOD_PASSWORD, CustomUser.HOD, True),
+            ] + [(username, STAFF_PASSWORD, CustomUser.STAFF, True) for username in staff_usernames])
+
+            AdminHOD.objects.bulk_create([
+                AdminHOD(admin_id=user_ids[hod_username], college=college, department=department)
+            ], ignore_conflicts=True)
+            Staffs.objects.bulk_create([
+                Staffs(
+                    admin_id=user_ids[username], college=college, department=department,
+                    address=f"Address for {username}", employee_id=f"STF-{college.code}-{i}",
+                )
+                for i, username in enumerate(staff_usernames, start=1)
+            ], batch_size=self.chunk_size, ignore_conflicts=True)
+
+            today = timezone.now().date()
+            dates = [today - datetime.timedelta(days=d) for d in range(options["days"] - 1, -1, -1)]
+            Attendance.objects.bulk_create([
+                Attendance(course=course_cs, session_year=sy, attendance_date=day, college=college) for day in dates
+            ], ignore_conflicts=True)
+            attendance_ids = list(Attendance.objects.filter(
+                course=course_cs, session_year=sy, college=college, attendance_date__in=dates,
+            ).values_list("id", flat=True))
+
+        seeded = 0
+        for start in range(1, options["students"] + 1, self.chunk_size):
+            numbers = range(start, min(start + self.chunk_size, options["students"] + 1))
+            with transaction.atomic():
+                seeded += self.seed_students(college, course_cs, sy, attendance_ids, numbers, options["subjects"])
+
+        # bulk_create sends no signals
+        mark_stale(college.id)
+        invalidate_fragments([college.id])
+        self.stdout.write(self.style.SUCCESS(f"Seeded demo data for college {college.name} ({seeded} students)"))
+
+    def seed_students(self, college, course, sy, attendance_ids, numbers, subjects):
+        code = college.code.lower()
+        usernames = {i: f"student_{code}_{i}" for i in numbers}
+        user_ids = self.ensure_users(college, [
+            (username, STUDENT_PASSWORD, CustomUser.STUDENT, False) for username in usernames.values()
+        ])
+
+        admin_ids = {i: user_ids[username] for i, username in usernames.items()}
+        profiles = dict(Students.objects.filter(admin_id__in=admin_ids.values()).values_list("admin_id", "id"))
+        missing = {i: admin_id for i, admin_id in admin_ids.items() if admin_id not in profiles}
+        if missing:
+            Students.objects.bulk_create([
+                Students(
+                    admin_id=admin_id, college_id=college.id, course_id=course.id, session_year_id=sy.id,
+                    student_id=f"S{college.code}{i:03d}", roll_no=f"R{college.code}{i:03d}",
+                    address=f"Student address {i}",
+                )
+                for i, admin_id in missing.items()
+            ], batch_size=self.chunk_size, ignore_conflicts=True)
+            profiles.update(Students.objects.filter(admin_id__in=missing.values()).values_list("admin_id", "id"))
+        student_ids = [profiles[admin_id] for admin_id in admin_ids.values()]
+        new_ids = {profiles[admin_id] for admin_id in missing.values()}
+
+        # only students seeded before can already have reports; their summaries are re-tallied,
+        # new students get theirs straight from the statuses generated here
+        old_ids = [student_id for student_id in student_ids if student_id not in new_ids]
+        existing = set()
+        if old_ids and attendance_ids:
+            existing = set(AttendanceReport.objects.filter(
+                student_id__in=old_ids, attendance_id__in=attendance_ids,
+            ).values_list("student_id", "attendance_id"))
+        reports = []
+        summaries = []
+        stale = set()
+        for student_id in student_ids:
+            present = 0
+            for attendance_id in attendance_ids:
+                if (student_id, attendance_id) in existing:
+                    continue
+                status = self.rng.random() < 0.85
+                present += status
+                reports.append(AttendanceReport(student_id=student_id, attendance_id=attendance_id, status=status, college_id=college.id))
+                if student_id not in new_ids:
+                    stale.add(student_id)
+            if student_id in new_ids and attendance_ids:
+                summaries.append(AttendanceSummary(
+                    student_id=student_id, course_id=course.id, session_year_id=sy.id,
+                    present=present, total=len(attendance_ids), college_id=college.id,
+                ))
+        AttendanceReport.objects.bulk_create(reports, batch_size=self.chunk_size, ignore_conflicts=True)
+        AttendanceSummary.objects.bulk_create(summaries, batch_size=self.chunk_size, ignore_conflicts=True)
+        refresh_summaries(stale, course.id, sy.id)
+
+        # StudentResult has no unique constraint to conflict on, so skip the (student, subject) pairs already present
+        existing = set()
+        if old_ids:
+            existing = set(StudentResult.objects.filter(
+                student_id__in=old_ids, subject_name__in=SUBJECTS[:subjects],
+            ).values_list("student_id", "subject_name"))
+        new_results = []
+        for student_id in student_ids:
+            for subject in SUBJECTS[:subjects]:
+                if (student_id, subject) in existing:
+                    continue
+                marks = round(min(100.0, max(0.0, self.rng.gauss(70, 12))), 1)
+                new_results.append(StudentResult(
+                    student_id=student_id, subject_name=subject, marks=marks, grade=grade_for(marks), college_id=college.id,
+                ))
+        StudentResult.objects.bulk_create(new_results, batch_size=self.chunk_size)
+
+        if reports or new_results:
+            invalidate_students(student_ids)
+        return len(student_ids)
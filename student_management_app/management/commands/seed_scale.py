@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from student_management_app.checks import STALE_WORKERS_WARNING, process_local_cache
+from student_management_app.models import College
+from student_management_app.synthetic import CHUNK_SIZE, DEFAULT_PASSWORD, generate
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic dataset: N colleges x M students x D days of attendance x S subjects of results"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--colleges", type=int, default=2)
+        parser.add_argument("--students", type=int, default=100, help="Students per college.")
+        parser.add_argument("--days", type=int, default=10, help="Attendance days per course.")
+        parser.add_argument("--subjects", type=int, default=5, help="Results per student.")
+        parser.add_argument("--staff", type=int, default=5, help="Staff per college.")
+        parser.add_argument("--courses", type=int, default=2, help="Courses per college.")
+        parser.add_argument("--prefix", default="scale", help="College code / username prefix; must not be in use yet.")
+        parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password shared by every generated account.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed (same seed, same data).")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if College.objects.filter(code__startswith=prefix.upper()).exists():
+            raise CommandError(f"Colleges with prefix '{prefix.upper()}' already exist; pick another --prefix.")
+
+        start = time.perf_counter()
+        counts = generate(
+            colleges=options["colleges"],
+            students=options["students"],
+            days=options["days"],
+            subjects=options["subjects"],
+            staff=options["staff"],
+            courses=options["courses"],
+            prefix=prefix,
+            password=options["password"],
+            seed=options["seed"],
+            chunk_size=options["chunk_size"],
+            log=self.stdout.write,
+        )
+        elapsed = time.perf_counter() - start
+        summary = ", ".join(f"{count} {table}" for table, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Generated {summary} in {elapsed:.1f}s."))
+        if process_local_cache():
+            self.stdout.write(self.style.WARNING(STALE_WORKERS_WARNING))
@@ -0,0 +1,159 @@
+import datetime
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from student_management_app.management.throwaway import throwaway_environment
+from student_management_app.models import Course, CustomUser, SessionYear, Students
+from student_management_app.synthetic import generate
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q / 100))]
+
+
+class RollCaller(threading.Thread):
+    """One staff member saving roll calls back to back through the staff_attendance view."""
+
+    def __init__(self, user, course_id, session_id, roster, dates):
+        super().__init__(daemon=True)
+        self.user = user
+        self.course_id = course_id
+        self.session_id = session_id
+        self.roster = roster
+        self.dates = dates
+        self.latencies = []
+        self.errors = 0
+
+    def run(self):
+        client = Client(raise_request_exception=False)
+        client.force_login(self.user)
+        url = reverse('student_management_app:staff_attendance')
+        try:
+            for n, day in enumerate(self.dates):
+                data = {
+                    'course': self.course_id, 'session': self.session_id, 'attendance_date': day.isoformat(),
+                    'roll_call': '1', 'present': [sid for i, sid in enumerate(self.roster) if (i + n) % 7],
+                }
+                start = time.perf_counter()
+                response = client.post(url, data)
+                # the test client keeps connections open; apply CONN_MAX_AGE the way a server would
+                close_old_connections()
+                if response.status_code == 302:
+                    self.latencies.append(time.perf_counter() - start)
+                else:
+                    self.errors += 1
+        finally:
+            connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrency benchmark for the SQLite tuning layer: seeds a throwaway file database and has --threads "
+        "staff users save roll calls at the same time, once with SQLite defaults (rollback journal, no "
+        "persistent connections, deferred transactions, no write serialisation) and once with the tuning from "
+        "db_tuning.py and settings, reporting saves/sec, latency and failed saves for both."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--saves", type=int, default=20, help="Roll calls per thread.")
+        parser.add_argument("--students", type=int, default=400, help="Students in the seeded college (split over the courses).")
+        parser.add_argument("--courses", type=int, default=4)
+
+    def handle(self, *args, **options):
+        tmpdir = tempfile.mkdtemp(prefix="cms-sqlite-bench-")
+        db = connections.settings['default']
+        saved = {
+            'TEST': dict(db.get('TEST') or {}),
+            'CONN_MAX_AGE': db.get('CONN_MAX_AGE', 0),
+            'OPTIONS': dict(db.get('OPTIONS') or {}),
+            'SQLITE_TUNING': getattr(settings, 'SQLITE_TUNING', True),
+            'SQLITE_WAL': getattr(settings, 'SQLITE_WAL', False),
+        }
+        db['TEST'] = {**saved['TEST'], 'NAME': os.path.join(tmpdir, 'bench.sqlite3')}
+        try:
+            with throwaway_environment():
+                try:
+                    generate(colleges=1, students=options["students"], days=0, subjects=0, staff=options["threads"],
+                             courses=options["courses"], prefix='sqlbench')
+                    workers_args = self.worker_args(options)
+                    for offset, (label, tuned) in enumerate((("SQLite defaults", False), ("tuned", True))):
+                        self.configure(db, saved, tuned)
+                        self.run_phase(label, workers_args, offset * options["saves"], options["saves"])
+                finally:
+                    self.configure(db, saved, True)
+                    settings.SQLITE_WAL = saved['SQLITE_WAL']
+                    connection.close()
+        finally:
+            db['TEST'] = saved['TEST']
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    def worker_args(self, options):
+        staff = list(CustomUser.objects.filter(user_type=CustomUser.STAFF).order_by('id'))
+        courses = list(Course.objects.order_by('id').values_list('id', flat=True))
+        session_id = SessionYear.objects.values_list('id', flat=True).first()
+        rosters = {
+            course_id: list(Students.objects.filter(course_id=course_id).values_list('id', flat=True))
+            for course_id in courses
+        }
+        return [
+            (user, courses[k % len(courses)], session_id, rosters[courses[k % len(courses)]], k)
+            for k, user in enumerate(staff)
+        ]
+
+    def configure(self, db, saved, tuned):
+        connection.close()
+        settings.SQLITE_TUNING = saved['SQLITE_TUNING'] if tuned else False
+        # the throwaway database always gets WAL in the tuned phase; restored to the configured value afterwards
+        settings.SQLITE_WAL = tuned
+        db['CONN_MAX_AGE'] = saved['CONN_MAX_AGE'] if tuned else 0
+        db['OPTIONS'].clear()
+        db['OPTIONS'].update(saved['OPTIONS'])
+        if not tuned:
+            db['OPTIONS'].pop('transaction_mode', None)
+            # journal_mode is stored in the database file, so undo WAL explicitly
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode = DELETE")
+            connection.close()
+
+    def run_phase(self, label, workers_args, day_offset, saves):
+        start_day = datetime.date(2025, 1, 1) + datetime.timedelta(days=day_offset)
+        threads = [
+            RollCaller(user, course_id, session_id, roster, [
+                # each staff member gets its own dates so saves never overwrite each other
+                start_day + datetime.timedelta(days=n * len(workers_args) + k) for n in range(saves)
+            ])
+            for user, course_id, session_id, roster, k in workers_args
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for thread in threads for latency in thread.latencies)
+        errors = sum(thread.errors for thread in threads)
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal_mode = cursor.fetchone()[0]
+        connection.close()
+
+        self.stdout.write(self.style.SUCCESS(f"{label}  ({len(threads)} threads, journal_mode={journal_mode}, {elapsed:.1f}s)"))
+        self.stdout.write(f"  saves/sec     {len(latencies) / elapsed:.1f}")
+        self.stdout.write(f"  saves         {len(latencies)}  failed {errors}")
+        self.stdout.write(
+            f"  latency ms    p50 {_percentile(latencies, 50) * 1000:.1f}  "
+            f"p95 {_percentile(latencies, 95) * 1000:.1f}  max {(latencies[-1] if latencies else 0) * 1000:.1f}"
+        )
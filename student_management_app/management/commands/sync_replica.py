@@ -0,0 +1,30 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from student_management_app.db_router import PRIMARY, REPLICA, replica_configured
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into the replica SQLite file (CMS_REPLICA_DATABASE_URL), for trying "
+        "out replica routing locally. Run it again whenever the replica should catch up; a real PostgreSQL "
+        "replica is kept in sync by streaming replication instead."
+    )
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError("No replica configured; set CMS_REPLICA_DATABASE_URL.")
+        primary, replica = connections[PRIMARY], connections[REPLICA]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError("sync_replica only copies SQLite files; replicate PostgreSQL with the server's own replication.")
+
+        replica.close()
+        primary.ensure_connection()
+        target = sqlite3.connect(replica.settings_dict['NAME'])
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
+        self.stdout.write(self.style.SUCCESS(f"Copied {primary.settings_dict['NAME']} to {replica.settings_dict['NAME']}."))
@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from student_management_app.colleges import invalidate_colleges
+from student_management_project.caches import parse_cache_url
+
+
+@contextmanager
+def throwaway_environment():
+    """
+    A migrated test database plus a private locmem cache for the benchmark and
+    budget commands: the data they seed must not reach the configured (possibly
+    shared, production) cache, and clearing their cache must not clear that one.
+    """
+    runner = DiscoverRunner(verbosity=0, interactive=False)
+    runner.setup_test_environment()
+    old_config = runner.setup_databases()
+    try:
+        with override_settings(CACHES={'default': parse_cache_url('locmem://throwaway')}):
+            # locmem caches of one name share their storage within the process: start every run empty
+            cache.clear()
+            invalidate_colleges()
+            yield
+    finally:
+        runner.teardown_databases(old_config)
+        runner.teardown_test_environment()
@@ -0,0 +1,207 @@
+"""
+Per-view request instrumentation.
+
+QueryMetricsMiddleware records, for each resolved URL name, the number of SQL
+queries, SQL time, template render time, total time and response size. The
+totals are kept in process memory and exposed in Prometheus text format by
+metrics_view. DEFAULT_QUERY_BUDGETS (overridable with settings.QUERY_BUDGETS)
+declares how many queries a GET of each view may issue; the check_query_budgets
+command (also run by the test suite) enforces them and DEBUG runs log a warning
+when a GET goes over. Writes are not budgeted.
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+
+logger = logging.getLogger(__name__)
+
+# url_name -> maximum SQL queries per GET once caches are warm (session and auth lookups included)
+DEFAULT_QUERY_BUDGETS = {
+    'home': 2,
+    'login': 1,
+    'registration': 3,
+    'admin_home': 3,
+    'staff_home': 3,
+    'student_home': 2,
+    'staff_attendance': 7,
+    'staff_student_list': 6,
+    'staff_leave': 3,
+    'student_leave': 3,
+    'student_results': 3,
+    'student_feedback': 3,
+    'student_attendance_history': 3,
+    'api_student_subject_data': 2,
+    'api_student_dashboard': 2,
+    'api_students_page': 4,
+    'api_staffs_page': 4,
+    'hod_leave_requests': 7,
+}
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def query_budgets():
+    budgets = dict(DEFAULT_QUERY_BUDGETS)
+    budgets.update(getattr(settings, 'QUERY_BUDGETS', {}))
+    return budgets
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'sql_time', 'template_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += time.perf_counter() - start
+
+
+class MetricsRegistry:
+    """Process-wide per-view totals."""
+
+    FIELDS = ('requests', 'queries', 'sql_seconds', 'template_seconds', 'duration_seconds', 'response_bytes')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, metrics, duration, size):
+        with self._lock:
+            row = self._views.setdefault(view, dict.fromkeys(self.FIELDS, 0) | {'max_queries': 0})
+            row['requests'] += 1
+            row['queries'] += metrics.queries
+            row['sql_seconds'] += metrics.sql_time
+            row['template_seconds'] += metrics.template_time
+            row['duration_seconds'] += duration
+            row['response_bytes'] += size
+            row['max_queries'] = max(row['max_queries'], metrics.queries)
+
+    def snapshot(self):
+        with self._lock:
+            return {view: dict(row) for view, row in self._views.items()}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def to_prometheus(self):
+        data = self.snapshot()
+        lines = []
+        for field in self.FIELDS + ('max_queries',):
+            name = f'cms_view_{field}' + ('' if field == 'max_queries' else '_total')
+            kind = 'gauge' if field == 'max_queries' else 'counter'
+            lines.append(f'# TYPE {name} {kind}')
+            for view in sorted(data):
+                value = data[view][field]
+                lines.append(f'{name}{{view="{view}"}} {value:.6f}' if isinstance(value, float) else f'{name}{{view="{view}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def _hook_connections(stack, metrics):
+    for conn in connections.all():
+        stack.enter_context(conn.execute_wrapper(metrics))
+
+
+class QueryMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                _hook_connections(stack, metrics)
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        # connections are per thread and under ASGI the ORM runs in the request's
+        # thread-sensitive executor thread, so the wrappers are installed there
+        stack = ExitStack()
+        try:
+            await sync_to_async(_hook_connections)(stack, metrics)
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            _current.reset(token)
+        return self._finish(request, response, metrics, time.perf_counter() - start)
+
+    def _finish(self, request, response, metrics, duration):
+        match = getattr(request, 'resolver_match', None)
+        view = match.url_name if match and match.url_name else 'unresolved'
+        size = 0 if response.streaming else len(response.content)
+        registry.record(view, metrics, duration, size)
+
+        request.query_metrics = metrics
+        budget = query_budgets().get(view)
+        if settings.DEBUG and budget is not None and request.method in ('GET', 'HEAD') and metrics.queries > budget:
+            logger.warning("%s issued %d queries (budget %d)", view, metrics.queries, budget)
+        return response
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend whose templates report their render time to QueryMetricsMiddleware."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def metrics_view(request):
+    allowed_ips = getattr(settings, 'METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+    if not (request.META.get('REMOTE_ADDR') in allowed_ips or request.user.is_superuser):
+        return HttpResponseForbidden("Forbidden")
+    return HttpResponse(registry.to_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
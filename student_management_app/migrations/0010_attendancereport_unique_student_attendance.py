@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:31
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def drop_duplicate_reports(apps, schema_editor):
+    # keep the oldest report for each (student, attendance) pair so the unique constraint can be added
+    AttendanceReport = apps.get_model('student_management_app', 'AttendanceReport')
+    dupes = (
+        AttendanceReport.objects.values('student_id', 'attendance_id')
+        .annotate(n=Count('id'), keep=Min('id'))
+        .filter(n__gt=1)
+    )
+    for row in dupes:
+        AttendanceReport.objects.filter(
+            student_id=row['student_id'], attendance_id=row['attendance_id']
+        ).exclude(id=row['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student_management_app', '0009_delete_collegeprofile_alter_semester_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_reports, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='attendancereport',
+            unique_together={('student', 'attendance')},
+        ),
+    ]
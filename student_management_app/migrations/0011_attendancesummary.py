@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Max, Q
+
+
+def backfill_summaries(apps, schema_editor):
+    AttendanceReport = apps.get_model('student_management_app', 'AttendanceReport')
+    AttendanceSummary = apps.get_model('student_management_app', 'AttendanceSummary')
+    tally = (
+        AttendanceReport.objects
+        .values('student_id', course_id=F('attendance__course_id'), session_year_id=F('attendance__session_year_id'))
+        .annotate(total=Count('id'), present=Count('id', filter=Q(status=True)), college_ref=Max('college_id'))
+        .order_by()
+    )
+    AttendanceSummary.objects.bulk_create([
+        AttendanceSummary(
+            student_id=row['student_id'],
+            course_id=row['course_id'],
+            session_year_id=row['session_year_id'],
+            college_id=row['college_ref'],
+            present=row['present'],
+            total=row['total'],
+        )
+        for row in tally
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student_management_app', '0010_attendancereport_unique_student_attendance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('college', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attendance_summaries', to='student_management_app.college')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='student_management_app.course')),
+                ('session_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='student_management_app.sessionyear')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='student_management_app.students')),
+            ],
+            options={
+                'unique_together': {('student', 'course', 'session_year')},
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student_management_app', '0011_attendancesummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancereport',
+            index=models.Index(fields=['student', 'status'], name='attreport_student_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leavereportstaff',
+            index=models.Index(condition=models.Q(('status', False)), fields=['staff', 'date'], name='leave_staff_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leavereportstudent',
+            index=models.Index(condition=models.Q(('status', False)), fields=['student', 'date'], name='leave_student_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staffs',
+            index=models.Index(fields=['college', 'employee_id'], name='staffs_college_empid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='students',
+            index=models.Index(fields=['college', 'course', 'semester'], name='students_col_course_sem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='students',
+            index=models.Index(fields=['college', 'course', 'session_year'], name='students_col_course_sess_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='students',
+            index=models.Index(fields=['college', 'student_id'], name='students_college_sid_idx'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:45
+
+from django.db import migrations, models
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Concat, Substr
+
+
+REJECTED_PREFIX = '[REJECTED] '
+LEAVE_STATUS_CHOICES = [(0, 'Pending'), (1, 'Approved'), (2, 'Rejected')]
+LEAVE_MODELS = (('leavereportstaff', 'staff'), ('leavereportstudent', 'student'))
+
+
+def fill_states(apps, schema_editor):
+    # rejections used to be recorded by prefixing the message; they become state 2 with the prefix dropped.
+    # One UPDATE per table: on PostgreSQL, touching a row twice queues FK trigger events that block the ALTERs below
+    for name, _ in LEAVE_MODELS:
+        model = apps.get_model('student_management_app', name)
+        rejected = Q(status=False, message__startswith=REJECTED_PREFIX)
+        model.objects.update(
+            state=Case(When(status=True, then=Value(1)), When(rejected, then=Value(2)), default=Value(0)),
+            message=Case(
+                When(rejected, then=Substr('message', len(REJECTED_PREFIX) + 1)),
+                default=F('message'),
+                output_field=models.TextField(),
+            ),
+        )
+
+
+def fill_flags(apps, schema_editor):
+    for name, _ in LEAVE_MODELS:
+        model = apps.get_model('student_management_app', name)
+        model.objects.filter(state=1).update(status=True)
+        model.objects.filter(state=2).update(
+            message=Concat(Value(REJECTED_PREFIX), 'message', output_field=models.TextField()),
+        )
+
+
+class Migration(migrations.Migration):
+    # boolean -> smallint is done through a second column: PostgreSQL has no cast between the two, and the
+    # pending-leave partial indexes from 0012 test the old boolean, so they are rebuilt around the change
+
+    dependencies = [
+        ('student_management_app', '0012_tenant_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(model_name='leavereportstaff', name='leave_staff_pending_idx'),
+        migrations.RemoveIndex(model_name='leavereportstudent', name='leave_student_pending_idx'),
+        *(
+            migrations.AddField(
+                model_name=name,
+                name='state',
+                field=models.PositiveSmallIntegerField(choices=LEAVE_STATUS_CHOICES, default=0),
+            )
+            for name, _ in LEAVE_MODELS
+        ),
+        migrations.RunPython(fill_states, fill_flags),
+        *(migrations.RemoveField(model_name=name, name='status') for name, _ in LEAVE_MODELS),
+        *(migrations.RenameField(model_name=name, old_name='state', new_name='status') for name, _ in LEAVE_MODELS),
+        *(
+            migrations.AddIndex(
+                model_name=name,
+                index=models.Index(condition=models.Q(('status', 0)), fields=[owner, 'date'], name=f'leave_{owner}_pending_idx'),
+            )
+            for name, owner in LEAVE_MODELS
+        ),
+    ]
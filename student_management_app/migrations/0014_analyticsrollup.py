@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student_management_app', '0013_leave_status_states'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.CharField(choices=[('college', 'College'), ('department', 'Department'), ('course', 'Course'), ('session', 'Session')], max_length=20)),
+                ('students', models.PositiveIntegerField(default=0)),
+                ('attendance_present', models.PositiveIntegerField(default=0)),
+                ('attendance_total', models.PositiveIntegerField(default=0)),
+                ('results', models.PositiveIntegerField(default=0)),
+                ('mean_marks', models.FloatField(blank=True, null=True)),
+                ('median_marks', models.FloatField(blank=True, null=True)),
+                ('p90_marks', models.FloatField(blank=True, null=True)),
+                ('grade_distribution', models.JSONField(blank=True, default=dict)),
+                ('computed_at', models.DateTimeField()),
+                ('college', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='analytics_rollups', to='student_management_app.college')),
+                ('course', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='analytics_rollups', to='student_management_app.course')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='analytics_rollups', to='student_management_app.department')),
+                ('session_year', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='analytics_rollups', to='student_management_app.sessionyear')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['level', 'college'], name='rollup_level_college_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:49
+
+import student_management_app.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student_management_app', '0014_analyticsrollup'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='customuser',
+            managers=[
+                ('objects', student_management_app.models.CustomUserManager()),
+            ],
+        ),
+    ]
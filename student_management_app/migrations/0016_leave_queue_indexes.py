@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student_management_app', '0015_customuser_manager'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leavereportstaff',
+            index=models.Index(fields=['status', 'date', 'id'], name='leave_staff_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leavereportstudent',
+            index=models.Index(fields=['status', 'date', 'id'], name='leave_student_queue_idx'),
+        ),
+    ]
@@ -1,5 +1,24 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.dispatch import Signal
+
+from .tenancy import TenantManager
+
+
+# sent with the affected ids after CustomUser.objects...update(), which sends no post_save
+users_updated = Signal()
+
+
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        user_ids = list(self.values_list('pk', flat=True))
+        rows = super().update(**kwargs)
+        users_updated.send(sender=self.model, user_ids=user_ids)
+        return rows
+
+
+class CustomUserManager(UserManager.from_queryset(UserQuerySet)):
+    pass
 
 
 class College(models.Model):
@@ -27,6 +46,8 @@ class CustomUser(AbstractUser):
 
     college = models.ForeignKey(College, null=True, blank=True, on_delete=models.SET_NULL, related_name='users')
 
+    objects = CustomUserManager()
+
     def __str__(self):
         return self.username
 
@@ -36,6 +57,9 @@ class Department(models.Model):
     short_code = models.CharField(max_length=20, blank=True)
     college = models.ForeignKey(College, null=True, blank=True, on_delete=models.CASCADE, related_name='departments')
 
+    objects = models.Manager()
+    tenant = TenantManager()
+
     class Meta:
         unique_together = ('college', 'name')
 
@@ -48,6 +72,9 @@ class Semester(models.Model):
     order = models.PositiveSmallIntegerField(default=1)
     college = models.ForeignKey(College, null=True, blank=True, on_delete=models.CASCADE, related_name='semesters')
 
+    objects = models.Manager()
+    tenant = TenantManager()
+
     class Meta:
         unique_together = ('college', 'name')
         ordering = ('order',)
@@ -60,6 +87,9 @@ class Course(models.Model):
     name = models.CharField(max_length=255)
     college = models.ForeignKey(College, null=True, blank=True, on_delete=models.CASCADE, related_name='courses')
 
+    objects = models.Manager()
+    tenant = TenantManager()
+
     class Meta:
         unique_together = ('college', 'name')
 
@@ -72,6 +102,9 @@ class SessionYear(models.Model):
     session_end_year = models.IntegerField()
     college = models.ForeignKey(College, null=True, blank=True, on_delete=models.CASCADE, related_name='session_years')
 
+    objects = models.Manager()
+    tenant = TenantManager()
+
     class Meta:
         unique_together = ('college', 'session_start_year', 'session_end_year')
 
@@ -85,6 +118,9 @@ class AdminHOD(models.Model):
     department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True, related_name='hods')
     employee_id = models.CharField(max_length=50, blank=True, null=True)
 
+    objects = models.Manager()
+    tenant = TenantManager()
+
     def __str__(self):
         return f"HOD: {self.admin.username}"
 
@@ -98,6 +134,14 @@ class Staffs(models.Model):
     phone = models.CharField(max_length=30, blank=True, null=True)
     profile_pic = models.ImageField(upload_to='staff_profile/', blank=True, null=True)
 
+    objects = models.Manager()
+    tenant = TenantManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['college', 'employee_id'], name='staffs_college_empid_idx'),
+        ]
+
     def __str__(self):
         return f"Staff: {self.admin.username}"
 
@@ -116,6 +160,16 @@ class Students(models.Model):
     profile_pic = models.ImageField(upload_to='student_profile/', blank=True, null=True)
     phone = models.CharField(max_length=30, blank=True, null=True)
 
+    objects = models.Manager()
+    tenant = TenantManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['college', 'course', 'semester'], name='students_col_course_sem_idx'),
+            models.Index(fields=['college', 'course', 'session_year'], name='students_col_course_sess_idx'),
+            models.Index(fields=['college', 'student_id'], name='students_college_sid_idx'),
+        ]
+
     def __str__(self):
         return f"Student: {self.admin.username} ({self.student_id or 'no-id'})"
 
@@ -127,6 +181,9 @@ class Attendance(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     college = models.ForeignKey(College, null=True, blank=True, on_delete=models.SET_NULL, related_name='attendances')
 
+    objects = models.Manager()
+    tenant = TenantManager()
+
     class Meta:
         unique_together = ('course', 'session_year', 'attendance_date', 'college')
 
@@ -140,15 +197,67 @@ class AttendanceReport(models.Model):
     status = models.BooleanField(default=False)
     college = models.ForeignKey(College, null=True, blank=True, on_delete=models.SET_NULL, related_name='attendance_reports')
 
+    objects = models.Manager()
+    tenant = TenantManager()
+
+    class Meta:
+        unique_together = ('student', 'attendance')
+        indexes = [
+            models.Index(fields=['student', 'status'], name='attreport_student_status_idx'),
+        ]
+
     def __str__(self):
         return f"{self.student.admin.username} - {self.attendance.attendance_date}"
 
 
+class AttendanceSummary(models.Model):
+    """Running present/total tally per student, course and session, maintained from AttendanceReport writes."""
+    student = models.ForeignKey(Students, on_delete=models.CASCADE, related_name='attendance_summaries')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='attendance_summaries')
+    session_year = models.ForeignKey(SessionYear, on_delete=models.CASCADE, related_name='attendance_summaries')
+    present = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    college = models.ForeignKey(College, null=True, blank=True, on_delete=models.SET_NULL, related_name='attendance_summaries')
+
+    objects = models.Manager()
+    tenant = TenantManager()
+
+    class Meta:
+        unique_together = ('student', 'course', 'session_year')
+
+    @property
+    def percent(self):
+        return round((self.present / self.total * 100), 1) if self.total else 0
+
+    def __str__(self):
+        return f"{self.student_id} - {self.course_id}: {self.present}/{self.total}"
+
+
+LEAVE_PENDING = 0
+LEAVE_APPROVED = 1
+LEAVE_REJECTED = 2
+LEAVE_STATUS_CHOICES = (
+    (LEAVE_PENDING, 'Pending'),
+    (LEAVE_APPROVED, 'Approved'),
+    (LEAVE_REJECTED, 'Rejected'),
+)
+
+
 class LeaveReportStaff(models.Model):
     staff = models.ForeignKey(Staffs, on_delete=models.CASCADE, related_name='leaves')
     date = models.DateField()
     message = models.TextField()
-    status = models.BooleanField(default=False)
+    status = models.PositiveSmallIntegerField(choices=LEAVE_STATUS_CHOICES, default=LEAVE_PENDING)
+
+    objects = models.Manager()
+    tenant = TenantManager('staff__college')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['staff', 'date'], name='leave_staff_pending_idx', condition=models.Q(status=LEAVE_PENDING)),
+            # the HOD's pending queue, paged by (date, id): read in order instead of sorting every pending leave
+            models.Index(fields=['status', 'date', 'id'], name='leave_staff_queue_idx'),
+        ]
 
     def __str__(self):
         return f"{self.staff.admin.username} - {self.date}"
@@ -158,7 +267,17 @@ class LeaveReportStudent(models.Model):
     student = models.ForeignKey(Students, on_delete=models.CASCADE, related_name='leaves')
     date = models.DateField()
     message = models.TextField()
-    status = models.BooleanField(default=False)
+    status = models.PositiveSmallIntegerField(choices=LEAVE_STATUS_CHOICES, default=LEAVE_PENDING)
+
+    objects = models.Manager()
+    tenant = TenantManager('student__college')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'date'], name='leave_student_pending_idx', condition=models.Q(status=LEAVE_PENDING)),
+            # the HOD's pending queue, paged by (date, id): read in order instead of sorting every pending leave
+            models.Index(fields=['status', 'date', 'id'], name='leave_student_queue_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.admin.username} - {self.date}"
@@ -170,6 +289,9 @@ class FeedbackStaff(models.Model):
     reply = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = models.Manager()
+    tenant = TenantManager('staff__college')
+
     def __str__(self):
         return f"Feedback from {self.staff.admin.username}"
 
@@ -180,6 +302,9 @@ class FeedbackStudent(models.Model):
     reply = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = models.Manager()
+    tenant = TenantManager('student__college')
+
     def __str__(self):
         return f"Feedback from {self.student.admin.username}"
 
@@ -192,5 +317,48 @@ class StudentResult(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     college = models.ForeignKey(College, null=True, blank=True, on_delete=models.SET_NULL, related_name='results')
 
+    objects = models.Manager()
+    tenant = TenantManager()
+
     def __str__(self):
         return f"{self.student.admin.username} - {self.subject_name} ({self.grade})"
+
+
+class AnalyticsRollup(models.Model):
+    """Materialised per-college/department/course/session metrics, rebuilt by the refresh_analytics command."""
+    COLLEGE = 'college'
+    DEPARTMENT = 'department'
+    COURSE = 'course'
+    SESSION = 'session'
+    LEVEL_CHOICES = (
+        (COLLEGE, 'College'),
+        (DEPARTMENT, 'Department'),
+        (COURSE, 'Course'),
+        (SESSION, 'Session'),
+    )
+    level = models.CharField(max_length=20, choices=LEVEL_CHOICES)
+    college = models.ForeignKey(College, null=True, blank=True, on_delete=models.CASCADE, related_name='analytics_rollups')
+    department = models.ForeignKey(Department, null=True, blank=True, on_delete=models.CASCADE, related_name='analytics_rollups')
+    course = models.ForeignKey(Course, null=True, blank=True, on_delete=models.CASCADE, related_name='analytics_rollups')
+    session_year = models.ForeignKey(SessionYear, null=True, blank=True, on_delete=models.CASCADE, related_name='analytics_rollups')
+    students = models.PositiveIntegerField(default=0)
+    attendance_present = models.PositiveIntegerField(default=0)
+    attendance_total = models.PositiveIntegerField(default=0)
+    results = models.PositiveIntegerField(default=0)
+    mean_marks = models.FloatField(null=True, blank=True)
+    median_marks = models.FloatField(null=True, blank=True)
+    p90_marks = models.FloatField(null=True, blank=True)
+    grade_distribution = models.JSONField(default=dict, blank=True)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['level', 'college'], name='rollup_level_college_idx'),
+        ]
+
+    @property
+    def attendance_rate(self):
+        return round(self.attendance_present / self.attendance_total * 100, 1) if self.attendance_total else None
+
+    def __str__(self):
+        return f"{self.level} {self.college_id}/{self.department_id or self.course_id or self.session_year_id or '-'}"
@@ -0,0 +1,95 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are ordered by (key, id) and the cursor carries the last row's pair, so
+fetching page N costs the same index range scan as page 1 instead of an
+OFFSET that grows with N. A missing or garbled cursor starts at the first page.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(key_value, pk):
+    raw = json.dumps([key_value, pk], separators=(',', ':'), cls=DjangoJSONEncoder).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (key_value, pk) or None for a missing/garbled cursor."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key_value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    # cursors come from clients: only a scalar key and an integer id are ever encoded
+    if isinstance(pk, bool) or not isinstance(pk, int):
+        return None
+    if key_value is not None and (isinstance(key_value, bool) or not isinstance(key_value, (str, int, float))):
+        return None
+    return key_value, pk
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE):
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _page_queryset(queryset, key, after):
+    qs = queryset.order_by(F(key).asc(nulls_first=True), 'id')
+    position = decode_cursor(after)
+    if position is None:
+        return qs
+    key_value, pk = position
+    try:
+        if key_value is None:
+            return qs.filter(Q(**{f'{key}__isnull': True, 'id__gt': pk}) | Q(**{f'{key}__isnull': False}))
+        # the redundant >= lets the index seek straight to the cursor instead of skipping rows
+        return qs.filter(
+            Q(**{f'{key}__gte': key_value}),
+            Q(**{f'{key}__gt': key_value}) | Q(**{key: key_value, 'id__gt': pk}),
+        )
+    except (ValidationError, ValueError, TypeError):
+        # a well-formed cursor whose key does not fit the column (e.g. not a date): garbled, start over
+        return qs
+
+
+def _page_result(rows, key, limit):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if isinstance(last, dict):
+            next_cursor = encode_cursor(last[key], last['id'])
+        else:
+            next_cursor = encode_cursor(getattr(last, key), last.pk)
+    return rows, next_cursor
+
+
+def keyset_page(queryset, key, after=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of queryset ordered by (key, id), starting after the given cursor.
+    NULL keys sort first. Returns (rows, next_cursor); next_cursor is None on the last page.
+
+    queryset may be a .values() queryset as long as it includes key and 'id'.
+    """
+    rows = list(_page_queryset(queryset, key, after)[:limit + 1])
+    return _page_result(rows, key, limit)
+
+
+async def akeyset_page(queryset, key, after=None, limit=DEFAULT_PAGE_SIZE):
+    """Async keyset_page()."""
+    rows = [row async for row in _page_queryset(queryset, key, after)[:limit + 1]]
+    return _page_result(rows, key, limit)
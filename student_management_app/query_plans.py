@@ -0,0 +1,141 @@
+"""
+EXPLAIN QUERY PLAN over the SQL the budgeted views really run, for the
+check_query_plans command and the test suite.
+
+capture_view_queries() GETs every view of budget_cases() -- the cases
+check_query_budgets measures -- each against an empty private cache, so the
+queries a warm cache would hide are issued too, and records each SELECT as
+executed.
+Checking that SQL instead of hand-written copies of the views' querysets
+keeps the check from drifting when a view changes.
+"""
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from student_management_project.caches import parse_cache_url
+
+from .colleges import invalidate_colleges
+from .models import AttendanceSummary, CustomUser, StudentResult
+
+
+# a bare "SCAN <table>" (no USING INDEX) is a full table scan
+FULL_SCAN_RE = re.compile(r'\bSCAN (\w+)\b(?! USING)')
+SORT_STEP = 'USE TEMP B-TREE FOR ORDER BY'
+LIMIT_RE = re.compile(r'\sLIMIT \d+')
+
+# emptied before every request; a shared cache configured for the site is left alone
+COLD_CACHE = {'default': parse_cache_url('locmem://query-plans')}
+
+
+def budget_cases():
+    """(url_name, username, url) for every budgeted view, using the seeded demo users."""
+    hod = CustomUser.objects.filter(user_type=CustomUser.HOD, college__isnull=False).order_by('id').first()
+    staff = CustomUser.objects.filter(user_type=CustomUser.STAFF, staff_profile__isnull=False).order_by('id').first()
+    result = StudentResult.objects.select_related('student__admin').order_by('id').first()
+    student = result.student if result else None
+    summary = AttendanceSummary.objects.filter(student__college=staff.college).order_by('id').first() if staff else None
+
+    cases = [
+        ('home', None, reverse('student_management_app:home')),
+        ('login', None, reverse('student_management_app:login')),
+        ('registration', None, reverse('student_management_app:registration')),
+    ]
+    if hod:
+        cases += [
+            (name, hod.username, reverse(f'student_management_app:{name}'))
+            for name in ('admin_home', 'hod_leave_requests', 'api_students_page', 'api_staffs_page')
+        ]
+    if staff:
+        cases += [
+            (name, staff.username, reverse(f'student_management_app:{name}'))
+            for name in ('staff_home', 'staff_student_list', 'staff_leave')
+        ]
+        attendance_url = reverse('student_management_app:staff_attendance')
+        if summary:
+            attendance_url += f"?course={summary.course_id}&session={summary.session_year_id}&attendance_date=2025-01-01"
+        cases.append(('staff_attendance', staff.username, attendance_url))
+    if student:
+        cases += [
+            (name, student.admin.username, reverse(f'student_management_app:{name}'))
+            for name in (
+                'student_home', 'student_leave', 'student_results', 'student_feedback',
+                'student_attendance_history', 'api_student_dashboard',
+            )
+        ]
+        cases.append((
+            'api_student_subject_data', student.admin.username,
+            reverse('student_management_app:api_student_subject_data', args=[student.id, result.id]),
+        ))
+    return cases
+
+
+def capture_view_queries(views=None):
+    """
+    GET the budgeted views (all, or those named in views) and return
+    (view, status, [sql, ...]) per view, each SELECT once, with its parameters inlined.
+    """
+    captured = []
+    with override_settings(CACHES=COLD_CACHE):
+        for name, username, url in budget_cases():
+            if views and name not in views:
+                continue
+            # emptied before logging in: with a cache-backed session engine the session lives there too
+            cache.clear()
+            invalidate_colleges()
+            client = Client()
+            if username:
+                client.force_login(CustomUser.objects.get(username=username))
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get(url)
+            selects = dict.fromkeys(q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT'))
+            captured.append((name, response.status_code, list(selects)))
+    return captured
+
+
+def explain(sql):
+    """Return the EXPLAIN QUERY PLAN detail lines for a captured SQL statement."""
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scans(plan):
+    """Tables the plan reads with a full table scan."""
+    scans = []
+    for line in plan:
+        match = FULL_SCAN_RE.search(line)
+        if match:
+            scans.append(match.group(1))
+    return scans
+
+
+def plan_problems(sql, plan):
+    """
+    What is wrong with a plan: full table scans, and a page (a query with a
+    LIMIT) sorted in a temp b-tree, which reads every matching row to return
+    the first few.
+    """
+    problems = [f"full scan of {table}" for table in full_scans(plan)]
+    if LIMIT_RE.search(sql) and SORT_STEP in plan:
+        problems.append("sorts every match to return one page")
+    return problems
+
+
+def check_query_plans(views=None):
+    """
+    Explain every query the budgeted views issue. Returns (view, status, results),
+    results being a list of (sql, plan, problems) tuples, one per query.
+    """
+    checked = []
+    for view, status, queries in capture_view_queries(views):
+        results = []
+        for sql in queries:
+            plan = explain(sql)
+            results.append((sql, plan, plan_problems(sql, plan)))
+        checked.append((view, status, results))
+    return checked
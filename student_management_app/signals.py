@@ -0,0 +1,105 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .accounts import invalidate_user, invalidate_users
+from .attendance import apply_report_delta, refresh_report_summary
+from .colleges import invalidate_colleges
+from .dashboard_stats import mark_stale
+from .db_tuning import apply_pragmas
+from .fragments import invalidate_fragments
+from .models import (
+    AttendanceReport, College, Course, CustomUser, Department, LeaveReportStaff, LeaveReportStudent, Semester,
+    Staffs, StudentResult, Students, users_updated,
+)
+from .student_cache import invalidate_students
+from .tenancy import college_id_of
+
+
+@receiver(post_init, sender=AttendanceReport)
+def remember_report_status(sender, instance, **kwargs):
+    # read from __dict__ so a deferred status field is not fetched just for this
+    instance._loaded_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=AttendanceReport)
+def update_summary_on_report_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        apply_report_delta(instance, int(instance.status), 1)
+    elif instance._loaded_status is not None and instance._loaded_status != instance.status:
+        apply_report_delta(instance, 1 if instance.status else -1, 0)
+    instance._loaded_status = instance.status
+    invalidate_students([instance.student_id])
+
+
+@receiver(post_delete, sender=AttendanceReport)
+def update_summary_on_report_delete(sender, instance, **kwargs):
+    # the in-memory status may be stale by the time a row is deleted, so re-tally instead of subtracting
+    refresh_report_summary(instance)
+    invalidate_students([instance.student_id])
+
+
+@receiver(post_save, sender=StudentResult)
+@receiver(post_delete, sender=StudentResult)
+def invalidate_student_payload(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_students([instance.student_id])
+
+
+@receiver(post_save, sender=College)
+@receiver(post_delete, sender=College)
+def invalidate_college_cache(sender, **kwargs):
+    invalidate_colleges()
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, raw=False, **kwargs):
+    # covers password changes, deactivation and role/college moves
+    if not raw:
+        invalidate_user(instance.pk)
+
+
+@receiver(users_updated, sender=CustomUser)
+def invalidate_updated_users(sender, user_ids, **kwargs):
+    # deactivations and other bulk changes, which would otherwise stay cached for USER_TIMEOUT
+    invalidate_users(user_ids)
+
+
+@receiver(post_save, sender=Students)
+@receiver(post_delete, sender=Students)
+@receiver(post_save, sender=Staffs)
+@receiver(post_delete, sender=Staffs)
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def mark_dashboard_stats_stale(sender, instance, raw=False, **kwargs):
+    if not raw:
+        mark_stale(instance.college_id)
+
+
+@receiver(post_save, sender=Students)
+@receiver(post_delete, sender=Students)
+@receiver(post_save, sender=Staffs)
+@receiver(post_delete, sender=Staffs)
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=Semester)
+@receiver(post_delete, sender=Semester)
+@receiver(post_save, sender=LeaveReportStaff)
+@receiver(post_delete, sender=LeaveReportStaff)
+@receiver(post_save, sender=LeaveReportStudent)
+@receiver(post_delete, sender=LeaveReportStudent)
+def invalidate_dashboard_fragments(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_fragments([college_id_of(instance)])
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    apply_pragmas(connection)
@@ -0,0 +1,120 @@
+"""
+Per-student cached results/attendance payload.
+
+The student dashboard's subject buttons all hit api_student_subject_data,
+whose answer only changes when one of the student's attendance reports or
+results is written. The student's results and per-course attendance are
+therefore cached as one payload under a per-student version, which doubles as
+the ETag/Last-Modified validator: writes bump the version (signals for single
+saves/deletes, explicit calls from the bulk roll-call path), so a repeat click
+is either a 304 or a cache hit, with no query beyond session/auth.
+Payloads are always built from the primary database, never a lagging replica.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .attendance import acourse_attendance, course_attendance
+from .db_router import primary_reads
+from .models import StudentResult, Students
+
+
+VERSION_KEY = 'student:{}:version'
+PAYLOAD_KEY = 'student:{}:payload:{}'
+PAYLOAD_TIMEOUT = 60 * 60
+
+
+def _version(student_id):
+    """Time of the student's last invalidation, also used as Last-Modified."""
+    key = VERSION_KEY.format(student_id)
+    version = cache.get(key)
+    if version is None:
+        # unknown (cold or evicted): start a fresh version, which just forces a reload
+        cache.add(key, time.time(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_students(student_ids):
+    """Bump the students' versions once the current transaction commits, so no reader caches pre-commit data under the new version."""
+    keys = {VERSION_KEY.format(student_id) for student_id in student_ids}
+    transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, time.time()), None))
+
+
+def _results_query(student_id):
+    return (
+        StudentResult.objects.filter(student_id=student_id)
+        .order_by('subject_name', 'id')
+        .values_list('id', 'subject_name', 'marks', 'grade')
+    )
+
+
+def _build_payload(admin_id, version, results, attendance):
+    return {
+        'user_id': admin_id,
+        'version': version,
+        'results': {
+            result_id: {
+                'subject': subject,
+                'marks': float(marks) if marks is not None else None,
+                'grade': grade,
+            }
+            for result_id, subject, marks, grade in results
+        },
+        'attendance': attendance,
+    }
+
+
+def student_payload(student_id):
+    """
+    {'user_id', 'version', 'results': {result_id: {...}}, 'attendance': [...]}
+    for a student, or None if there is no such student.
+    """
+    version = _version(student_id)
+    key = PAYLOAD_KEY.format(student_id, version)
+    payload = cache.get(key)
+    if payload is None:
+        with primary_reads():
+            admin_id = Students.objects.filter(id=student_id).values_list('admin_id', flat=True).first()
+            if admin_id is None:
+                return None
+            payload = _build_payload(admin_id, version, _results_query(student_id), course_attendance(student_id))
+        cache.set(key, payload, PAYLOAD_TIMEOUT)
+    return payload
+
+
+async def _aversion(student_id):
+    key = VERSION_KEY.format(student_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time(), None)
+        version = await cache.aget(key)
+    return version
+
+
+async def astudent_payload(student_id):
+    """Async student_payload(), using the async cache and ORM APIs."""
+    version = await _aversion(student_id)
+    key = PAYLOAD_KEY.format(student_id, version)
+    payload = await cache.aget(key)
+    if payload is None:
+        with primary_reads():
+            admin_id = await Students.objects.filter(id=student_id).values_list('admin_id', flat=True).afirst()
+            if admin_id is None:
+                return None
+            results = [row async for row in _results_query(student_id)]
+            payload = _build_payload(admin_id, version, results, await acourse_attendance(student_id))
+        await cache.aset(key, payload, PAYLOAD_TIMEOUT)
+    return payload
+
+
+def attendance_overview(payload):
+    """(present, total, percent) across every course of a payload."""
+    present = sum(row['present'] for row in payload['attendance'])
+    total = sum(row['total'] for row in payload['attendance'])
+    return present, total, round((present / total * 100), 1) if total else 0
+
+
+def payload_etag(student_id, version, *parts):
+    return '"' + '-'.join(str(p) for p in (student_id, repr(version), *parts)) + '"'
@@ -0,0 +1,167 @@
+"""
+Synthetic college data for load tests and benchmarks.
+
+generate() builds N colleges, each with departments, semesters, courses, a
+session year, a HOD, staff and M students, D days of attendance per course
+and S subject results per student, plus a sprinkling of pending leaves. Rows
+are written with bulk_create in chunked transactions and derived tables
+(AttendanceSummary) are filled from the generated data rather than
+recomputed, so tens of thousands of students take seconds. Every account
+shares one password hash, and the data is deterministic for a given seed.
+"""
+import datetime
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+
+from .colleges import invalidate_colleges
+from .dashboard_stats import mark_stale
+from .fragments import invalidate_fragments
+from .models import (
+    AdminHOD, Attendance, AttendanceReport, AttendanceSummary, College, Course, CustomUser, Department,
+    LeaveReportStaff, LeaveReportStudent, Semester, SessionYear, Staffs, StudentResult, Students,
+)
+
+
+DEFAULT_PASSWORD = 'Password123!'
+CHUNK_SIZE = 2000
+START_DATE = datetime.date(2024, 7, 1)
+GRADES = ((90, 'A+'), (80, 'A'), (70, 'B'), (60, 'C'), (50, 'D'), (0, 'F'))
+DEPARTMENTS = ('Computer Science', 'Electronics', 'Mechanical', 'Civil')
+
+
+def grade_for(marks):
+    return next(grade for floor, grade in GRADES if marks >= floor)
+
+
+def _bulk(model, objs, chunk_size):
+    for start in range(0, len(objs), chunk_size):
+        model.objects.bulk_create(objs[start:start + chunk_size])
+    return objs
+
+
+def generate(colleges=2, students=100, days=10, subjects=5, staff=5, courses=2, prefix='scale',
+             password=DEFAULT_PASSWORD, password_hash=None, seed=0, chunk_size=CHUNK_SIZE, log=None):
+    """Create the synthetic dataset and return a dict of row counts per table."""
+    if not connection.features.can_return_rows_from_bulk_insert:
+        raise RuntimeError("generate() needs a database backend that returns primary keys from bulk_create.")
+    rng = random.Random(seed)
+    password_hash = password_hash or make_password(password)
+    counts = dict.fromkeys((
+        'colleges', 'users', 'students', 'staffs', 'attendances', 'attendance_reports', 'results', 'leaves',
+    ), 0)
+
+    for c in range(1, colleges + 1):
+        code = f"{prefix.upper()}{c:03d}"
+        handle = code.lower()
+        with transaction.atomic():
+            college = College.objects.create(name=f"{prefix.title()} College {c}", code=code, tagline="Synthetic data")
+            departments = _bulk(Department, [
+                Department(name=name, short_code=name[:4].upper(), college=college)
+                for name in DEPARTMENTS[:max(1, min(len(DEPARTMENTS), courses))]
+            ], chunk_size)
+            semesters = _bulk(Semester, [
+                Semester(name=f"Semester {n}", order=n, college=college) for n in (1, 2)
+            ], chunk_size)
+            course_objs = _bulk(Course, [
+                Course(name=f"Course {n} ({code})", college=college) for n in range(1, courses + 1)
+            ], chunk_size)
+            session = SessionYear.objects.create(session_start_year=START_DATE.year, session_end_year=START_DATE.year + 1, college=college)
+
+            hod = CustomUser(
+                username=f"{handle}_hod", email=f"{handle}_hod@example.com", password=password_hash,
+                user_type=CustomUser.HOD, college=college, is_staff=True,
+            )
+            staff_users = [
+                CustomUser(
+                    username=f"{handle}_staff_{k:03d}", email=f"{handle}_staff_{k:03d}@example.com", password=password_hash,
+                    user_type=CustomUser.STAFF, college=college, is_staff=True,
+                )
+                for k in range(1, staff + 1)
+            ]
+            student_users = [
+                CustomUser(
+                    username=f"{handle}_student_{i:05d}", email=f"{handle}_student_{i:05d}@example.com", password=password_hash,
+                    user_type=CustomUser.STUDENT, college=college,
+                )
+                for i in range(1, students + 1)
+            ]
+            users = _bulk(CustomUser, [hod] + staff_users + student_users, chunk_size)
+            AdminHOD.objects.create(admin=hod, college=college, department=departments[0])
+
+            staff_objs = _bulk(Staffs, [
+                Staffs(admin=user, college=college, department=departments[k % len(departments)], employee_id=f"EMP-{code}-{k:03d}")
+                for k, user in enumerate(staff_users, start=1)
+            ], chunk_size)
+            student_objs = _bulk(Students, [
+                Students(
+                    admin=user, college=college,
+                    student_id=f"{code}-{i:05d}", roll_no=f"R{i:05d}",
+                    course=course_objs[i % len(course_objs)],
+                    department=departments[i % len(departments)],
+                    year=semesters[0], semester=semesters[i % len(semesters)],
+                    session_year=session,
+                )
+                for i, user in enumerate(student_users, start=1)
+            ], chunk_size)
+
+            attendances = _bulk(Attendance, [
+                Attendance(course=course, session_year=session, attendance_date=START_DATE + datetime.timedelta(days=d), college=college)
+                for course in course_objs for d in range(days)
+            ], chunk_size)
+            by_course = {}
+            for a in attendances:
+                by_course.setdefault(a.course_id, []).append(a)
+
+            reports = []
+            summaries = []
+            for student in student_objs:
+                present = 0
+                for attendance in by_course.get(student.course_id, ()):
+                    status = rng.random() < 0.85
+                    present += status
+                    reports.append(AttendanceReport(student=student, attendance=attendance, status=status, college=college))
+                if days:
+                    summaries.append(AttendanceSummary(
+                        student=student, course_id=student.course_id, session_year=session,
+                        present=present, total=days, college=college,
+                    ))
+            _bulk(AttendanceReport, reports, chunk_size)
+            _bulk(AttendanceSummary, summaries, chunk_size)
+
+            results = []
+            for student in student_objs:
+                for j in range(1, subjects + 1):
+                    marks = round(min(100.0, max(0.0, rng.gauss(68, 14))), 1)
+                    results.append(StudentResult(
+                        student=student, subject_name=f"Subject {j}", marks=marks, grade=grade_for(marks), college=college,
+                    ))
+            _bulk(StudentResult, results, chunk_size)
+
+            leave_day = START_DATE + datetime.timedelta(days=days)
+            staff_leaves = [
+                LeaveReportStaff(staff=s, date=leave_day, message="Synthetic leave request") for s in staff_objs
+            ]
+            student_leaves = [
+                LeaveReportStudent(student=s, date=leave_day, message="Synthetic leave request") for s in student_objs[::10]
+            ]
+            _bulk(LeaveReportStaff, staff_leaves, chunk_size)
+            _bulk(LeaveReportStudent, student_leaves, chunk_size)
+
+        # bulk_create sends no signals
+        mark_stale(college.id)
+        invalidate_fragments([college.id])
+        counts['colleges'] += 1
+        counts['users'] += len(users)
+        counts['students'] += len(student_objs)
+        counts['staffs'] += len(staff_objs)
+        counts['attendances'] += len(attendances)
+        counts['attendance_reports'] += len(reports)
+        counts['results'] += len(results)
+        counts['leaves'] += len(staff_leaves) + len(student_leaves)
+        if log:
+            log(f"{code}: {len(student_objs)} students, {len(reports)} attendance reports, {len(results)} results")
+
+    invalidate_colleges()
+    return counts
@@ -0,0 +1,123 @@
+"""
+College (tenant) scoping.
+
+Tenant models carry a second manager next to the unscoped `objects`:
+Model.tenant.all() is every row of the current college. The college is
+reached through the model's own college column or, for models that only
+belong to a college through their applicant (leaves, feedback), through that
+join (`staff__college`, `student__college`). The predicate is always on the
+*_id column, so no College row is fetched and the (college, ...) composite
+indexes are used.
+
+The current college is resolved once per request by tenant_middleware from
+the user's college_id (already on the user row) and kept in a context
+variable; request.college_id holds it for views that need the id itself.
+Superusers, and code outside a request (commands, shells, background
+threads), are unscoped (ALL); anonymous users and accounts without a college
+see nothing. Querysets are scoped when they are built, so a streaming
+response that queries after the view has returned must filter explicitly.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.db import models
+from django.utils.decorators import sync_and_async_middleware
+
+
+# no restriction: superusers and code running outside a request
+ALL = object()
+
+_current_college = ContextVar('current_college_id', default=ALL)
+
+
+def current_college_id():
+    return _current_college.get()
+
+
+@contextmanager
+def tenant_scope(college_id):
+    """Run a block as college_id (ALL for unscoped, None for nothing)."""
+    token = _current_college.set(college_id)
+    try:
+        yield
+    finally:
+        _current_college.reset(token)
+
+
+def tenant_path(model):
+    """The lookup from the model to its college ('college', 'staff__college', ...), or None for non-tenant models."""
+    return getattr(model, '_tenant_path', None)
+
+
+def filter_to_college(qs, college):
+    """Narrow a queryset of a tenant model to a college (instance or id), ALL, or None (empty)."""
+    if college is ALL:
+        return qs
+    if college is None:
+        return qs.none()
+    return qs.filter(**{f'{tenant_path(qs.model)}_id': getattr(college, 'pk', college)})
+
+
+def college_id_of(obj):
+    """The college id a tenant object belongs to, following its tenant path."""
+    *relations, field = tenant_path(type(obj)).split('__')
+    for name in relations:
+        obj = getattr(obj, name, None)
+        if obj is None:
+            return None
+    return getattr(obj, f'{field}_id')
+
+
+class TenantQuerySet(models.QuerySet):
+    def for_college(self, college):
+        return filter_to_college(self, college)
+
+
+class TenantManager(models.Manager.from_queryset(TenantQuerySet)):
+    """Rows of the current college only. Declare it after `objects`, which stays the unscoped default manager."""
+
+    def __init__(self, path='college'):
+        super().__init__()
+        self.path = path
+
+    def contribute_to_class(self, cls, name):
+        super().contribute_to_class(cls, name)
+        cls._tenant_path = self.path
+
+    def get_queryset(self):
+        return super().get_queryset().for_college(current_college_id())
+
+    def for_college(self, college):
+        """Rows of an explicit college, ignoring the current one."""
+        return super().get_queryset().for_college(college)
+
+
+def _request_scope(user):
+    if not user.is_authenticated:
+        return None, None
+    return user.college_id, ALL if user.is_superuser else user.college_id
+
+
+@sync_and_async_middleware
+def tenant_middleware(get_response):
+    """Scope the request to the logged-in user's college; must come after AuthenticationMiddleware."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            # keep the loaded user so request.user does not load it a second time
+            request.user = await request.auser()
+            request.college_id, scope = _request_scope(request.user)
+            with tenant_scope(scope):
+                return await get_response(request)
+    else:
+        def middleware(request):
+            user = request.user
+            request.college_id, scope = _request_scope(user)
+
+            async def auser():
+                return user
+            # an async view behind this sync chain reuses the user loaded above
+            request.auser = auser
+            with tenant_scope(scope):
+                return get_response(request)
+    return middleware
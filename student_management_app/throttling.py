@@ -0,0 +1,74 @@
+"""
+Login rate limiting, checked before any password is hashed.
+
+Failed logins are counted in the cache per client IP and per username, each in
+a fixed window that starts at the first failure (settings.LOGIN_RATE_LIMITS
+overrides DEFAULT_LIMITS). Once either count reaches its limit, further
+attempts are turned away without calling authenticate(), so a brute-force run
+costs a cache read per guess instead of a password hash. A successful login
+clears the username's count; the IP's count is left to expire, since a whole
+campus may share one address. The IP is REMOTE_ADDR, so a reverse proxy must
+pass the client address through to it.
+
+The counts are only global if every worker process shares the cache
+(CMS_CACHE_URL); `manage.py check --deploy` fails on a process-local one
+(checks.py).
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+# scope -> (failed attempts allowed, window in seconds)
+DEFAULT_LIMITS = {
+    'ip': (50, 5 * 60),
+    'username': (5, 5 * 60),
+}
+
+FAILURES_KEY = 'login:failures:{}:{}'
+
+
+def login_limits():
+    return {**DEFAULT_LIMITS, **getattr(settings, 'LOGIN_RATE_LIMITS', {})}
+
+
+def _username_digest(username):
+    # usernames are user input: hash them into a key any cache backend accepts
+    return hashlib.sha256((username or '').strip().lower().encode()).hexdigest()[:32]
+
+
+def _keys(ip, username):
+    return {
+        'ip': FAILURES_KEY.format('ip', ip or 'unknown'),
+        'username': FAILURES_KEY.format('username', _username_digest(username)),
+    }
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR')
+
+
+def login_blocked(ip, username):
+    """True when the IP or the username has used up its failed attempts."""
+    keys = _keys(ip, username)
+    counts = cache.get_many(list(keys.values()))
+    limits = login_limits()
+    return any(counts.get(key, 0) >= limits[scope][0] for scope, key in keys.items())
+
+
+def record_failed_login(ip, username):
+    limits = login_limits()
+    for scope, key in _keys(ip, username).items():
+        window = limits[scope][1]
+        cache.add(key, 0, window)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # expired between add() and incr()
+            cache.set(key, 1, window)
+
+
+def clear_failed_logins(ip=None, username=None):
+    keys = _keys(ip, username)
+    cache.delete_many([keys[scope] for scope, value in (('ip', ip), ('username', username)) if value is not None])
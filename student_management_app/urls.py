@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, metrics, views
+
+# the async versions only pay off under an ASGI server; under WSGI each would run through async_to_sync
+read_views = async_views if settings.ASYNC_VIEWS else views
 
 
 app_name = "student_management_app"
@@ -16,11 +20,14 @@ urlpatterns = [
 
     path("admin-home/", views.admin_home, name="admin_home"),
     path("staff-home/", views.staff_home, name="staff_home"),
-    path("student-home/", views.student_home, name="student_home"),
+    path("student-home/", read_views.student_home, name="student_home"),
 
     path("student/subject/<int:student_id>/<int:result_id>/", views.student_subject_detail, name="student_subject_detail"),
 
-    path("api/student/subject-data/<int:student_id>/<int:result_id>/", views.api_student_subject_data, name="api_student_subject_data"),
+    path("api/student/dashboard/", read_views.api_student_dashboard, name="api_student_dashboard"),
+    path("api/student/subject-data/<int:student_id>/<int:result_id>/", read_views.api_student_subject_data, name="api_student_subject_data"),
+    path("api/students/", read_views.api_students_page, name="api_students_page"),
+    path("api/staffs/", read_views.api_staffs_page, name="api_staffs_page"),
 
     path("staff-attendance/", views.staff_attendance, name="staff_attendance"),
     path("staff-leave/", views.staff_leave, name="staff_leave"),
@@ -30,6 +37,9 @@ urlpatterns = [
     path("staff/edit-attendance/<int:attendance_report_id>/", views.staff_edit_attendance, name="staff_edit_attendance"),
     path("staff/edit-result/<int:result_id>/", views.staff_edit_result, name="staff_edit_result"),
 
+    path("export/attendance-register/", views.export_attendance_register, name="export_attendance_register"),
+    path("export/results/", views.export_results, name="export_results"),
+
     path("student-leave/", views.student_leave, name="student_leave"),
     path("student-results/", views.student_results, name="student_results"),
     path("student-feedback/", views.student_feedback, name="student_feedback"),
@@ -38,4 +48,10 @@ urlpatterns = [
     path("hod/leave-requests/", views.hod_leave_requests, name="hod_leave_requests"),
     path("hod/staff-leave/<int:leave_id>/", views.hod_process_staff_leave, name="hod_process_staff_leave"),
     path("hod/student-leave/<int:leave_id>/", views.hod_process_student_leave, name="hod_process_student_leave"),
+    path("hod/leaves/decide/", views.hod_leave_decisions, name="hod_leave_decisions"),
+    path("hod/import/", views.hod_import_users, name="hod_import_users"),
+    path("api/hod/pending-leaves/", read_views.api_pending_leaves, name="api_pending_leaves"),
+    path("api/analytics/", views.api_analytics, name="api_analytics"),
+
+    path("metrics/", metrics.metrics_view, name="metrics"),
 ]
@@ -3,41 +3,58 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout, get_user_model
 from django.contrib import messages
 from django.urls import reverse
-from django.http import HttpResponseRedirect
-from django.http import JsonResponse, HttpResponseForbidden
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, urlencode
+from django.http import Http404, HttpResponseRedirect
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_POST
-from django.db.models import Q, Count, F
+from django.db import transaction
+from django.db.models import Q, Count, F, Sum
+import csv
 import json
+from datetime import date
 from django.utils.safestring import mark_safe
 from .forms import (
     LeaveForm, StudentLeaveForm, ResultForm, ResultEntryForm,
     StudentFeedbackForm, ApproveLeaveForm,
-    StaffRegistrationForm, StudentRegistrationForm, HodRegistrationForm
+    StaffRegistrationForm, StudentRegistrationForm, HodRegistrationForm,
+    BulkImportForm
 )
 from .models import (
     Attendance, AttendanceReport, LeaveReportStaff, LeaveReportStudent,
     FeedbackStaff, FeedbackStudent, StudentResult, Department, Semester,
-    AdminHOD, Staffs, Students, CustomUser, Course, SessionYear, College
+    AdminHOD, Staffs, Students, CustomUser, Course, SessionYear, College,
+    AttendanceSummary, AnalyticsRollup
 )
+from .attendance import course_attendance, refresh_summaries
+from .colleges import get_college, get_colleges, remember_selected_college, selected_college_id
+from .pagination import keyset_page, parse_limit
+from .exports import attendance_register_rows, csv_lines, results_rows
+from .importers import import_users, read_csv
+from .student_cache import attendance_overview, invalidate_students, payload_etag, student_payload
+from . import analytics, dashboard_stats, leaves, throttling
+from .db_router import replica_reads
+from .db_tuning import serialized_write
+from .tenancy import current_college_id
+from .fragments import fragment_context, lazy
+from .accounts import hod_required, role_required, staff_required, student_required
 
 
 User = get_user_model()
 
 def home(request):
-    selected_college = None
-    college_id = request.session.get('selected_college_id')
-    if college_id:
-        selected_college = College.objects.filter(id=college_id).first()
-
-    colleges = College.objects.all()
+    college_id = selected_college_id(request)
+    selected_college = get_college(college_id)
+    colleges = get_colleges()
 
     if request.method == "POST":
         if 'select_college' in request.POST:
-            college_id = request.POST.get('college_id')
-            if college_id:
-                request.session['selected_college_id'] = int(college_id)
+            college = get_college(request.POST.get('college_id'))
+            response = redirect('student_management_app:home')
+            if college:
                 messages.success(request, "Selected college updated.")
-            return redirect('student_management_app:home')
+                remember_selected_college(response, college.id)
+            return response
 
         if 'create_college' in request.POST:
             name = request.POST.get('college_name', '').strip()
@@ -79,9 +96,8 @@ def home(request):
 
             Staffs.objects.create(admin=admin_user, college=college, employee_id=f"ADM-{college.code}")
 
-            request.session['selected_college_id'] = college.id
             messages.success(request, f"College '{college.name}' created and admin '{admin_username}' created.")
-            return redirect('student_management_app:home')
+            return remember_selected_college(redirect('student_management_app:home'), college.id)
 
     return render(request, 'student_management_app/home.html', {
         'colleges': colleges,
@@ -90,32 +106,47 @@ def home(request):
     })
 
 
-def loginPage(request):
-    if request.method == "POST":
-        username = request.POST.get('username')
-        password = request.POST.get('password')
-        user = authenticate(request, username=username, password=password)
-        if user is not None:
-            if not user.is_active:
-                messages.error(request, "Account disabled. Contact admin.")
-                return redirect('student_management_app:login')
-
-            login(request, user)
-            if user.is_superuser:
-                return redirect('student_management_app:admin_home')
-            if getattr(user, "user_type", None) == CustomUser.HOD:
-                return redirect('student_management_app:admin_home')
-            if getattr(user, "user_type", None) == CustomUser.STAFF:
-                return redirect('student_management_app:staff_home')
-            if getattr(user, "user_type", None) == CustomUser.STUDENT:
-                return redirect('student_management_app:student_home')
-            # fallback: staff -> staff_home, else home
-            if user.is_staff:
-                return redirect('student_management_app:staff_home')
-            return redirect('student_management_app:home')
+def _home_for(user):
+    """Where a user lands after logging in."""
+    if user.is_superuser or getattr(user, "user_type", None) == CustomUser.HOD:
+        return 'student_management_app:admin_home'
+    if getattr(user, "user_type", None) == CustomUser.STAFF:
+        return 'student_management_app:staff_home'
+    if getattr(user, "user_type", None) == CustomUser.STUDENT:
+        return 'student_management_app:student_home'
+    # fallback: staff -> staff_home, else home
+    if user.is_staff:
+        return 'student_management_app:staff_home'
+    return 'student_management_app:home'
 
+
+def _attempt_login(request):
+    """The POST side of loginPage and doLogin."""
+    username = request.POST.get('username')
+    password = request.POST.get('password')
+    ip = throttling.client_ip(request)
+    if throttling.login_blocked(ip, username):
+        messages.error(request, "Too many failed login attempts. Try again in a few minutes.")
+        return redirect('student_management_app:login')
+
+    # a hash made with an older hasher or cost is upgraded here, by check_password()
+    user = authenticate(request, username=username, password=password)
+    if user is None:
+        throttling.record_failed_login(ip, username)
         messages.error(request, 'Invalid credentials')
         return redirect('student_management_app:login')
+    if not user.is_active:
+        messages.error(request, "Account disabled. Contact admin.")
+        return redirect('student_management_app:login')
+
+    throttling.clear_failed_logins(username=username)
+    login(request, user)
+    return redirect(_home_for(user))
+
+
+def loginPage(request):
+    if request.method == "POST":
+        return _attempt_login(request)
 
     # GET: show the page
     return render(request, 'student_management_app/login_page.html')
@@ -124,29 +155,7 @@ def loginPage(request):
 def doLogin(request):
     if request.method != "POST":
         return redirect('student_management_app:login')
-    username = request.POST.get('username')
-    password = request.POST.get('password')
-    user = authenticate(request, username=username, password=password)
-    if user is not None:
-        if not user.is_active:
-            messages.error(request, "Account disabled. Contact admin.")
-            return redirect('student_management_app:login')
-
-        login(request, user)
-        if user.is_superuser:
-            return redirect('student_management_app:admin_home')
-        if getattr(user, "user_type", None) == CustomUser.HOD:
-            return redirect('student_management_app:admin_home')
-        if getattr(user, "user_type", None) == CustomUser.STAFF:
-            return redirect('student_management_app:staff_home')
-        if getattr(user, "user_type", None) == CustomUser.STUDENT:
-            return redirect('student_management_app:student_home')
-        if user.is_staff:
-            return redirect('student_management_app:staff_home')
-        return redirect('student_management_app:home')
-
-    messages.error(request, 'Invalid credentials')
-    return redirect('student_management_app:login')
+    return _attempt_login(request)
 
 
 def logout_user(request):
@@ -155,12 +164,9 @@ def logout_user(request):
 
 
 def registration(request):
-    selected_college = None
-    college_id = request.session.get('selected_college_id')
-    if college_id:
-        selected_college = College.objects.filter(id=college_id).first()
-
-    colleges = College.objects.all()
+    college_id = selected_college_id(request)
+    selected_college = get_college(college_id)
+    colleges = get_colleges()
 
     departments = Department.objects.filter(college=selected_college) if selected_college else Department.objects.none()
     semesters = Semester.objects.filter(college=selected_college) if selected_college else Semester.objects.none()
@@ -171,7 +177,7 @@ def registration(request):
             messages.error(request, "Please select a college (from homepage or this form) before registering.")
             return redirect('student_management_app:registration')
 
-        college_obj = College.objects.filter(id=posted_college_id).first()
+        college_obj = get_college(posted_college_id)
         if not college_obj:
             messages.error(request, "Selected college not found.")
             return redirect('student_management_app:registration')
@@ -291,90 +297,72 @@ def registration(request):
         'user_model': CustomUser,
     })
 
-def admin_home(request):
-    if not request.user.is_authenticated:
-        messages.error(request, 'Login required')
-        return redirect('student_management_app:login')
+def _student_rows(queryset):
+    """Flat rows for student listings; avoids building model instances for every row."""
+    return queryset.values(
+        'id', 'student_id', 'roll_no',
+        username=F('admin__username'),
+        course_name=F('course__name'),
+        department_name=F('department__name'),
+        semester_name=F('semester__name'),
+    )
 
-    if not (request.user.is_superuser or getattr(request.user, "user_type", None) == CustomUser.HOD):
-        messages.error(request, 'Unauthorized')
-        return redirect('student_management_app:login')
 
-    college = request.user.college if not request.user.is_superuser else None
+def _staff_rows(queryset):
+    return queryset.values(
+        'id', 'employee_id',
+        username=F('admin__username'),
+        department_name=F('department__name'),
+    )
+
+
+@hod_required(superuser=True)
+@replica_reads
+def admin_home(request):
+    college = get_college(request.college_id) if not request.user.is_superuser else None
 
     if request.user.is_superuser:
-        total_students = Students.objects.count()
-        total_staffs = Staffs.objects.count()
-        total_courses = Course.objects.count()
-        students_qs = Students.objects.select_related('admin', 'department', 'course')
-        staffs_qs = Staffs.objects.select_related('admin', 'department')
+        stats = dashboard_stats.get_stats(None)
     else:
-        total_students = Students.objects.filter(college=college).count()
-        total_staffs = Staffs.objects.filter(college=college).count()
-        total_courses = Course.objects.filter(college=college).count()
-        students_qs = Students.objects.filter(college=college).select_related('admin', 'department', 'course')
-        staffs_qs = Staffs.objects.filter(college=college).select_related('admin', 'department')
-
-    pending_staff_leaves = LeaveReportStaff.objects.filter(staff__college=college, status=False) if college else LeaveReportStaff.objects.filter(status=False)
-    pending_student_leaves = LeaveReportStudent.objects.filter(student__college=college, status=False) if college else LeaveReportStudent.objects.filter(status=False)
-
-    students_list = students_qs.order_by('student_id')[:200]
-    staffs_list = staffs_qs.order_by('employee_id')[:200]
-
-    students_by_dept_qs = students_qs.values(dept_name=F('department__name')).annotate(count=Count('id')).order_by('-count')
-    labels_students = []
-    values_students = []
-    for row in students_by_dept_qs:
-        label = row.get('dept_name') or "Unknown"
-        labels_students.append(label)
-        values_students.append(row.get('count', 0))
-
-    staffs_by_dept_qs = staffs_qs.values(dept_name=F('department__name')).annotate(count=Count('id')).order_by('-count')
-    labels_staffs = []
-    values_staffs = []
-    for row in staffs_by_dept_qs:
-        label = row.get('dept_name') or "Unknown"
-        labels_staffs.append(label)
-        values_staffs.append(row.get('count', 0))
+        stats = dashboard_stats.get_stats(college.id) if college else dashboard_stats.EMPTY_STATS
+    # tenant querysets: the HOD's college, every college for a superuser
+    students_qs = Students.tenant.select_related('admin', 'department', 'course')
+    staffs_qs = Staffs.tenant.select_related('admin', 'department')
+    leave_scope = current_college_id()
 
+    # lazy: the tables and leave lists are cached template fragments, so a cache hit never runs these
     context = {
         'college_profile': college,
-        'total_students': total_students,
-        'total_staffs': total_staffs,
-        'total_courses': total_courses,
-        'pending_staff_leaves': pending_staff_leaves,
-        'pending_student_leaves': pending_student_leaves,
-        'students_list': students_list,
-        'staffs_list': staffs_list,
-        'students_chart_labels': mark_safe(json.dumps(labels_students)),
-        'students_chart_values': mark_safe(json.dumps(values_students)),
-        'staffs_chart_labels': mark_safe(json.dumps(labels_staffs)),
-        'staffs_chart_values': mark_safe(json.dumps(values_staffs)),
+        'total_students': stats['total_students'],
+        'total_staffs': stats['total_staffs'],
+        'total_courses': stats['total_courses'],
+        'pending_staff_leaves': lazy(lambda: leaves.pending_leaves(leaves.STAFF, leave_scope, limit=10)[0]),
+        'pending_student_leaves': lazy(lambda: leaves.pending_leaves(leaves.STUDENT, leave_scope, limit=10)[0]),
+        'leave_counts': lazy(lambda: leaves.leave_counts(leave_scope)),
+        'students_page': lazy(lambda: keyset_page(_student_rows(students_qs), 'student_id')),
+        'staffs_page': lazy(lambda: keyset_page(_staff_rows(staffs_qs), 'employee_id')),
+        **fragment_context(leave_scope),
+        'students_chart_labels': mark_safe(json.dumps([label for label, _ in stats['students_by_department']])),
+        'students_chart_values': mark_safe(json.dumps([count for _, count in stats['students_by_department']])),
+        'staffs_chart_labels': mark_safe(json.dumps([label for label, _ in stats['staffs_by_department']])),
+        'staffs_chart_values': mark_safe(json.dumps([count for _, count in stats['staffs_by_department']])),
     }
     return render(request, 'student_management_app/dashboard_admin.html', context)
 
 
+@staff_required(profile=True)
 def staff_home(request):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.STAFF:
-        messages.error(request, 'Unauthorized')
-        return redirect('student_management_app:login')
+    staff_profile = request.user.staff_profile
+    my_leaves = leaves.own_leaves(leaves.STAFF, staff_profile)
 
-    try:
-        staff_profile = request.user.staff_profile
-    except Staffs.DoesNotExist:
-        messages.error(request, 'Staff profile not found.')
-        return redirect('student_management_app:login')
-
-    my_leaves = LeaveReportStaff.objects.filter(staff=staff_profile).order_by('-date')
-
-    college = request.user.college
-    students_preview = Students.objects.filter(college=college).select_related('admin', 'department', 'course', 'semester')[:50] if college else Students.objects.none()
-    courses = Course.objects.filter(college=college) if college else Course.objects.none()
-    semesters = Semester.objects.filter(college=college) if college else Semester.objects.none()
+    students_preview = Students.tenant.select_related('admin', 'department', 'course', 'semester')[:50]
+    courses = Course.tenant.all()
+    semesters = Semester.tenant.all()
 
     context = {
         'staff_profile': staff_profile,
-        'college_profile': request.user.college,
+        'college_profile': get_college(request.college_id),
+        **fragment_context(request.college_id),
         'my_leaves': my_leaves,
         'students_preview': students_preview,
         'courses': courses,
@@ -383,41 +371,97 @@ def staff_home(request):
     return render(request, 'student_management_app/dashboard_staff.html', context)
 
 
-def student_home(request):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.STUDENT:
-        messages.error(request, 'Unauthorized')
-        return redirect('student_management_app:login')
-
-    try:
-        student_profile = request.user.student_profile
-    except Students.DoesNotExist:
-        messages.error(request, 'Student profile not found.')
-        return redirect('student_management_app:login')
-
-    results = StudentResult.objects.filter(student=student_profile)
-    reports = AttendanceReport.objects.filter(student=student_profile).select_related('attendance')
-    present = reports.filter(status=True).count()
-    total_attendance = reports.count()
-    attendance_percent = round((present / total_attendance * 100), 1) if total_attendance else 0
-
-    context = {
+def _student_home_context(student_profile, payload):
+    present, total_attendance, attendance_percent = attendance_overview(payload)
+    return {
         'student_profile': student_profile,
-        'college_profile': request.user.college,
-        'results': results,
+        'college_profile': get_college(student_profile.college_id),
+        'payload_version': payload['version'],
+        **fragment_context(student_profile.college_id),
+        'results': [
+            {'id': result_id, 'subject_name': row['subject'], 'marks': row['marks'], 'grade': row['grade']}
+            for result_id, row in payload['results'].items()
+        ],
         'attendance_percent': attendance_percent,
         'present': present,
         'total_attendance': total_attendance,
     }
+
+
+@student_required
+@replica_reads
+def student_home(request):
+    student_profile = request.user.student_profile
+    context = _student_home_context(student_profile, student_payload(student_profile.id))
     return render(request, 'student_management_app/dashboard_student.html', context)
 
-def staff_attendance(request):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.STAFF:
-        messages.error(request, 'Unauthorized')
-        return redirect('student_management_app:login')
 
-    college = request.user.college
-    courses = Course.objects.filter(college=college) if college else Course.objects.none()
-    sessions = SessionYear.objects.filter(college=college) if college else SessionYear.objects.none()
+def _student_dashboard_data(student, payload):
+    present, total, percent = attendance_overview(payload)
+    return {
+        'profile': {
+            'id': student.id,
+            'username': student.admin.username,
+            'full_name': student.admin.get_full_name(),
+            'email': student.admin.email,
+            'student_id': student.student_id,
+            'roll_no': student.roll_no,
+            'department': student.department.name if student.department else None,
+            'course': student.course.name if student.course else None,
+            'year': student.year.name if student.year else None,
+            'semester': student.semester.name if student.semester else None,
+            'session': (
+                f"{student.session_year.session_start_year}-{student.session_year.session_end_year}"
+                if student.session_year else None
+            ),
+            'phone': student.phone,
+        },
+        'results': [{'id': result_id, **row} for result_id, row in payload['results'].items()],
+        'attendance': payload['attendance'],
+        'overall_attendance': {'present': present, 'total': total, 'percent': percent},
+    }
+
+
+@student_required(api=True)
+@replica_reads
+def api_student_dashboard(request):
+    """Everything the student dashboard shows, in one payload: profile, results, per-course and overall attendance."""
+    student = request.user.student_profile
+    return JsonResponse(_student_dashboard_data(student, student_payload(student.id)))
+
+
+def _roll_call_roster(course_id, session_id):
+    """Students of the current college enrolled in the given course/session, in one query."""
+    return (
+        Students.tenant
+        .filter(course_id=course_id, session_year_id=session_id)
+        .select_related('admin')
+        .order_by('roll_no', 'student_id')
+    )
+
+
+def _roll_call_selection(params, courses, sessions):
+    """
+    The (course, session year, date) picked on the roll-call form, looked up
+    in the current college's courses and sessions. An id outside them is a
+    404; a malformed id or date raises ValueError.
+    """
+    course_id, session_id = params.get('course'), params.get('session')
+    if not (course_id.isdigit() and session_id.isdigit()):
+        raise ValueError("course and session must be ids")
+    course = next((c for c in courses if c.id == int(course_id)), None)
+    session = next((s for s in sessions if s.id == int(session_id)), None)
+    if course is None or session is None:
+        raise Http404("No such course or session in this college.")
+    return course, session, date.fromisoformat(params.get('attendance_date'))
+
+
+@staff_required
+@serialized_write
+def staff_attendance(request):
+    college_id = request.college_id
+    courses = list(Course.tenant.all())
+    sessions = list(SessionYear.tenant.all())
 
     if request.method == "POST":
         course_id = request.POST.get('course')
@@ -426,28 +470,98 @@ def staff_attendance(request):
         if not (course_id and session_id and attendance_date):
             messages.error(request, "Please provide course, session, and date.")
             return redirect('student_management_app:staff_attendance')
+        try:
+            course, session, attendance_date = _roll_call_selection(request.POST, courses, sessions)
+        except ValueError:
+            messages.error(request, "Please pick a course and session from the lists and a valid date.")
+            return redirect('student_management_app:staff_attendance')
+        course_id, session_id = course.id, session.id
+
+        roll_call_url = "{}?{}".format(
+            reverse('student_management_app:staff_attendance'),
+            urlencode({'course': course_id, 'session': session_id, 'attendance_date': attendance_date.isoformat()}),
+        )
+
+        if 'roll_call' in request.POST:
+            present_ids = set(request.POST.getlist('present'))
+            with transaction.atomic():
+                attendance_obj, _ = Attendance.objects.get_or_create(
+                    course_id=course_id,
+                    session_year_id=session_id,
+                    attendance_date=attendance_date,
+                    defaults={"college_id": college_id}
+                )
+                roster_ids = _roll_call_roster(course_id, session_id).values_list('id', flat=True)
+                reports = [
+                    AttendanceReport(
+                        student_id=student_id,
+                        attendance=attendance_obj,
+                        status=str(student_id) in present_ids,
+                        college_id=college_id,
+                    )
+                    for student_id in roster_ids
+                ]
+                AttendanceReport.objects.bulk_create(
+                    reports,
+                    update_conflicts=True,
+                    unique_fields=['student', 'attendance'],
+                    update_fields=['status', 'college'],
+                )
+                refresh_summaries([r.student_id for r in reports], course_id, session_id)
+                # bulk_create sends no post_save, so drop the cached student payloads here
+                invalidate_students([r.student_id for r in reports])
+            present_count = sum(1 for r in reports if r.status)
+            messages.success(request, f"Attendance saved: {present_count} present, {len(reports) - present_count} absent.")
+            return redirect(roll_call_url)
 
         attendance_obj, created = Attendance.objects.get_or_create(
             course_id=course_id,
             session_year_id=session_id,
             attendance_date=attendance_date,
-            defaults={"college": college}
+            defaults={"college_id": college_id}
         )
         messages.success(request, "Attendance record created." if created else "Attendance already exists (opened).")
-        return redirect('student_management_app:staff_attendance')
+        return redirect(roll_call_url)
 
-    return render(request, 'student_management_app/staff_attendance.html', {'courses': courses, 'sessions': sessions})
+    context = {'courses': courses, 'sessions': sessions}
 
-def staff_leave(request):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.STAFF:
-        messages.error(request, 'Unauthorized')
-        return redirect('student_management_app:login')
+    course_id = request.GET.get('course')
+    session_id = request.GET.get('session')
+    attendance_date = request.GET.get('attendance_date')
+    if course_id and session_id and attendance_date:
+        try:
+            course, session, attendance_date = _roll_call_selection(request.GET, courses, sessions)
+        except ValueError:
+            messages.error(request, "Please pick a course and session from the lists and a valid date.")
+            return render(request, 'student_management_app/staff_attendance.html', context, status=400)
+        course_id, session_id = course.id, session.id
+        statuses = dict(
+            AttendanceReport.objects.filter(
+                attendance__course_id=course_id,
+                attendance__session_year_id=session_id,
+                attendance__attendance_date=attendance_date,
+                attendance__college_id=college_id,
+            ).values_list('student_id', 'status')
+        )
+        roster = []
+        for student in _roll_call_roster(course_id, session_id):
+            roster.append({
+                'student': student,
+                'present': statuses.get(student.id, True),
+                'marked': student.id in statuses,
+            })
+        context.update({
+            'roster': roster,
+            'selected_course_id': str(course_id),
+            'selected_session_id': str(session_id),
+            'attendance_date': attendance_date.isoformat(),
+        })
 
-    try:
-        staff = request.user.staff_profile
-    except Staffs.DoesNotExist:
-        messages.error(request, "Staff profile not found.")
-        return redirect('student_management_app:staff_home')
+    return render(request, 'student_management_app/staff_attendance.html', context)
+
+@staff_required(profile=True)
+def staff_leave(request):
+    staff = request.user.staff_profile
 
     if request.method == "POST":
         form = LeaveForm(request.POST)
@@ -460,19 +574,14 @@ def staff_leave(request):
     else:
         form = LeaveForm()
 
-    leaves = LeaveReportStaff.objects.filter(staff=staff)
-    return render(request, 'student_management_app/staff_leave.html', {'form': form, 'leaves': leaves})
+    return render(request, 'student_management_app/staff_leave.html', {
+        'form': form,
+        'leaves': leaves.own_leaves(leaves.STAFF, staff),
+    })
 
+@student_required
 def student_leave(request):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.STUDENT:
-        messages.error(request, 'Unauthorized')
-        return redirect('student_management_app:login')
-
-    try:
-        student = request.user.student_profile
-    except Students.DoesNotExist:
-        messages.error(request, "Student profile not found.")
-        return redirect('student_management_app:student_home')
+    student = request.user.student_profile
 
     if request.method == "POST":
         form = StudentLeaveForm(request.POST)
@@ -485,86 +594,204 @@ def student_leave(request):
     else:
         form = StudentLeaveForm()
 
-    leaves = LeaveReportStudent.objects.filter(student=student)
-    return render(request, 'student_management_app/student_leave.html', {'form': form, 'leaves': leaves})
+    return render(request, 'student_management_app/student_leave.html', {
+        'form': form,
+        'leaves': leaves.own_leaves(leaves.STUDENT, student),
+    })
 
+@student_required
 def student_results(request):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.STUDENT:
-        messages.error(request, 'Unauthorized')
-        return redirect('student_management_app:login')
-    try:
-        student = request.user.student_profile
-    except Students.DoesNotExist:
-        messages.error(request, 'Student profile not found.')
-        return redirect('student_management_app:student_home')
-
+    student = request.user.student_profile
     results = StudentResult.objects.filter(student=student)
     return render(request, 'student_management_app/student_results.html', {'results': results})
 
+@hod_required
 def hod_leave_requests(request):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.HOD:
-        messages.error(request, "Unauthorized")
-        return redirect('student_management_app:login')
+    college_id = request.college_id
+    staff_after = request.GET.get('staff_after')
+    student_after = request.GET.get('student_after')
+    pending_staff_leaves, staff_next = leaves.pending_leaves(leaves.STAFF, college_id, after=staff_after)
+    pending_student_leaves, student_next = leaves.pending_leaves(leaves.STUDENT, college_id, after=student_after)
+
+    def page_query(**cursors):
+        # each list's "next" link keeps the other list on its current page
+        return urlencode({name: cursor for name, cursor in cursors.items() if cursor})
 
-    college = request.user.college
-    pending_staff_leaves = LeaveReportStaff.objects.filter(staff__college=college, status=False)
-    pending_student_leaves = LeaveReportStudent.objects.filter(student__college=college, status=False)
     return render(request, 'student_management_app/hod_leave_requests.html', {
         'pending_staff_leaves': pending_staff_leaves,
         'pending_student_leaves': pending_student_leaves,
+        'staff_next': staff_next,
+        'student_next': student_next,
+        'staff_next_query': page_query(staff_after=staff_next, student_after=student_after),
+        'student_next_query': page_query(staff_after=staff_after, student_after=student_next),
+        'leave_counts': leaves.leave_counts(college_id),
     })
 
 
-def hod_process_staff_leave(request, leave_id):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.HOD:
-        messages.error(request, "Unauthorized")
-        return redirect('student_management_app:login')
-    leave = get_object_or_404(LeaveReportStaff, id=leave_id)
+@hod_required(api=True)
+def api_pending_leaves(request):
+    """Paginated pending-leave queue for the HOD: ?kind=staff|student&after=<cursor>&limit=N."""
+    kind = request.GET.get('kind', leaves.STAFF)
+    if kind not in (leaves.STAFF, leaves.STUDENT):
+        return JsonResponse({'error': 'kind must be staff or student'}, status=400)
+
+    rows, next_cursor = leaves.pending_leaves(
+        kind, request.college_id,
+        after=request.GET.get('after'),
+        limit=parse_limit(request.GET.get('limit'), default=leaves.PAGE_SIZE),
+    )
+    return JsonResponse({'results': [leaves.serialize(leave, kind) for leave in rows], 'next': next_cursor})
+
+
+@role_required(superuser=True, api=True)
+def api_analytics(request):
+    """Materialised cross-college analytics: ?level=college|department|course|session&college=<id>."""
+    level = request.GET.get('level', AnalyticsRollup.COLLEGE)
+    if level not in analytics.LEVELS:
+        return JsonResponse({'error': f"level must be one of {', '.join(analytics.LEVELS)}"}, status=400)
+    college_id = request.GET.get('college')
+    if college_id is not None and not college_id.isdigit():
+        return JsonResponse({'error': 'college must be an id'}, status=400)
+
+    rows = list(analytics.rollup_rows(level, int(college_id) if college_id else None))
+    return JsonResponse({
+        'level': level,
+        'computed_at': rows[0]['computed_at'].isoformat() if rows else None,
+        'results': [analytics.serialize_rollup(row) for row in rows],
+    })
+
+
+def _process_leave(request, kind, leave_id):
+    leave = leaves.get_leave(kind, request.college_id, leave_id)
+    if leave is None:
+        raise Http404("Leave not found")
+    label = "Leave" if kind == leaves.STAFF else "Student leave"
     if request.method == "POST":
-        decision = request.POST.get('decision')
-        if decision == 'approve':
-            leave.status = True
-            leave.save()
-            messages.success(request, "Leave approved.")
+        decision = leaves.APPROVE if request.POST.get('decision') == leaves.APPROVE else leaves.REJECT
+        summary = leaves.apply_decisions(request.college_id, [(kind, leave.id, decision)])
+        if summary['skipped']:
+            messages.warning(request, f"{label} was already processed.")
         else:
-            leave.message = f"[REJECTED] {leave.message}"
-            leave.save()
-            messages.success(request, "Leave rejected.")
+            messages.success(request, f"{label} {'approved' if decision == leaves.APPROVE else 'rejected'}.")
         return redirect('student_management_app:hod_leave_requests')
     form = ApproveLeaveForm()
     return render(request, 'student_management_app/hod_process_leave.html', {'leave': leave, 'form': form})
 
 
-def hod_process_student_leave(request, leave_id):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.HOD:
-        messages.error(request, "Unauthorized")
-        return redirect('student_management_app:login')
-    leave = get_object_or_404(LeaveReportStudent, id=leave_id)
-    if request.method == "POST":
+def _parse_leave_decisions(request):
+    """
+    (kind, id, decision) triples from either a JSON body
+    {"decisions": [{"kind": "staff", "id": 1, "decision": "approve"}, ...]}
+    or a form post with staff_ids/student_ids checkboxes and one decision.
+    Raises ValueError on malformed input.
+    """
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body or b'{}')
+            items = payload['decisions']
+            decisions = [(d['kind'], int(d['id']), d['decision']) for d in items]
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("expected {\"decisions\": [{\"kind\", \"id\", \"decision\"}, ...]}")
+    else:
         decision = request.POST.get('decision')
-        if decision == 'approve':
-            leave.status = True
-            leave.save()
-            messages.success(request, "Student leave approved.")
-        else:
-            leave.message = f"[REJECTED] {leave.message}"
-            leave.save()
-            messages.success(request, "Student leave rejected.")
+        try:
+            decisions = [
+                (kind, int(leave_id), decision)
+                for kind in (leaves.STAFF, leaves.STUDENT)
+                for leave_id in request.POST.getlist(f'{kind}_ids')
+            ]
+        except ValueError:
+            raise ValueError("leave ids must be integers")
+    for kind, _, decision in decisions:
+        if kind not in (leaves.STAFF, leaves.STUDENT):
+            raise ValueError("kind must be staff or student")
+        if decision not in leaves.DECISIONS:
+            raise ValueError("decision must be approve or reject")
+    return decisions
+
+
+@require_POST
+@hod_required
+@serialized_write
+def hod_leave_decisions(request):
+    """Approve/reject many leaves in one request; JSON in -> JSON summary, form post -> redirect."""
+    is_json = request.content_type == 'application/json'
+    try:
+        decisions = _parse_leave_decisions(request)
+    except ValueError as e:
+        if is_json:
+            return JsonResponse({'error': str(e)}, status=400)
+        messages.error(request, str(e))
         return redirect('student_management_app:hod_leave_requests')
-    form = ApproveLeaveForm()
-    return render(request, 'student_management_app/hod_process_leave.html', {'leave': leave, 'form': form})
 
-def staff_enter_result(request):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.STAFF:
-        messages.error(request, 'Unauthorized')
-        return redirect('student_management_app:login')
+    summary = leaves.apply_decisions(request.college_id, decisions)
+    if is_json:
+        return JsonResponse(summary)
+    if decisions:
+        messages.success(
+            request,
+            f"{summary['approved']} approved, {summary['rejected']} rejected"
+            + (f", {summary['skipped']} skipped (already processed or not found)." if summary['skipped'] else "."),
+        )
+    else:
+        messages.info(request, "No leaves selected.")
+    return redirect('student_management_app:hod_leave_requests')
+
 
+@hod_required
+@serialized_write
+def hod_process_staff_leave(request, leave_id):
+    return _process_leave(request, leaves.STAFF, leave_id)
+
+
+@hod_required
+@serialized_write
+def hod_process_student_leave(request, leave_id):
+    return _process_leave(request, leaves.STUDENT, leave_id)
+
+@hod_required
+def hod_import_users(request):
+    college = get_college(request.college_id)
+    if not college:
+        messages.error(request, "No college assigned to your account.")
+        return redirect('student_management_app:admin_home')
+
+    report = None
+    if request.method == "POST":
+        form = BulkImportForm(request.POST, request.FILES)
+        rows = None
+        if form.is_valid():
+            try:
+                rows = list(read_csv(form.cleaned_data['csv_file'].read()))
+            except UnicodeDecodeError:
+                form.add_error('csv_file', "The file is not UTF-8 encoded; save it as CSV UTF-8 and upload it again.")
+            except csv.Error as exc:
+                form.add_error('csv_file', f"The file is not a valid CSV file ({exc}).")
+        if rows is not None:
+            # hashed inline: a process pool per web request would fork the worker; import_students uses one
+            report = import_users(
+                college, rows,
+                role=form.cleaned_data['role'],
+                default_password=form.cleaned_data['default_password'] or None,
+                workers=1,
+            )
+            messages.success(request, f"Imported {report.created} accounts.")
+            if report.errors:
+                messages.warning(request, f"{len(report.errors)} rows were skipped; see the report below.")
+    else:
+        form = BulkImportForm()
+    return render(request, 'student_management_app/hod_import.html', {'form': form, 'report': report})
+
+
+@staff_required
+@serialized_write
+def staff_enter_result(request):
     if request.method == "POST":
         form = ResultEntryForm(request.POST)
         if form.is_valid():
             obj = form.save(commit=False)
-            if hasattr(obj, 'college') and getattr(request.user, "college", None):
-                obj.college = request.user.college
+            if request.college_id:
+                obj.college_id = request.college_id
             obj.save()
             messages.success(request, "Result saved.")
             return redirect('student_management_app:staff_enter_result')
@@ -572,16 +799,9 @@ def staff_enter_result(request):
         form = ResultEntryForm()
     return render(request, 'student_management_app/staff_enter_result.html', {'form': form})
 
+@student_required
 def student_feedback(request):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.STUDENT:
-        messages.error(request, 'Unauthorized')
-        return redirect('student_management_app:login')
-
-    try:
-        student = request.user.student_profile
-    except Students.DoesNotExist:
-        messages.error(request, "Student profile missing.")
-        return redirect('student_management_app:student_home')
+    student = request.user.student_profile
 
     if request.method == "POST":
         form = StudentFeedbackForm(request.POST)
@@ -597,45 +817,18 @@ def student_feedback(request):
     feedbacks = FeedbackStudent.objects.filter(student=student).order_by('-created_at')
     return render(request, 'student_management_app/student_feedback.html', {'form': form, 'feedbacks': feedbacks})
 
+@student_required
+@replica_reads
 def student_attendance_history(request):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.STUDENT:
-        messages.error(request, 'Unauthorized')
-        return redirect('student_management_app:login')
-
-    try:
-        student = request.user.student_profile
-    except Students.DoesNotExist:
-        messages.error(request, 'Student profile missing.')
-        return redirect('student_management_app:student_home')
+    student = request.user.student_profile
 
-    reports = AttendanceReport.objects.filter(student=student).select_related('attendance__course')
-    stats = {}
-    for rep in reports:
-        course_name = rep.attendance.course.name
-        if course_name not in stats:
-            stats[course_name] = {'present': 0, 'total': 0}
-        stats[course_name]['total'] += 1
-        if rep.status:
-            stats[course_name]['present'] += 1
-
-    for course_name, v in stats.items():
-        total = v['total']
-        present = v['present']
-        v['percent'] = round((present / total * 100), 1) if total else 0
+    stats = {row['course']: row for row in course_attendance(student)}
 
     return render(request, 'student_management_app/student_attendance_history.html', {'stats': stats})
 
+@student_required
 def student_subject_detail(request, student_id, result_id):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.STUDENT:
-        messages.error(request, 'Unauthorized')
-        return redirect('student_management_app:login')
-
-    try:
-        student_profile = request.user.student_profile
-    except Students.DoesNotExist:
-        messages.error(request, 'Student profile missing.')
-        return redirect('student_management_app:student_home')
-
+    student_profile = request.user.student_profile
     if student_profile.id != student_id:
         messages.error(request, 'Unauthorized access to student data.')
         return redirect('student_management_app:student_home')
@@ -651,76 +844,74 @@ def student_subject_detail(request, student_id, result_id):
     })
 
 
-def api_student_subject_data(request, student_id, result_id):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.STUDENT:
+def _subject_data_response(request, user, payload, student_id, result_id):
+    """The subject-data JSON (or 304/403/404) for a cached student payload."""
+    if payload is None or payload['user_id'] != user.id:
         return JsonResponse({'error': 'Unauthorized'}, status=403)
 
-    try:
-        student_profile = request.user.student_profile
-    except Students.DoesNotExist:
-        return JsonResponse({'error': 'Student profile missing'}, status=404)
-
-    if student_profile.id != student_id:
-        return JsonResponse({'error': 'Unauthorized'}, status=403)
-
-    result = StudentResult.objects.filter(id=result_id, student=student_profile).first()
-    if not result:
+    marks = payload['results'].get(result_id)
+    if marks is None:
         return JsonResponse({'error': 'Result not found'}, status=404)
 
-    marks = {
-        'subject': getattr(result, 'subject_name', str(getattr(result, 'subject', 'Unknown'))),
-        'marks': float(result.marks) if getattr(result, 'marks', None) is not None else None,
-        'grade': getattr(result, 'grade', None),
-    }
-
-    reports = AttendanceReport.objects.filter(student=student_profile).select_related('attendance__course')
-    attendance_by_course = {}
-    for r in reports:
-        course_name = r.attendance.course.name if r.attendance and getattr(r.attendance, 'course', None) else 'Unknown'
-        if course_name not in attendance_by_course:
-            attendance_by_course[course_name] = {'present': 0, 'total': 0}
-        attendance_by_course[course_name]['total'] += 1
-        if r.status:
-            attendance_by_course[course_name]['present'] += 1
-
-    attendance_list = []
-    for course_name, v in attendance_by_course.items():
-        total = v['total']
-        present = v['present']
-        percent = round((present / total * 100), 1) if total else 0
-        attendance_list.append({
-            'course': course_name,
-            'present': present,
-            'total': total,
-            'percent': percent,
-        })
+    etag = payload_etag(student_id, payload['version'], result_id)
+    last_modified = int(payload['version'])
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
 
-    return JsonResponse({
+    response = JsonResponse({
         'marks': marks,
-        'attendance': attendance_list,
+        'attendance': payload['attendance'],
     })
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # the browser may keep it but must revalidate, and shared caches must not
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
-def staff_student_list(request):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.STAFF:
-        messages.error(request, 'Unauthorized')
-        return redirect('student_management_app:login')
-
-    college = request.user.college
-    courses = Course.objects.filter(college=college) if college else Course.objects.none()
-    semesters = Semester.objects.filter(college=college) if college else Semester.objects.none()
 
-    students = Students.objects.filter(college=college) if college else Students.objects.none()
+# the payload names its owner, so the poll needs no profile (and no user query with CACHED_AUTH_USER)
+@role_required(CustomUser.STUDENT, api=True)
+@replica_reads
+def api_student_subject_data(request, student_id, result_id):
+    return _subject_data_response(request, request.user, student_payload(student_id), student_id, result_id)
 
+def _filtered_students(request):
+    """Students of the current college filtered by ?course=&semester=; ValueError unless both are empty or ids."""
+    students = Students.tenant.all()
     selected_course_id = request.GET.get('course')
     selected_sem_id = request.GET.get('semester')
-
+    if any(value and not value.isdigit() for value in (selected_course_id, selected_sem_id)):
+        raise ValueError("course and semester must be ids")
     if selected_course_id:
         students = students.filter(course_id=selected_course_id)
     if selected_sem_id:
         students = students.filter(semester_id=selected_sem_id)
+    return students, selected_course_id, selected_sem_id
+
+
+@staff_required
+def staff_student_list(request):
+    courses = Course.tenant.all()
+    semesters = Semester.tenant.all()
+
+    try:
+        students, selected_course_id, selected_sem_id = _filtered_students(request)
+    except ValueError:
+        messages.error(request, "Please pick a course and semester from the lists.")
+        return render(request, 'student_management_app/staff_student_list.html', {
+            'courses': courses,
+            'semesters': semesters,
+        }, status=400)
+    students_page, next_cursor = keyset_page(
+        _student_rows(students), 'student_id',
+        after=request.GET.get('after'),
+        limit=parse_limit(request.GET.get('limit')),
+    )
 
     return render(request, 'student_management_app/staff_student_list.html', {
-        'students': students,
+        'students': students_page,
+        'next_cursor': next_cursor,
         'courses': courses,
         'semesters': semesters,
         'selected_course_id': selected_course_id,
@@ -728,29 +919,68 @@ def staff_student_list(request):
     })
 
 
-@require_POST
-def staff_edit_attendance(request, attendance_report_id):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.STAFF:
-        return HttpResponseForbidden("Unauthorized")
+# who may page through the college's student / staff listings
+can_list_students = role_required(CustomUser.HOD, CustomUser.STAFF, superuser=True, api=True)
+can_list_staffs = hod_required(api=True, superuser=True)
+
+
+def _students_listing(request):
+    """
+    Student rows of the current college, filtered by ?course=&semester=; no query is run here.
+    Raises ValueError for a course or semester that is not an id.
+    """
+    students, _, _ = _filtered_students(request)
+    return _student_rows(students)
 
-    ar = get_object_or_404(AttendanceReport, id=attendance_report_id)
-    if request.user.college and getattr(ar, 'college', None) != request.user.college:
-        return HttpResponseForbidden("Not allowed")
 
+def _staffs_listing():
+    return _staff_rows(Staffs.tenant.all())
+
+
+@can_list_students
+def api_students_page(request):
+    """Next page of the college's students for the HOD/staff listings, by student_id cursor."""
+    try:
+        students = _students_listing(request)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    rows, next_cursor = keyset_page(
+        students, 'student_id',
+        after=request.GET.get('after'),
+        limit=parse_limit(request.GET.get('limit')),
+    )
+    return JsonResponse({'results': rows, 'next': next_cursor})
+
+
+@can_list_staffs
+def api_staffs_page(request):
+    """Next page of the college's staff for the HOD dashboard, by employee_id cursor."""
+    rows, next_cursor = keyset_page(
+        _staffs_listing(), 'employee_id',
+        after=request.GET.get('after'),
+        limit=parse_limit(request.GET.get('limit')),
+    )
+    return JsonResponse({'results': rows, 'next': next_cursor})
+
+
+@require_POST
+@staff_required(api=True)
+@serialized_write
+def staff_edit_attendance(request, attendance_report_id):
     new_status = request.POST.get('status')
-    ar.status = True if new_status == '1' or new_status == 'true' or new_status == 'on' else False
-    ar.save()
+    with transaction.atomic():
+        # the summary delta is taken from the status loaded here, so a concurrent edit must wait for this one
+        ar = get_object_or_404(AttendanceReport.tenant.select_for_update(), id=attendance_report_id)
+        ar.status = True if new_status == '1' or new_status == 'true' or new_status == 'on' else False
+        ar.save()
     return JsonResponse({'ok': True, 'status': ar.status})
 
 
 @require_POST
+@staff_required(api=True)
+@serialized_write
 def staff_edit_result(request, result_id):
-    if not request.user.is_authenticated or getattr(request.user, "user_type", None) != CustomUser.STAFF:
-        return HttpResponseForbidden("Unauthorized")
-
-    res = get_object_or_404(StudentResult, id=result_id)
-    if request.user.college and getattr(res, 'college', None) != request.user.college:
-        return HttpResponseForbidden("Not allowed")
+    res = get_object_or_404(StudentResult.tenant, id=result_id)
 
     marks = request.POST.get('marks')
     grade = request.POST.get('grade')
@@ -763,3 +993,39 @@ def staff_edit_result(request, result_id):
         return JsonResponse({'ok': True, 'marks': res.marks, 'grade': res.grade})
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=400)
+
+
+def _csv_download(rows, filename):
+    response = StreamingHttpResponse(csv_lines(rows), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@role_required(CustomUser.HOD, CustomUser.STAFF, api=True)
+def export_attendance_register(request):
+    # the CSV streams after the view returns, outside the request's tenant scope, so filter explicitly
+    college = get_college(request.college_id)
+    course_id = request.GET.get('course')
+    session_id = request.GET.get('session')
+    if not (college and course_id and session_id):
+        return JsonResponse({'error': 'course and session are required'}, status=400)
+    # checked before streaming: once the 200 is sent, a bad value could only truncate the file
+    if not (course_id.isdigit() and session_id.isdigit()):
+        return JsonResponse({'error': 'course and session must be ids'}, status=400)
+
+    rows = attendance_register_rows(college, course_id, session_id)
+    return _csv_download(rows, f"attendance_{college.code}_{course_id}_{session_id}.csv")
+
+
+@role_required(CustomUser.HOD, CustomUser.STAFF, api=True)
+def export_results(request):
+    college = get_college(request.college_id)
+    if not college:
+        return JsonResponse({'error': 'No college assigned'}, status=400)
+    course_id = request.GET.get('course')
+    semester_id = request.GET.get('semester')
+    if any(value and not value.isdigit() for value in (course_id, semester_id)):
+        return JsonResponse({'error': 'course and semester must be ids'}, status=400)
+
+    rows = results_rows(college, course_id=course_id, semester_id=semester_id)
+    return _csv_download(rows, f"results_{college.code}.csv")
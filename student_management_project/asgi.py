@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'student_management_project.settings')
+# mount the async API/dashboard views (see student_management_app.async_views)
+os.environ.setdefault('CMS_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
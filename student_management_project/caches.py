@@ -0,0 +1,52 @@
+"""
+CACHES entries from a URL (CMS_CACHE_URL in settings.py):
+
+    locmem://                         per-process memory (the default; development only)
+    redis://host:6379/0               Redis, via redis-py (requirements.txt)
+    rediss://:password@host:6380/0    Redis over TLS
+    memcached://host:11211            memcached, needs pymemcache installed
+
+The college list, dashboard statistics and fragments, the cached auth user
+and the login rate limits all keep their state and invalidation markers in
+the default cache. Each worker process has its own locmem cache, so with more
+than one process (gunicorn/uvicorn workers, management commands run next to
+the server) production needs a shared backend; `manage.py check --deploy`
+reports a process-local one (student_management_app/checks.py).
+"""
+from urllib.parse import urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+REDIS_SCHEMES = ('redis', 'rediss')
+# backends whose entries are invisible to other processes
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def parse_cache_url(url):
+    parts = urlsplit(url)
+    if parts.scheme == 'locmem':
+        return {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': parts.netloc or 'cms',
+        }
+    if parts.scheme in REDIS_SCHEMES:
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': url,
+        }
+    if parts.scheme == 'memcached':
+        return {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': parts.netloc,
+        }
+    raise ImproperlyConfigured(
+        f"Unsupported cache URL scheme '{parts.scheme}' (use locmem://, redis://, rediss:// or memcached://)."
+    )
+
+
+def is_process_local(cache_settings):
+    return cache_settings.get('BACKEND') in PROCESS_LOCAL_BACKENDS
@@ -0,0 +1,41 @@
+"""
+PASSWORD_HASHERS from the preferred algorithm (CMS_PASSWORD_HASHER in settings.py):
+
+    scrypt   memory-hard, in the standard library (default)
+    argon2   needs argon2-cffi installed
+    pbkdf2   Django's default
+
+New passwords are hashed with the preferred hasher; the others stay listed so
+existing hashes still verify, and Django re-hashes a password with the
+preferred hasher (and its current cost settings) on that account's next
+successful login.
+"""
+from importlib.util import find_spec
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+HASHERS = {
+    'scrypt': 'student_management_app.hashers.ScryptHasher',
+    'argon2': 'student_management_app.hashers.Argon2Hasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+# only ever verified, never used for new hashes
+LEGACY_HASHERS = ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+
+def argon2_available():
+    return find_spec('argon2') is not None
+
+
+def available_hashers():
+    return [name for name in HASHERS if name != 'argon2' or argon2_available()]
+
+
+def password_hashers(preferred):
+    if preferred not in HASHERS:
+        raise ImproperlyConfigured(f"Unknown password hasher '{preferred}' (use {', '.join(HASHERS)}).")
+    available = available_hashers()
+    if preferred not in available:
+        raise ImproperlyConfigured(f"The '{preferred}' password hasher needs argon2-cffi installed.")
+    return [HASHERS[preferred]] + [HASHERS[name] for name in available if name != preferred] + LEGACY_HASHERS
@@ -0,0 +1,21 @@
+"""
+SESSION_ENGINE from a short name (CMS_SESSION_ENGINE in settings.py):
+
+    db              one django_session row per session (Django's default)
+    cached_db       the same rows, read through the cache: no session SELECT on a warm cache
+    signed_cookies  no server-side storage at all; logging out cannot revoke a copied cookie
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+
+def session_engine(name):
+    if name not in SESSION_ENGINES:
+        raise ImproperlyConfigured(f"Unknown session engine '{name}' (use {', '.join(SESSION_ENGINES)}).")
+    return SESSION_ENGINES[name]
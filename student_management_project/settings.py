@@ -1,5 +1,11 @@
+import os
 from pathlib import Path
 
+from .caches import parse_cache_url
+from .databases import parse_database_url
+from .passwords import password_hashers
+from .sessions import session_engine
+
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -27,14 +33,27 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 
 AUTH_USER_MODEL = "student_management_app.CustomUser"
 
+# ProfileBackend loads the request's user with college and role profile in one query
+# (student_management_app/accounts.py); ModelBackend stays listed so sessions logged in before it keep working.
+AUTHENTICATION_BACKENDS = [
+    'student_management_app.accounts.ProfileBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+# serve the request's user from the cache instead (same backend, so switching keeps sessions logged in);
+# refused by a system check unless CMS_CACHE_URL names a shared cache
+CACHED_AUTH_USER = os.environ.get('CMS_CACHED_AUTH_USER', '0') == '1'
+
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'student_management_app.metrics.QueryMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'student_management_app.tenancy.tenant_middleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'student_management_app.db_router.replica_pin_middleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -42,7 +61,7 @@ ROOT_URLCONF = 'student_management_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'student_management_app.metrics.InstrumentedDjangoTemplates',
         'DIRS': [BASE_DIR / "templates"],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -61,11 +80,54 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'student_management_project.wsgi.application'
 
+# the primary database, and optionally a read replica for the dashboards and student APIs
+# (student_management_app/db_router.py); see databases.py for the URL forms. Locally two SQLite
+# files work too: CMS_REPLICA_DATABASE_URL=sqlite:///replica.sqlite3, refreshed with `manage.py sync_replica`.
+# CONN_MAX_AGE reuses connections, so the pragmas from db_tuning.py are set once per connection.
+CONN_MAX_AGE = int(os.environ.get('CMS_CONN_MAX_AGE', '60'))
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+    'default': parse_database_url(os.environ.get('CMS_DATABASE_URL', 'sqlite:///db.sqlite3'), BASE_DIR, CONN_MAX_AGE),
+}
+if os.environ.get('CMS_REPLICA_DATABASE_URL'):
+    DATABASES['replica'] = {
+        **parse_database_url(os.environ['CMS_REPLICA_DATABASE_URL'], BASE_DIR, CONN_MAX_AGE),
+        'TEST': {'MIRROR': 'default'},
     }
+DATABASE_ROUTERS = ['student_management_app.db_router.ReplicaRouter']
+# seconds a browser keeps reading from the primary after a POST (read-your-writes)
+REPLICA_PIN_SECONDS = int(os.environ.get('CMS_REPLICA_PIN_SECONDS', '10'))
+
+# the cache behind the college list, dashboard statistics and fragments, the cached auth user and the login rate
+# limits (caches.py for the URL forms). The locmem default is per process: production, with several workers,
+# needs a shared one, e.g. CMS_CACHE_URL=redis://127.0.0.1:6379/1 (`manage.py check --deploy` flags locmem)
+CACHES = {
+    'default': parse_cache_url(os.environ.get('CMS_CACHE_URL', 'locmem://')),
+}
+
+# mmap/cache sizes and busy_timeout on every SQLite connection
+# (db_tuning.PRAGMAS; override single values with SQLITE_PRAGMAS = {...})
+SQLITE_TUNING = os.environ.get('CMS_SQLITE_TUNING', '1') == '1'
+# WAL and synchronous=NORMAL as well; journal_mode is written into the database file, so this is a
+# deployment choice (CMS_SQLITE_WAL=1), not something every connection (or management command) switches on
+SQLITE_WAL = os.environ.get('CMS_SQLITE_WAL', '0') == '1'
+
+# CMS_PASSWORD_HASHER: scrypt (default), argon2 (if argon2-cffi is installed) or pbkdf2; accounts move to the
+# preferred hasher and cost on their next login (student_management_project/passwords.py)
+PASSWORD_HASHERS = password_hashers(os.environ.get('CMS_PASSWORD_HASHER', 'scrypt'))
+# scrypt N=2**14, r=8, p=5 (16 MiB, one of OWASP's equal-cost settings): about two thirds of PBKDF2's CPU per login
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.environ.get('CMS_SCRYPT_WORK_FACTOR', str(2 ** 14)))
+PASSWORD_SCRYPT_PARALLELISM = int(os.environ.get('CMS_SCRYPT_PARALLELISM', '5'))
+# Argon2id with one lane: the app servers hash one login per core
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('CMS_ARGON2_TIME_COST', '2'))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get('CMS_ARGON2_MEMORY_COST', str(19 * 1024)))
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get('CMS_ARGON2_PARALLELISM', '1'))
+
+# failed logins allowed per client IP and per username before attempts are refused unhashed
+# (student_management_app/throttling.py): scope -> (attempts, window seconds). Counted in the default cache,
+# which has to be shared (CMS_CACHE_URL) in production
+LOGIN_RATE_LIMITS = {
+    'ip': (int(os.environ.get('CMS_LOGIN_IP_LIMIT', '50')), 5 * 60),
+    'username': (int(os.environ.get('CMS_LOGIN_USERNAME_LIMIT', '5')), 5 * 60),
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -101,3 +163,13 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 DEBUG = True
 ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
+
+# session storage, CMS_SESSION_ENGINE: db (default), cached_db or signed_cookies (student_management_project/sessions.py)
+SESSION_ENGINE = session_engine(os.environ.get('CMS_SESSION_ENGINE', 'db'))
+SESSION_COOKIE_AGE = int(os.environ.get('CMS_SESSION_AGE', str(14 * 24 * 60 * 60)))
+SESSION_COOKIE_HTTPONLY = True
+SESSION_COOKIE_SAMESITE = 'Lax'
+
+# serve the read-heavy JSON APIs and the student dashboard with their async
+# versions (student_management_app.async_views); asgi.py turns this on
+ASYNC_VIEWS = os.environ.get('CMS_ASYNC_VIEWS', '0') == '1'